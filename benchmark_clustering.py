@@ -0,0 +1,90 @@
+"""Benchmark sampled UMAP/HDBSCAN fits against a full fit of the question bank."""
+
+from pathlib import Path
+from typing import List
+import numpy as np
+import pandas as pd
+
+from benchmark_tokenization import time_call
+from gap_analysis.data_loader import load_and_prepare_data
+from gap_analysis.embedding_store import text_key
+from gap_analysis.semantic_clustering import (
+    load_embedding_model, open_corpus_store, generate_embeddings,
+    fit_cluster_model, question_strata, compare_cluster_labels
+)
+
+
+def corpus_labels(cluster_model, keys: List[bytes]) -> np.ndarray:
+    """Cluster label per question, in corpus order."""
+    return cluster_model['labels'][[cluster_model['index'][key] for key in keys]]
+
+
+def benchmark_sampled_fits(df: pd.DataFrame, embeddings: np.ndarray, sample_sizes: List[int],
+                           min_cluster_size: int = 10) -> pd.DataFrame:
+    """
+    Fit on stratified samples of several sizes and compare each with a full fit.
+
+    Args:
+        df: Prepared questions dataframe
+        embeddings: combined_text embeddings aligned with df
+        sample_sizes: Sample sizes to test
+        min_cluster_size: Minimum cluster size for HDBSCAN
+
+    Returns:
+        Dataframe with fit time and agreement with the full fit per sample size
+    """
+    keys = [text_key(text) for text in df['combined_text'].tolist()]
+    strata = question_strata(df)
+
+    full = time_call(fit_cluster_model, embeddings, keys, min_cluster_size=min_cluster_size, repeats=1)
+    full_labels = corpus_labels(full['result'], keys)
+
+    rows = [{'sample_size': len(df), 'fit_s': full['seconds'], **compare_cluster_labels(full_labels, full_labels)}]
+    for sample_size in sample_sizes:
+        sampled = time_call(fit_cluster_model, embeddings, keys, min_cluster_size=min_cluster_size,
+                            sample_size=sample_size, strata=strata, repeats=1)
+        labels = corpus_labels(sampled['result'], keys)
+        rows.append({'sample_size': sample_size, 'fit_s': sampled['seconds'],
+                     **compare_cluster_labels(full_labels, labels)})
+
+    report = pd.DataFrame(rows)
+    report['speedup'] = report['fit_s'].iloc[0] / report['fit_s']
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark sampled vs full UMAP/HDBSCAN clustering")
+    parser.add_argument(
+        "--excel",
+        type=str,
+        default="ninouk2.xlsx",
+        help="Path to Excel file (default: ninouk2.xlsx)"
+    )
+    parser.add_argument(
+        "--sample-sizes",
+        type=int,
+        nargs="+",
+        default=[2000, 4000, 8000],
+        help="Stratified sample sizes to compare with the full fit (default: 2000 4000 8000)"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="outputs/clustering_sample_quality.csv",
+        help="Report CSV path (default: outputs/clustering_sample_quality.csv)"
+    )
+
+    args = parser.parse_args()
+
+    df = load_and_prepare_data(args.excel)
+    embeddings = generate_embeddings(df['combined_text'].tolist(), load_embedding_model(), open_corpus_store())
+    print(f"\nBenchmarking sampled clustering fits on {len(df)} questions...\n")
+
+    report = benchmark_sampled_fits(df, embeddings, [size for size in args.sample_sizes if size < len(df)])
+    print(report.to_string(index=False))
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    report.to_csv(args.output, index=False)
+    print(f"\nReport saved to {args.output}")
@@ -0,0 +1,112 @@
+"""Benchmark the fast regex tokenizer against the NLTK tokenizer path."""
+
+import time
+from typing import Dict, Any
+import pandas as pd
+
+from gap_analysis.data_loader import load_and_prepare_data
+from gap_analysis.tokenization import build_token_corpus
+from gap_analysis.ngram_analysis import preprocess_text, analyze_ngrams
+
+
+def time_call(func, *args, repeats: int = 3, **kwargs) -> Dict[str, Any]:
+    """
+    Time a function call, keeping the best of several runs.
+
+    Args:
+        func: Function to call
+        repeats: Number of runs
+
+    Returns:
+        Dictionary with best time in seconds and the last result
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return {'seconds': best, 'result': result}
+
+
+def benchmark_tokenizers(df: pd.DataFrame, repeats: int = 3) -> pd.DataFrame:
+    """
+    Compare 'nltk' and 'fast' tokenizers on corpus building and per-row preprocessing.
+
+    Args:
+        df: Prepared questions dataframe
+        repeats: Number of timed runs per case
+
+    Returns:
+        Dataframe with timings per tokenizer
+    """
+    rows = []
+    corpora = {}
+    questions = df['QEN'].tolist()
+
+    for tokenizer in ['nltk', 'fast']:
+        corpus_timing = time_call(build_token_corpus, df, tokenizer=tokenizer, repeats=repeats)
+        corpora[tokenizer] = corpus_timing['result']
+
+        preprocess_timing = time_call(
+            lambda: [preprocess_text(text, remove_stopwords=True, tokenizer=tokenizer) for text in questions],
+            repeats=repeats
+        )
+
+        rows.append({
+            'tokenizer': tokenizer,
+            'token_corpus_s': corpus_timing['seconds'],
+            'preprocess_qen_s': preprocess_timing['seconds'],
+        })
+
+    # Fast mode must reproduce NLTK tokens and stopword masks exactly
+    identical = corpora['nltk']['columns'] == corpora['fast']['columns']
+
+    report = pd.DataFrame(rows)
+    report['identical_tokens'] = identical
+    report['speedup'] = report['token_corpus_s'].iloc[0] / report['token_corpus_s']
+    return report
+
+
+def benchmark_ngram_phase(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Time the full n-gram phase (tokenization included) for both tokenizers.
+
+    Args:
+        df: Prepared questions dataframe
+
+    Returns:
+        Dataframe with timings per tokenizer
+    """
+    rows = []
+    for tokenizer in ['nltk', 'fast']:
+        timing = time_call(analyze_ngrams, df, tokenizer=tokenizer, repeats=1)
+        rows.append({'tokenizer': tokenizer, 'ngram_phase_s': timing['seconds']})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark fast vs NLTK tokenization")
+    parser.add_argument(
+        "--excel",
+        type=str,
+        default="ninouk2.xlsx",
+        help="Path to Excel file (default: ninouk2.xlsx)"
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="Timed runs per case, best is reported (default: 3)"
+    )
+
+    args = parser.parse_args()
+
+    df = load_and_prepare_data(args.excel)
+    print(f"\nBenchmarking tokenizers on {len(df)} questions...\n")
+
+    print(benchmark_tokenizers(df, repeats=args.repeats).to_string(index=False))
+    print()
+    print(benchmark_ngram_phase(df).to_string(index=False))
@@ -1,10 +1,30 @@
 """Load and prepare quiz data from Excel file."""
 
+import hashlib
+import os
+from itertools import chain
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Any, Dict, List, Tuple
 from .utils import clean_text, parse_tag_ids, get_character_count
 
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # Cache is optional; preparation still works without pyarrow
+    pa = None
+    feather = None
+
+
+# Bump whenever the preparation steps change so stale caches are ignored
+LOADER_VERSION = 1
+
+DEFAULT_CACHE_DIR = "outputs/cache"
+
+# Columns holding Python lists per row
+LIST_COLUMNS = ['tag_ids', 'tag_names', 'tag_categories', 'tag_codes']
+
 
 def load_excel_data(excel_path: str = "ninouk2.xlsx") -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
@@ -32,6 +52,12 @@ def load_excel_data(excel_path: str = "ninouk2.xlsx") -> Tuple[pd.DataFrame, pd.
     return questions_df, tags_df
 
 
+def _split_by_counts(values: List[Any], counts: np.ndarray) -> List[List[Any]]:
+    """Split a flat list into consecutive sublists of the given lengths."""
+    bounds = np.concatenate(([0], np.cumsum(counts))).tolist()
+    return [values[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+
 def merge_tag_information(questions_df: pd.DataFrame, tags_df: pd.DataFrame) -> pd.DataFrame:
     """
     Merge tag information from cats_tags sheet into questions dataframe.
@@ -45,38 +71,61 @@ def merge_tag_information(questions_df: pd.DataFrame, tags_df: pd.DataFrame) ->
     """
     df = questions_df.copy()
     
-    # Create tag mapping dictionary
-    tag_map = {}
-    for _, row in tags_df.iterrows():
-        tag_id = row['id']
-        tag_name = row['tag']
-        category = row.get('category', None)
-        code = row.get('code', None)
-        
-        tag_map[tag_id] = {
-            'tag_name': tag_name,
-            'category': category,
-            'code': code
-        }
-    
-    # Parse tag IDs and create tag columns
-    df['tag_ids'] = df['tags'].apply(parse_tag_ids)
-    df['tag_names'] = df['tag_ids'].apply(
-        lambda ids: [tag_map.get(id, {}).get('tag_name', f'Unknown_{id}') for id in ids]
-    )
-    df['tag_categories'] = df['tag_ids'].apply(
-        lambda ids: [tag_map.get(id, {}).get('category', None) for id in ids if tag_map.get(id, {}).get('category')]
-    )
-    df['tag_codes'] = df['tag_ids'].apply(
-        lambda ids: [tag_map.get(id, {}).get('code', None) for id in ids if tag_map.get(id, {}).get('code')]
-    )
+    # Tag lookup table (last row wins for duplicate ids)
+    tag_table = pd.DataFrame({
+        'tag_id': tags_df['id'],
+        'tag_name': tags_df['tag'],
+        'category': tags_df['category'] if 'category' in tags_df.columns else None,
+        'code': tags_df['code'] if 'code' in tags_df.columns else None,
+        'known': True
+    }).drop_duplicates('tag_id', keep='last')
+    
+    # Tag lists depend only on the tags string, so parse and join each
+    # distinct value once and fan the results out to rows afterwards
+    # (parse_tag_ids stringifies its input, so str() keys are exact)
+    codes, unique_tags = pd.factorize(np.array([str(v) for v in df['tags']], dtype=object))
+    unique_ids = [parse_tag_ids(v) for v in unique_tags]
+    
+    # Explode to one row per (distinct tags value, tag id)
+    counts = np.fromiter(map(len, unique_ids), dtype=np.int64, count=len(unique_ids))
+    pairs = pd.DataFrame({
+        'row': np.repeat(np.arange(len(unique_ids)), counts),
+        'tag_id': np.fromiter(chain.from_iterable(unique_ids), dtype=np.int64, count=counts.sum())
+    })
+    
+    # Join against the tag table; a left merge keeps rows in order
+    joined = pairs.merge(tag_table, on='tag_id', how='left', sort=False)
+    
+    # Unknown ids get a placeholder name; their category/code are dropped,
+    # as are falsy category/code values of known tags
+    known = joined['known'].notna()
+    unknown_ids = joined.loc[~known, 'tag_id'].astype(str)
+    joined['tag_name'] = joined['tag_name'].astype(object)
+    joined.loc[~known, 'tag_name'] = 'Unknown_' + unknown_ids
+    
+    # Aggregate back by slicing the ordered rows with per-value counts
+    rows = pairs['row'].to_numpy()
+    aggregated = {
+        'tag_ids': unique_ids,
+        'tag_names': _split_by_counts(joined['tag_name'].tolist(), counts)
+    }
+    for col, target in [('category', 'tag_categories'), ('code', 'tag_codes')]:
+        values = joined[col].astype(object)
+        keep = (known & values.map(bool, na_action=None)).to_numpy()
+        aggregated[target] = _split_by_counts(
+            values[keep].tolist(), np.bincount(rows[keep], minlength=len(unique_ids))
+        )
+    
+    # Fan out with a fresh list per row so rows never share list objects
+    for col, per_value in aggregated.items():
+        df[col] = [list(per_value[code]) for code in codes]
     
     # Get primary category from category_id
-    category_map = {}
-    for _, row in tags_df.iterrows():
-        if pd.notna(row.get('id.1')):
-            cat_id = int(row['id.1'])
-            category_map[cat_id] = row.get('category', None)
+    category_rows = tags_df[tags_df['id.1'].notna()] if 'id.1' in tags_df.columns else tags_df.iloc[0:0]
+    category_map = dict(zip(
+        category_rows['id.1'].astype(int),
+        category_rows['category'] if 'category' in category_rows.columns else [None] * len(category_rows)
+    ))
     
     df['primary_category'] = df['category_id'].map(category_map)
     
@@ -158,16 +207,122 @@ def create_combined_text(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def load_and_prepare_data(excel_path: str = "ninouk2.xlsx") -> pd.DataFrame:
+def compute_file_hash(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute SHA-256 hash of a file's content.
+    
+    Args:
+        file_path: Path to file
+        chunk_size: Bytes read per chunk
+        
+    Returns:
+        Hex digest of file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_cache_path(excel_path: str, cache_dir: str = DEFAULT_CACHE_DIR) -> Path:
+    """
+    Get cache file path for an Excel file, keyed by content hash and loader version.
+    
+    Args:
+        excel_path: Path to Excel file
+        cache_dir: Directory holding cache files
+        
+    Returns:
+        Path to the Arrow cache file
+    """
+    content_hash = compute_file_hash(excel_path)
+    return Path(cache_dir) / f"prepared_v{LOADER_VERSION}_{content_hash[:32]}.arrow"
+
+
+def save_prepared_cache(df: pd.DataFrame, cache_path: Path) -> None:
+    """
+    Save prepared dataframe to an uncompressed Arrow (Feather v2) file.
+    
+    Mixed-type object columns (e.g. 'tags', which holds both ints and strings)
+    are stored as strings; list columns are stored as Arrow list columns.
+    
+    Args:
+        df: Prepared questions dataframe
+        cache_path: Output cache file path
+    """
+    table_df = df.reset_index(drop=True)
+    for col in table_df.columns:
+        if col in LIST_COLUMNS or table_df[col].dtype != object:
+            continue
+        table_df[col] = table_df[col].map(lambda v: str(v) if pd.notna(v) else None)
+    
+    table = pa.Table.from_pandas(table_df, preserve_index=False)
+    
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(f".tmp{os.getpid()}")
+    feather.write_feather(table, str(tmp_path), compression='uncompressed')
+    os.replace(tmp_path, cache_path)
+
+
+def load_prepared_cache(cache_path: Path) -> pd.DataFrame:
+    """
+    Load prepared dataframe from an Arrow cache file using memory-mapping.
+    
+    Args:
+        cache_path: Cache file path
+        
+    Returns:
+        Prepared questions dataframe
+    """
+    table = feather.read_table(str(cache_path), memory_map=True)
+    list_columns = [c for c in LIST_COLUMNS if c in table.column_names]
+    df = table.drop_columns(list_columns).to_pandas()
+    
+    # Restore list columns as Python lists (NaN entries come back as nulls)
+    for col in list_columns:
+        values = table.column(col).to_pylist()
+        df[col] = [[float('nan') if v is None else v for v in row] for row in values]
+    
+    return df[table.column_names]
+
+
+def load_and_prepare_data(excel_path: str = "ninouk2.xlsx",
+                          use_cache: bool = True,
+                          cache_dir: str = DEFAULT_CACHE_DIR) -> pd.DataFrame:
     """
     Complete data loading and preparation pipeline.
     
+    The prepared dataframe is cached as an Arrow file keyed by the Excel
+    content hash and LOADER_VERSION, so unchanged workbooks skip parsing
+    and preparation on later runs.
+    
     Args:
         excel_path: Path to Excel file
+        use_cache: Whether to read/write the prepared data cache
+        cache_dir: Directory holding cache files
         
     Returns:
         Fully prepared dataframe with all metadata
     """
+    if not Path(excel_path).exists():
+        raise FileNotFoundError(f"Excel file not found: {excel_path}")
+    
+    if use_cache and feather is None:
+        print("pyarrow not installed, prepared data cache disabled")
+        use_cache = False
+    
+    cache_path = None
+    if use_cache:
+        cache_path = get_cache_path(excel_path, cache_dir)
+        if cache_path.exists():
+            try:
+                questions_df = load_prepared_cache(cache_path)
+                print(f"Loaded {len(questions_df)} prepared questions from cache {cache_path}")
+                return questions_df
+            except (OSError, pa.ArrowException) as e:
+                print(f"Warning: Could not read cache {cache_path}: {e}")
+    
     print(f"Loading data from {excel_path}...")
     questions_df, tags_df = load_excel_data(excel_path)
     
@@ -187,5 +342,12 @@ def load_and_prepare_data(excel_path: str = "ninouk2.xlsx") -> pd.DataFrame:
     
     print(f"Data preparation complete. Final dataset: {len(questions_df)} questions")
     
+    if cache_path is not None:
+        try:
+            save_prepared_cache(questions_df, cache_path)
+            print(f"Prepared data cached to {cache_path}")
+        except (OSError, pa.ArrowException) as e:
+            print(f"Warning: Could not write cache {cache_path}: {e}")
+    
     return questions_df
 
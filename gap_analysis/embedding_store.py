@@ -0,0 +1,218 @@
+"""Persistent, content-addressed embedding store (memory-mapped matrix + hash index)."""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Sequence
+import numpy as np
+
+
+DEFAULT_EMBEDDING_STORE_DIR = "outputs/cache/embeddings"
+
+# Storage precisions; vectors are always returned as float32
+EMBEDDING_DTYPES = ['float32', 'float16']
+
+_KEY_SIZE = 16
+
+
+def text_key(text: str) -> bytes:
+    """Hash a text for the store index (the model is part of the store scope)."""
+    return hashlib.blake2b(str(text).encode('utf-8'), digest_size=_KEY_SIZE).digest()
+
+
+def store_scope(model_name: str, normalize: bool = False, dtype: str = 'float32') -> str:
+    """
+    Name the store directory for a model and embedding settings.
+    
+    Args:
+        model_name: Embedding model name
+        normalize: Whether vectors are normalized to unit length
+        dtype: Storage precision
+    
+    Returns:
+        Directory name
+    """
+    safe_name = re.sub(r'[^\w.-]+', '_', model_name)
+    return f"{safe_name}-{'norm' if normalize else 'raw'}-{dtype}"
+
+
+def _map_vectors(store: Dict[str, Any]) -> None:
+    """(Re)open the memory map over the stored rows."""
+    rows = store['meta']['rows']
+    dim = store['meta']['dim']
+    if rows and dim:
+        store['vectors'] = np.memmap(store['path'] / 'vectors.bin', dtype=store['meta']['dtype'],
+                                     mode='r', shape=(rows, dim))
+    else:
+        store['vectors'] = None
+
+
+def _write_meta(store: Dict[str, Any]) -> None:
+    """Write metadata atomically; it decides how many appended rows are valid."""
+    tmp_path = store['path'] / 'meta.json.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(store['meta'], f)
+    os.replace(tmp_path, store['path'] / 'meta.json')
+
+
+def open_embedding_store(model_name: str, normalize: bool = False, dtype: str = 'float32',
+                         store_dir: str = DEFAULT_EMBEDDING_STORE_DIR) -> Dict[str, Any]:
+    """
+    Open (or create) the embedding store for a model and settings.
+    
+    Vectors live in one raw matrix file that is memory-mapped on open; keys
+    are kept in a parallel file and loaded into a hash -> row dictionary.
+    Rows beyond the count in meta.json (an interrupted append) are ignored
+    and overwritten by the next append.
+    
+    Args:
+        model_name: Embedding model name
+        normalize: Whether vectors are normalized to unit length
+        dtype: Storage precision, 'float32' or 'float16'
+        store_dir: Root directory of embedding stores
+    
+    Returns:
+        Store dict with 'path', 'meta', 'index' (key -> row) and 'vectors'
+    """
+    if dtype not in EMBEDDING_DTYPES:
+        raise ValueError(f"Unknown embedding dtype '{dtype}', expected one of {EMBEDDING_DTYPES}")
+    
+    path = Path(store_dir) / store_scope(model_name, normalize, dtype)
+    path.mkdir(parents=True, exist_ok=True)
+    
+    meta = {'model': model_name, 'normalize': normalize, 'dtype': dtype, 'dim': 0, 'rows': 0}
+    if (path / 'meta.json').exists():
+        with open(path / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    
+    index = {}
+    if meta['rows']:
+        with open(path / 'keys.bin', 'rb') as f:
+            keys = f.read(meta['rows'] * _KEY_SIZE)
+        for row in range(meta['rows']):
+            index[keys[row * _KEY_SIZE:(row + 1) * _KEY_SIZE]] = row
+    
+    store = {'path': path, 'meta': meta, 'index': index}
+    _map_vectors(store)
+    return store
+
+
+def get_embeddings(store: Dict[str, Any], keys: Sequence[bytes]) -> np.ndarray:
+    """
+    Read stored vectors for keys (all keys must be stored).
+    
+    Args:
+        store: Embedding store
+        keys: Text keys
+    
+    Returns:
+        float32 array with one row per key
+    """
+    if not keys:
+        return np.zeros((0, store['meta']['dim']), dtype=np.float32)
+    rows = np.fromiter((store['index'][key] for key in keys), dtype=np.int64, count=len(keys))
+    return np.asarray(store['vectors'][rows], dtype=np.float32)
+
+
+def append_embeddings(store: Dict[str, Any], keys: Sequence[bytes], vectors: np.ndarray) -> None:
+    """
+    Append vectors for new keys and remap the store.
+    
+    Args:
+        store: Embedding store
+        keys: Text keys not yet stored
+        vectors: Array with one row per key
+    """
+    if not keys:
+        return
+    
+    meta = store['meta']
+    vectors = np.ascontiguousarray(vectors, dtype=meta['dtype'])
+    if meta['dim'] and vectors.shape[1] != meta['dim']:
+        raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match store dimension {meta['dim']}")
+    
+    # Drop any rows left by an interrupted append before writing
+    rows = meta['rows']
+    store['vectors'] = None
+    with open(store['path'] / 'vectors.bin', 'ab') as f:
+        f.truncate(rows * vectors.shape[1] * vectors.itemsize)
+        f.write(vectors.tobytes())
+    with open(store['path'] / 'keys.bin', 'ab') as f:
+        f.truncate(rows * _KEY_SIZE)
+        f.write(b''.join(keys))
+    
+    for offset, key in enumerate(keys):
+        store['index'][key] = rows + offset
+    meta['dim'] = int(vectors.shape[1])
+    meta['rows'] = rows + len(keys)
+    _write_meta(store)
+    _map_vectors(store)
+
+
+def compact_embedding_store(store: Dict[str, Any], keep_keys: Optional[Sequence[bytes]] = None) -> int:
+    """
+    Rewrite the store with only the kept keys (e.g. texts still in the corpus).
+    
+    Args:
+        store: Embedding store
+        keep_keys: Keys to keep (default: all stored keys)
+    
+    Returns:
+        Number of dropped rows
+    """
+    index = store['index']
+    keys = list(dict.fromkeys(key for key in (keep_keys if keep_keys is not None else index) if key in index))
+    dropped = store['meta']['rows'] - len(keys)
+    if dropped == 0:
+        return 0
+    
+    vectors = np.asarray(store['vectors'][[index[key] for key in keys]]) if keys else None
+    path = store['path']
+    store['vectors'] = None
+    with open(path / 'vectors.bin.tmp', 'wb') as f:
+        if vectors is not None:
+            f.write(np.ascontiguousarray(vectors).tobytes())
+    with open(path / 'keys.bin.tmp', 'wb') as f:
+        f.write(b''.join(keys))
+    
+    # Shrink meta first: a crash before both files are replaced then only
+    # hides rows instead of exposing mismatched ones
+    store['meta']['rows'] = 0
+    _write_meta(store)
+    os.replace(path / 'vectors.bin.tmp', path / 'vectors.bin')
+    os.replace(path / 'keys.bin.tmp', path / 'keys.bin')
+    
+    store['index'] = {key: row for row, key in enumerate(keys)}
+    store['meta']['rows'] = len(keys)
+    _write_meta(store)
+    _map_vectors(store)
+    
+    return dropped
+
+
+def embed_with_store(texts: List[str], store: Dict[str, Any], encode) -> np.ndarray:
+    """
+    Get embeddings for texts, encoding and storing only unseen ones.
+    
+    Args:
+        texts: List of text strings
+        store: Embedding store
+        encode: Function mapping a list of texts to an embedding array
+    
+    Returns:
+        float32 array with one row per text
+    """
+    keys = [text_key(text) for text in texts]
+    
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in store['index'] and key not in missing:
+            missing[key] = text
+    
+    print(f"Embedding store: encoding {len(missing)} new of {len(set(keys))} unique texts")
+    if missing:
+        append_embeddings(store, list(missing), encode(list(missing.values())))
+    
+    return get_embeddings(store, keys)
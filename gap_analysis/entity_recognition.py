@@ -4,19 +4,76 @@ import pandas as pd
 import json
 from pathlib import Path
 from collections import Counter, defaultdict
-from typing import Dict, List, Any, Set
-import spacy
+from typing import Dict, List, Any, Set, Iterator, Tuple, Optional
+import sqlite3
+from .ner_cache import (
+    open_ner_cache, get_model_key, text_key, lookup_entities, store_entities, evict_ner_cache,
+    DEFAULT_NER_CACHE_PATH, DEFAULT_NER_CACHE_MAX_BYTES
+)
+from .gazetteer import load_reference_lists, build_gazetteer, match_gazetteer, fold_text, DEFAULT_REFERENCE_DIR
 
+try:
+    import spacy
+except ImportError:  # Gazetteer matching still works without spaCy
+    spacy = None
 
-def load_spacy_model():
-    """Load spaCy English model."""
+
+# Text columns scanned for entities, question first
+ENTITY_TEXT_COLUMNS = ['QEN', 'ACEN', 'AW1EN', 'AW2EN']
+
+# Pipeline components that do not affect doc.ents
+NER_DISABLED_COMPONENTS = ['tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter', 'morphologizer']
+
+# Shared embedding components; disabled as well once no enabled component
+# listens to them (ner in en_core_web_sm/md/lg embeds its own tok2vec)
+SHARED_EMBEDDING_COMPONENTS = ['tok2vec', 'transformer']
+
+# Entity engines: 'spacy' (NER labels), 'gazetteer' (reference-list matching)
+# or 'auto' (spaCy, falling back to the gazetteer when the model is unavailable)
+ENTITY_ENGINES = ['auto', 'spacy', 'gazetteer']
+
+# Alternative names per canonical reference name (e.g. USA -> United States)
+DEFAULT_ALIASES_PATH = "data/entity_aliases.json"
+
+# Shortest alias the gazetteer matches in running text; once case is folded,
+# shorter ones read as common words ('US' -> 'us')
+MIN_GAZETTEER_ALIAS_LENGTH = 3
+
+# Character n-gram size of the fuzzy candidate index
+_FUZZY_GRAM_SIZE = 3
+
+
+def load_spacy_model(ner_only: bool = True):
+    """
+    Load spaCy English model.
+    
+    Args:
+        ner_only: Disable components that entity extraction does not need
+    
+    Returns:
+        spaCy model
+    """
+    if spacy is None:
+        raise ImportError("spaCy is not installed")
+    
     try:
         nlp = spacy.load("en_core_web_sm")
-        return nlp
     except OSError:
         print("spaCy model 'en_core_web_sm' not found. Please install it:")
         print("python -m spacy download en_core_web_sm")
         raise
+    
+    if ner_only:
+        for name in NER_DISABLED_COMPONENTS:
+            if name in nlp.pipe_names:
+                nlp.disable_pipe(name)
+        for name in SHARED_EMBEDDING_COMPONENTS:
+            if name in nlp.pipe_names:
+                listeners = getattr(nlp.get_pipe(name), 'listening_components', [])
+                if not any(listener in nlp.pipe_names for listener in listeners):
+                    nlp.disable_pipe(name)
+    
+    return nlp
 
 
 def extract_entities(text: str, nlp) -> Dict[str, List[str]]:
@@ -42,44 +99,170 @@ def extract_entities(text: str, nlp) -> Dict[str, List[str]]:
     return entities
 
 
-def extract_all_entities(df: pd.DataFrame, nlp) -> Dict[str, Any]:
+def iter_entity_texts(df: pd.DataFrame) -> Iterator[Tuple[str, Tuple[int, str]]]:
     """
-    Extract entities from all questions and answers.
+    Yield non-empty texts in row order (question, then its answers).
+    
+    Args:
+        df: Questions dataframe
+    
+    Returns:
+        Iterator of (text, (row position, column)) tuples
+    """
+    columns = [col for col in ENTITY_TEXT_COLUMNS if col in df.columns]
+    for position, values in enumerate(zip(*(df[col] for col in columns))):
+        for col, text in zip(columns, values):
+            if pd.isna(text) or text == "":
+                continue
+            yield str(text), (position, col)
+
+
+def count_unique_texts(df: pd.DataFrame) -> Tuple[List[str], Counter, Counter]:
+    """
+    Deduplicate question and answer texts.
     
     Args:
         df: Questions dataframe
+    
+    Returns:
+        Tuple of (unique texts in order of first occurrence, occurrences of each
+        unique text id as a question, occurrences as an answer); the Counters
+        are ordered by first occurrence in questions / answers
+    """
+    unique_ids = {}
+    question_counts = Counter()
+    answer_counts = Counter()
+    
+    for text, (_, col) in iter_entity_texts(df):
+        text_id = unique_ids.setdefault(text, len(unique_ids))
+        if col == 'QEN':
+            question_counts[text_id] += 1
+        else:
+            answer_counts[text_id] += 1
+    
+    return list(unique_ids), question_counts, answer_counts
+
+
+def extract_unique_entities(texts: List[str], nlp, batch_size: int = 256,
+                            n_process: int = 1) -> List[List[Tuple[str, str]]]:
+    """
+    Run NER once per text.
+    
+    Args:
+        texts: Texts to process
         nlp: spaCy model
-        
+        batch_size: Texts per nlp.pipe batch
+        n_process: Worker processes for nlp.pipe
+    
     Returns:
-        Dictionary with entity analysis
+        List of (label, entity text) pairs per text, in document order
     """
-    total = len(df)
-    print(f"Extracting entities from {total} questions and answers...")
-    print("This may take several minutes. Progress will be shown every 1000 questions...")
+    total = len(texts)
+    text_entities = []
+    
+    for i, doc in enumerate(nlp.pipe(texts, batch_size=batch_size, n_process=n_process)):
+        if (i + 1) % 1000 == 0:
+            print(f"  Processed {i + 1}/{total} unique texts ({(i+1)/total*100:.1f}%)...")
+        text_entities.append([(ent.label_, ent.text) for ent in doc.ents])
+    
+    return text_entities
+
+
+def extract_entities_cached(texts: List[str], nlp, batch_size: int = 256, n_process: int = 1,
+                            cache_path: str = DEFAULT_NER_CACHE_PATH,
+                            cache_max_bytes: int = DEFAULT_NER_CACHE_MAX_BYTES) -> List[List[Tuple[str, str]]]:
+    """
+    Run NER on texts, reusing results cached by previous runs.
+    
+    Cache entries are keyed by a hash of the text plus spaCy and model version,
+    so only new or changed texts go through NER.
     
+    Args:
+        texts: Unique texts to process
+        nlp: spaCy model
+        batch_size: Texts per nlp.pipe batch
+        n_process: Worker processes for nlp.pipe
+        cache_path: Path to the SQLite cache file
+        cache_max_bytes: Approximate size budget of the cache, least recently used entries are evicted
+    
+    Returns:
+        List of (label, entity text) pairs per text, in document order
+    """
+    try:
+        conn = open_ner_cache(cache_path)
+    except sqlite3.Error as e:
+        print(f"Warning: Could not open NER cache {cache_path}: {e}")
+        return extract_unique_entities(texts, nlp, batch_size=batch_size, n_process=n_process)
+    
+    try:
+        model_key = get_model_key(nlp)
+        keys = [text_key(model_key, text) for text in texts]
+        cached = lookup_entities(conn, keys)
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        print(f"NER cache: {len(texts) - len(missing)} cached, {len(missing)} new or changed texts")
+        
+        new_entities = extract_unique_entities([texts[i] for i in missing], nlp,
+                                               batch_size=batch_size, n_process=n_process)
+        for i, spans in zip(missing, new_entities):
+            cached[keys[i]] = spans
+        
+        try:
+            store_entities(conn, [(keys[i], spans) for i, spans in zip(missing, new_entities)])
+            evicted = evict_ner_cache(conn, cache_max_bytes)
+            if evicted:
+                print(f"Evicted {evicted} least recently used NER cache entries")
+        except sqlite3.Error as e:
+            print(f"Warning: Could not update NER cache {cache_path}: {e}")
+        
+        return [cached[key] for key in keys]
+    finally:
+        conn.close()
+
+
+def fan_out_entities(target: Dict[str, Counter],
+                     text_entities: List[List[Tuple[str, str]]],
+                     occurrences: Dict[int, int]) -> None:
+    """
+    Add entities of unique texts to per-type Counters, weighted by occurrences.
+    
+    Visiting text ids in order of first occurrence keeps the Counter order of
+    counting every occurrence one by one.
+    
+    Args:
+        target: Dictionary of entity type to Counter, updated in place
+        text_entities: Entities per unique text id
+        occurrences: Occurrence count per text id, in order of first occurrence
+    """
+    for text_id, count in occurrences.items():
+        for label, entity in text_entities[text_id]:
+            target[label][entity] += count
+
+
+def count_entities_by_role(text_entities: List[List[Tuple[str, str]]],
+                           question_counts: Counter,
+                           answer_counts: Counter) -> Dict[str, Any]:
+    """
+    Build question, answer and overall entity Counters from per-text entities.
+    
+    Args:
+        text_entities: (label, entity) pairs per unique text id
+        question_counts: Occurrences of each text id as a question
+        answer_counts: Occurrences of each text id as an answer
+    
+    Returns:
+        Dictionary with 'all_entities', 'question_entities' and 'answer_entities'
+    """
     all_entities = defaultdict(lambda: Counter())
     question_entities = defaultdict(lambda: Counter())
     answer_entities = defaultdict(lambda: Counter())
     
-    # Extract from questions
-    for idx, row in df.iterrows():
-        if (idx + 1) % 1000 == 0:
-            print(f"  Processed {idx + 1}/{total} questions ({(idx+1)/total*100:.1f}%)...")
-        
-        q_entities = extract_entities(row.get('QEN', ''), nlp)
-        for ent_type, ent_list in q_entities.items():
-            question_entities[ent_type].update(ent_list)
-            all_entities[ent_type].update(ent_list)
-        
-        # Extract from answers
-        for col in ['ACEN', 'AW1EN', 'AW2EN']:
-            if col in row:
-                a_entities = extract_entities(row[col], nlp)
-                for ent_type, ent_list in a_entities.items():
-                    answer_entities[ent_type].update(ent_list)
-                    all_entities[ent_type].update(ent_list)
+    # Text ids are numbered by first occurrence overall
+    all_counts = {text_id: question_counts[text_id] + answer_counts[text_id]
+                  for text_id in range(len(text_entities))}
     
-    print(f"✓ Completed entity extraction for all {total} questions")
+    fan_out_entities(question_entities, text_entities, question_counts)
+    fan_out_entities(answer_entities, text_entities, answer_counts)
+    fan_out_entities(all_entities, text_entities, all_counts)
     
     return {
         'all_entities': dict(all_entities),
@@ -88,6 +271,69 @@ def extract_all_entities(df: pd.DataFrame, nlp) -> Dict[str, Any]:
     }
 
 
+def extract_all_entities(df: pd.DataFrame, nlp, batch_size: int = 256, n_process: int = 1,
+                         use_cache: bool = True, cache_path: str = DEFAULT_NER_CACHE_PATH) -> Dict[str, Any]:
+    """
+    Extract entities from all questions and answers.
+    
+    NER runs once per unique text (answers and wrong answers repeat heavily);
+    entity counts are then fanned out by occurrence, so results match
+    processing every row one by one.
+    
+    Args:
+        df: Questions dataframe
+        nlp: spaCy model
+        batch_size: Texts per nlp.pipe batch
+        n_process: Worker processes for nlp.pipe
+        use_cache: Whether to reuse NER results cached on disk by previous runs
+        cache_path: Path to the SQLite NER cache
+    
+    Returns:
+        Dictionary with entity analysis
+    """
+    total = len(df)
+    print(f"Extracting entities from {total} questions and answers...")
+    
+    texts, question_counts, answer_counts = count_unique_texts(df)
+    num_occurrences = sum(question_counts.values()) + sum(answer_counts.values())
+    print(f"Running NER on {len(texts)} unique texts ({num_occurrences} occurrences)...")
+    print("This may take several minutes. Progress will be shown every 1000 texts...")
+    
+    if use_cache:
+        text_entities = extract_entities_cached(texts, nlp, batch_size=batch_size, n_process=n_process,
+                                                cache_path=cache_path)
+    else:
+        text_entities = extract_unique_entities(texts, nlp, batch_size=batch_size, n_process=n_process)
+    
+    entity_data = count_entities_by_role(text_entities, question_counts, answer_counts)
+    
+    print(f"✓ Completed entity extraction for all {total} questions")
+    
+    return entity_data
+
+
+def extract_gazetteer_entities(df: pd.DataFrame, gazetteer: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Find reference-list names in all questions and answers.
+    
+    Entity labels are reference list names and entities are the reference
+    names as listed, so results plug into compare_entities_to_reference.
+    
+    Args:
+        df: Questions dataframe
+        gazetteer: Automaton from build_gazetteer
+    
+    Returns:
+        Dictionary with entity analysis
+    """
+    texts, question_counts, answer_counts = count_unique_texts(df)
+    print(f"Matching {len(gazetteer['patterns'])} reference names in {len(texts)} unique texts...")
+    
+    text_entities = [match_gazetteer(gazetteer, text) for text in texts]
+    
+    return count_entities_by_role(text_entities, question_counts, answer_counts)
+
+
 def load_reference_list(file_path: str) -> List[str]:
     """Load reference list from JSON file."""
     with open(file_path, 'r') as f:
@@ -95,23 +341,213 @@ def load_reference_list(file_path: str) -> List[str]:
 
 
 def normalize_entity_name(name: str) -> str:
-    """Normalize entity name for comparison."""
-    return name.strip().lower()
+    """Normalize entity name for comparison: case, accents, punctuation and spacing."""
+    return ' '.join(fold_text(name))
+
+
+def load_entity_aliases(file_path: str = DEFAULT_ALIASES_PATH) -> Dict[str, List[str]]:
+    """
+    Load the alias table, a JSON object mapping canonical names to alternative names.
+    
+    Args:
+        file_path: Path to alias file
+    
+    Returns:
+        Dictionary mapping canonical name to aliases (empty if the file does not exist)
+    """
+    if not Path(file_path).exists():
+        return {}
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _char_grams(key: str) -> Set[str]:
+    """Distinct character n-grams of a normalized name, padded at both ends."""
+    padded = ' ' * (_FUZZY_GRAM_SIZE - 1) + key + ' ' * (_FUZZY_GRAM_SIZE - 1)
+    return {padded[i:i + _FUZZY_GRAM_SIZE] for i in range(len(padded) - _FUZZY_GRAM_SIZE + 1)}
+
+
+def bounded_edit_distance(a: str, b: str, max_edits: int) -> int:
+    """
+    Levenshtein distance between two strings, stopping early above max_edits.
+    
+    Args:
+        a: First string
+        b: Second string
+        max_edits: Largest distance of interest
+    
+    Returns:
+        Edit distance, or max_edits + 1 if it is larger than max_edits
+    """
+    limit = max_edits + 1
+    if abs(len(a) - len(b)) > max_edits:
+        return limit
+    
+    # Only cells within max_edits of the diagonal can stay below the limit
+    previous = [min(j, limit) for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [limit] * (len(b) + 1)
+        current[0] = min(i, limit)
+        char_a = a[i - 1]
+        for j in range(max(1, i - max_edits), min(len(b), i + max_edits) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != b[j - 1]), limit)
+        if min(current) >= limit:
+            return limit
+        previous = current
+    
+    return previous[-1]
+
+
+def build_entity_index(reference_list: List[str],
+                       aliases: Dict[str, List[str]] = None,
+                       max_edits: int = 1,
+                       min_fuzzy_length: int = 7) -> Dict[str, Any]:
+    """
+    Index a reference list for repeated lookups of extracted entity names.
+    
+    Names and aliases are normalized once into an exact-match table. Names of
+    at least min_fuzzy_length characters also go into a character n-gram
+    index, so that misspellings within max_edits edits ('Beyonse') are found
+    by verifying only candidates that share enough n-grams. Shorter names
+    match exactly only, since one edit often turns them into another name
+    (Iran / Iraq).
+    
+    Args:
+        reference_list: List of reference entities
+        aliases: Optional dictionary mapping canonical names to aliases;
+            canonical names not in reference_list are ignored
+        max_edits: Largest edit distance for fuzzy matches (0 disables them)
+        min_fuzzy_length: Shortest normalized name matched fuzzily
+    
+    Returns:
+        Dictionary with 'names', 'keys' (normalized names and aliases),
+        'key_ids' (key -> key id), 'key_refs' (reference positions per key)
+        and 'grams' (n-gram -> key ids)
+    """
+    keys = []
+    key_ids = {}
+    key_refs = []
+    
+    def add_key(key, ref_id):
+        if key not in key_ids:
+            key_ids[key] = len(keys)
+            keys.append(key)
+            key_refs.append([])
+        if ref_id not in key_refs[key_ids[key]]:
+            key_refs[key_ids[key]].append(ref_id)
+    
+    for ref_id, name in enumerate(reference_list):
+        key = normalize_entity_name(name)
+        if key:
+            add_key(key, ref_id)
+    
+    for canonical, alternatives in (aliases or {}).items():
+        key_id = key_ids.get(normalize_entity_name(canonical))
+        if key_id is None:
+            continue
+        for ref_id in list(key_refs[key_id]):
+            for alias in alternatives:
+                key = normalize_entity_name(alias)
+                if key:
+                    add_key(key, ref_id)
+    
+    grams = defaultdict(list)
+    if max_edits > 0:
+        for key_id, key in enumerate(keys):
+            if len(key) >= min_fuzzy_length:
+                for gram in _char_grams(key):
+                    grams[gram].append(key_id)
+    
+    return {
+        'names': list(reference_list),
+        'keys': keys,
+        'key_ids': key_ids,
+        'key_refs': key_refs,
+        'grams': dict(grams),
+        'max_edits': max_edits,
+        'min_fuzzy_length': min_fuzzy_length
+    }
+
+
+def match_entity_index(index: Dict[str, Any], names: List[str]) -> Dict[int, str]:
+    """
+    Look up many extracted names in an entity index.
+    
+    Exact and alias matches are resolved with one dictionary lookup per
+    distinct normalized name; only names without one are matched fuzzily,
+    and only against references not matched yet.
+    
+    Args:
+        index: Index from build_entity_index
+        names: Extracted entity names
+    
+    Returns:
+        Dictionary mapping matched reference positions to the first extracted
+        name that matched them
+    """
+    keys = index['keys']
+    key_ids = index['key_ids']
+    key_refs = index['key_refs']
+    grams = index['grams']
+    max_edits = index['max_edits']
+    
+    matched = {}
+    pending = {}
+    for name in names:
+        key = normalize_entity_name(name)
+        key_id = key_ids.get(key)
+        if key_id is not None:
+            for ref_id in key_refs[key_id]:
+                matched.setdefault(ref_id, name)
+        elif grams and len(key) >= index['min_fuzzy_length']:
+            pending.setdefault(key, name)
+    
+    for key, name in pending.items():
+        if len(matched) == len(index['names']):
+            break
+        
+        # Each edit changes at most n of the query's n-grams, so a key within
+        # max_edits edits shares at least one of any n * max_edits + 1 of
+        # them; probing the rarest ones keeps the candidate set small
+        query_grams = sorted(_char_grams(key), key=lambda gram: len(grams.get(gram, ())))
+        probe = _FUZZY_GRAM_SIZE * max_edits + 1
+        if len(query_grams) >= probe:
+            candidates = set(key_id for gram in query_grams[:probe] for key_id in grams.get(gram, ()))
+        else:
+            candidates = set(key_id for ids in grams.values() for key_id in ids)
+        
+        for key_id in sorted(candidates):
+            if abs(len(keys[key_id]) - len(key)) > max_edits:
+                continue
+            refs = [ref_id for ref_id in key_refs[key_id] if ref_id not in matched]
+            if refs and bounded_edit_distance(key, keys[key_id], max_edits) <= max_edits:
+                for ref_id in refs:
+                    matched[ref_id] = name
+    
+    return matched
 
 
 def compare_entities_to_reference(extracted_entities: Dict[str, Counter],
                                   reference_list: List[str],
-                                  entity_type: str = "GPE") -> Dict[str, Any]:
+                                  entity_type: str = "GPE",
+                                  index: Dict[str, Any] = None,
+                                  aliases: Dict[str, List[str]] = None) -> Dict[str, Any]:
     """
     Compare extracted entities against reference list.
     
+    Matching is case, accent and punctuation insensitive and accepts aliases
+    and small misspellings (see build_entity_index).
+    
     Args:
         extracted_entities: Dictionary of entity type to Counter
         reference_list: List of reference entities
         entity_type: Entity type to compare (e.g., 'GPE' for countries)
-        
+        index: Prebuilt index of reference_list (built here if not given)
+        aliases: Alias table used when building the index
+    
     Returns:
-        Dictionary with comparison results
+        Dictionary with comparison results; 'matched_as' maps references
+        found through an alias or fuzzy match to the extracted name
     """
     if entity_type not in extracted_entities:
         return {
@@ -119,14 +555,20 @@ def compare_entities_to_reference(extracted_entities: Dict[str, Counter],
             'missing': reference_list,
             'found_count': 0,
             'missing_count': len(reference_list),
-            'coverage_pct': 0.0
+            'coverage_pct': 0.0,
+            'matched_as': {}
         }
     
-    extracted = set(normalize_entity_name(e) for e in extracted_entities[entity_type].keys())
-    reference = set(normalize_entity_name(e) for e in reference_list)
+    if index is None:
+        index = build_entity_index(reference_list, aliases)
+    matched = match_entity_index(index, list(extracted_entities[entity_type].keys()))
     
-    found = [e for e in reference_list if normalize_entity_name(e) in extracted]
-    missing = [e for e in reference_list if normalize_entity_name(e) not in extracted]
+    found = [e for i, e in enumerate(reference_list) if i in matched]
+    missing = [e for i, e in enumerate(reference_list) if i not in matched]
+    matched_as = {
+        reference_list[i]: name for i, name in sorted(matched.items())
+        if normalize_entity_name(name) != normalize_entity_name(reference_list[i])
+    }
     
     coverage_pct = (len(found) / len(reference_list)) * 100 if reference_list else 0.0
     
@@ -135,23 +577,28 @@ def compare_entities_to_reference(extracted_entities: Dict[str, Counter],
         'missing': missing,
         'found_count': len(found),
         'missing_count': len(missing),
-        'coverage_pct': coverage_pct
+        'coverage_pct': coverage_pct,
+        'matched_as': matched_as
     }
 
 
-def analyze_entity_coverage(df: pd.DataFrame, nlp) -> Dict[str, Any]:
+def analyze_entity_coverage(df: pd.DataFrame, nlp, batch_size: int = 256, n_process: int = 1,
+                            use_cache: bool = True) -> Dict[str, Any]:
     """
     Complete entity coverage analysis.
     
     Args:
         df: Questions dataframe
         nlp: spaCy model
-        
+        batch_size: Texts per nlp.pipe batch
+        n_process: Worker processes for nlp.pipe
+        use_cache: Whether to reuse NER results cached on disk
+    
     Returns:
         Dictionary with entity coverage analysis
     """
     # Extract entities
-    entity_data = extract_all_entities(df, nlp)
+    entity_data = extract_all_entities(df, nlp, batch_size=batch_size, n_process=n_process, use_cache=use_cache)
     
     # Load reference lists
     ref_dir = Path("data/reference_lists")
@@ -160,28 +607,29 @@ def analyze_entity_coverage(df: pd.DataFrame, nlp) -> Dict[str, Any]:
     artists_ref = load_reference_list(ref_dir / "top_artists.json")
     movies_ref = load_reference_list(ref_dir / "top_movies.json")
     brands_ref = load_reference_list(ref_dir / "top_brands.json")
+    aliases = load_entity_aliases()
     
     # Compare entities
     print("Comparing entities to reference lists...")
     
     # Countries (GPE - Geopolitical Entity)
     countries_comparison = compare_entities_to_reference(
-        entity_data['all_entities'], countries_ref, 'GPE'
+        entity_data['all_entities'], countries_ref, 'GPE', aliases=aliases
     )
     
     # Artists (PERSON or ORG)
     artists_comparison = compare_entities_to_reference(
-        entity_data['all_entities'], artists_ref, 'PERSON'
+        entity_data['all_entities'], artists_ref, 'PERSON', aliases=aliases
     )
     
     # Movies (WORK_OF_ART or PRODUCT)
     movies_comparison = compare_entities_to_reference(
-        entity_data['all_entities'], movies_ref, 'WORK_OF_ART'
+        entity_data['all_entities'], movies_ref, 'WORK_OF_ART', aliases=aliases
     )
     
     # Brands (ORG or PRODUCT)
     brands_comparison = compare_entities_to_reference(
-        entity_data['all_entities'], brands_ref, 'ORG'
+        entity_data['all_entities'], brands_ref, 'ORG', aliases=aliases
     )
     
     return {
@@ -193,6 +641,46 @@ def analyze_entity_coverage(df: pd.DataFrame, nlp) -> Dict[str, Any]:
     }
 
 
+def analyze_gazetteer_coverage(df: pd.DataFrame,
+                               reference_dir: str = DEFAULT_REFERENCE_DIR,
+                               extra_reference_paths: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Entity coverage analysis by matching reference lists directly (no NER model).
+    
+    A reference name counts as found when it or one of its aliases occurs as
+    a whole-word, case- and accent-insensitive match in any question or answer;
+    single-word names must be capitalised, so 'gap' or 'target' do not count.
+    
+    Args:
+        df: Questions dataframe
+        reference_dir: Directory with reference lists
+        extra_reference_paths: Additional reference list files
+    
+    Returns:
+        Dictionary with entity coverage analysis, one comparison per reference list
+    """
+    reference_lists = load_reference_lists(reference_dir, extra_reference_paths or [])
+    aliases = load_entity_aliases()
+    
+    # Aliases too short to match safely in running text are left to NER
+    text_aliases = {
+        name: [alias for alias in names if len(normalize_entity_name(alias)) >= MIN_GAZETTEER_ALIAS_LENGTH]
+        for name, names in aliases.items()
+    }
+    gazetteer = build_gazetteer(reference_lists, text_aliases)
+    
+    entity_data = extract_gazetteer_entities(df, gazetteer)
+    
+    print("Comparing entities to reference lists...")
+    coverage_analysis = {'entity_data': entity_data}
+    for list_name, names in reference_lists.items():
+        coverage_analysis[list_name] = compare_entities_to_reference(
+            entity_data['all_entities'], names, list_name, aliases=aliases
+        )
+    
+    return coverage_analysis
+
+
 def generate_entity_report(coverage_analysis: Dict[str, Any],
                            output_path: str = "outputs/entity_coverage.csv") -> pd.DataFrame:
     """
@@ -218,13 +706,10 @@ def generate_entity_report(coverage_analysis: Dict[str, Any],
                 'category': 'extracted'
             })
     
-    # Missing entities
-    for category, comparison in [
-        ('countries', coverage_analysis['countries']),
-        ('artists', coverage_analysis['artists']),
-        ('movies', coverage_analysis['movies']),
-        ('brands', coverage_analysis['brands'])
-    ]:
+    # Missing entities, for every compared reference list
+    comparisons = {category: comparison for category, comparison in coverage_analysis.items()
+                   if category != 'entity_data'}
+    for category, comparison in comparisons.items():
         for missing_entity in comparison['missing'][:20]:  # Top 20 missing
             rows.append({
                 'entity_type': category,
@@ -237,29 +722,52 @@ def generate_entity_report(coverage_analysis: Dict[str, Any],
     df.to_csv(output_path, index=False)
     
     print(f"Entity coverage report saved to {output_path}")
-    print(f"Countries coverage: {coverage_analysis['countries']['coverage_pct']:.1f}%")
-    print(f"Artists coverage: {coverage_analysis['artists']['coverage_pct']:.1f}%")
-    print(f"Movies coverage: {coverage_analysis['movies']['coverage_pct']:.1f}%")
-    print(f"Brands coverage: {coverage_analysis['brands']['coverage_pct']:.1f}%")
+    for category, comparison in comparisons.items():
+        print(f"{category.capitalize()} coverage: {comparison['coverage_pct']:.1f}%")
     
     return df
 
 
-def analyze_entities(df: pd.DataFrame) -> Dict[str, Any]:
+def analyze_entities(df: pd.DataFrame, batch_size: int = 256, n_process: int = 1,
+                     use_cache: bool = True, engine: str = 'auto',
+                     extra_reference_paths: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Complete entity recognition pipeline.
     
     Args:
         df: Questions dataframe
-        
+        batch_size: Texts per nlp.pipe batch
+        n_process: Worker processes for nlp.pipe
+        use_cache: Whether to reuse NER results cached on disk
+        engine: 'spacy', 'gazetteer' or 'auto' (spaCy, or the gazetteer when
+            the spaCy model cannot be loaded)
+        extra_reference_paths: Additional reference list files for the gazetteer
+    
     Returns:
         Dictionary with all entity analysis results
     """
+    if engine not in ENTITY_ENGINES:
+        raise ValueError(f"Unknown entity engine '{engine}', expected one of {ENTITY_ENGINES}")
+    
+    if engine == 'gazetteer':
+        coverage_analysis = analyze_gazetteer_coverage(df, extra_reference_paths=extra_reference_paths)
+        
+        print("Generating entity report...")
+        report_df = generate_entity_report(coverage_analysis)
+        
+        return {
+            'coverage_analysis': coverage_analysis,
+            'report_df': report_df
+        }
+    
     print("Loading spaCy model...")
     try:
         nlp = load_spacy_model()
     except Exception as e:
         print(f"⚠️  Warning: Could not load spaCy model: {e}")
+        if engine == 'auto':
+            print("   Falling back to reference-list gazetteer matching.")
+            return analyze_entities(df, engine='gazetteer', extra_reference_paths=extra_reference_paths)
         print("   Skipping entity recognition. Using reference lists only.")
         # Return empty structure so pipeline can continue
         return {
@@ -273,7 +781,8 @@ def analyze_entities(df: pd.DataFrame) -> Dict[str, Any]:
             'report_df': pd.DataFrame()
         }
     
-    coverage_analysis = analyze_entity_coverage(df, nlp)
+    coverage_analysis = analyze_entity_coverage(df, nlp, batch_size=batch_size, n_process=n_process,
+                                                use_cache=use_cache)
     
     print("Generating entity report...")
     report_df = generate_entity_report(coverage_analysis)
@@ -0,0 +1,194 @@
+"""Gazetteer entity matching with a word-level Aho-Corasick automaton."""
+
+import json
+import re
+import unicodedata
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Tuple, Any, Sequence, Optional
+
+
+DEFAULT_REFERENCE_DIR = "data/reference_lists"
+
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+def split_words(text: str) -> List[str]:
+    """Strip accents and split text into word tokens, keeping their case."""
+    text = str(text)
+    if not text.isascii():
+        text = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+    return _WORD_PATTERN.findall(text)
+
+
+def fold_text(text: str) -> List[str]:
+    """
+    Case-fold, strip accents and split text into word tokens.
+    
+    Names and texts are folded the same way, so matches are case and accent
+    insensitive, ignore punctuation and always fall on word boundaries.
+    
+    Args:
+        text: Input text
+    
+    Returns:
+        List of folded word tokens
+    """
+    return [word.casefold() for word in split_words(text)]
+
+
+def load_reference_lists(reference_dir: str = DEFAULT_REFERENCE_DIR,
+                         extra_paths: Sequence[str] = ()) -> Dict[str, List[str]]:
+    """
+    Load reference name lists: JSON arrays or text files with one name per line.
+    
+    Lists are keyed by file stem without a 'top_' prefix (top_countries.json
+    -> 'countries'); files with the same key are concatenated.
+    
+    Args:
+        reference_dir: Directory with *.json / *.txt reference lists
+        extra_paths: Additional list files
+    
+    Returns:
+        Dictionary mapping list name to reference names
+    """
+    ref_dir = Path(reference_dir)
+    paths = sorted(list(ref_dir.glob('*.json')) + list(ref_dir.glob('*.txt'))) if ref_dir.exists() else []
+    paths += [Path(p) for p in extra_paths]
+    
+    reference_lists = {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.suffix == '.json':
+                names = json.load(f)
+            else:
+                names = [line.strip() for line in f if line.strip()]
+        key = path.stem[4:] if path.stem.startswith('top_') else path.stem
+        reference_lists.setdefault(key, []).extend(names)
+    
+    return reference_lists
+
+
+def build_gazetteer(reference_lists: Dict[str, List[str]],
+                    aliases: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+    """
+    Compile reference names into one Aho-Corasick automaton over word tokens.
+    
+    Single-word names and aliases fold to ordinary words ('Gap', 'Target',
+    'Queen'), so they only match words that are capitalised in the text;
+    multi-word names match regardless of case.
+    
+    Args:
+        reference_lists: Dictionary mapping list name to names
+        aliases: Optional alias table mapping canonical names to alternative
+            names; a match of an alias reports its canonical name
+    
+    Returns:
+        Dictionary with 'goto' (token transitions per state), 'fail' (failure
+        links), 'outputs' (pattern ids ending at each state) and 'patterns'
+        ((list name, name) per pattern id) and 'capitalized' (ids of patterns
+        that only match capitalised words)
+    """
+    goto = [{}]
+    outputs = [[]]
+    patterns = []
+    capitalized = set()
+    
+    # Trie of folded names and aliases
+    aliases = aliases or {}
+    for list_name, names in reference_lists.items():
+        for name in names:
+            for variant in [name] + list(aliases.get(name, [])):
+                tokens = fold_text(variant)
+                if not tokens:
+                    continue
+                state = 0
+                for token in tokens:
+                    next_state = goto[state].get(token)
+                    if next_state is None:
+                        next_state = len(goto)
+                        goto[state][token] = next_state
+                        goto.append({})
+                        outputs.append([])
+                    state = next_state
+                # Variants that fold like the name itself match once
+                if (list_name, name) in [patterns[i] for i in outputs[state]]:
+                    continue
+                if len(tokens) == 1:
+                    capitalized.add(len(patterns))
+                outputs[state].append(len(patterns))
+                patterns.append((list_name, name))
+    
+    # Failure links in breadth-first order; outputs inherit those of their
+    # failure state so every match ending at a position is reported
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for token, next_state in goto[state].items():
+            queue.append(next_state)
+            f = fail[state]
+            while f and token not in goto[f]:
+                f = fail[f]
+            fail[next_state] = goto[f].get(token, 0)
+            outputs[next_state].extend(outputs[fail[next_state]])
+    
+    return {
+        'goto': goto,
+        'fail': fail,
+        'outputs': outputs,
+        'patterns': patterns,
+        'capitalized': capitalized
+    }
+
+
+def scan_gazetteer(gazetteer: Dict[str, Any], tokens: List[str],
+                   capitalized: Optional[List[bool]] = None) -> List[int]:
+    """
+    Find all reference names in a token sequence in one linear pass.
+    
+    Args:
+        gazetteer: Automaton from build_gazetteer
+        tokens: Folded tokens (see fold_text)
+        capitalized: Whether each token was capitalised in the text; when
+            given, single-word names only match capitalised tokens
+    
+    Returns:
+        Pattern ids of all matches, including overlapping ones, in end order
+    """
+    goto = gazetteer['goto']
+    fail = gazetteer['fail']
+    outputs = gazetteer['outputs']
+    capitalized_only = gazetteer['capitalized']
+    
+    matches = []
+    state = 0
+    for i, token in enumerate(tokens):
+        while state and token not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(token, 0)
+        if outputs[state]:
+            if capitalized is None or capitalized[i]:
+                matches.extend(outputs[state])
+            else:
+                matches.extend(p for p in outputs[state] if p not in capitalized_only)
+    
+    return matches
+
+
+def match_gazetteer(gazetteer: Dict[str, Any], text: str) -> List[Tuple[str, str]]:
+    """
+    Find reference names in a text.
+    
+    Args:
+        gazetteer: Automaton from build_gazetteer
+        text: Input text
+    
+    Returns:
+        List of (list name, reference name) matches
+    """
+    patterns = gazetteer['patterns']
+    words = split_words(text)
+    tokens = [word.casefold() for word in words]
+    capitalized = [not word[0].islower() for word in words]
+    return [patterns[i] for i in scan_gazetteer(gazetteer, tokens, capitalized)]
@@ -0,0 +1,223 @@
+"""Streaming top-k n-gram counting with bounded-memory Space-Saving summaries."""
+
+import heapq
+from collections import Counter
+from typing import Dict, List, Tuple, Any, Optional, Iterable
+from nltk import ngrams
+from .tokenization import remove_masked
+
+
+# Default number of counters kept per summary
+DEFAULT_SKETCH_CAPACITY = 10000
+
+
+def new_space_saving(capacity: int = DEFAULT_SKETCH_CAPACITY, n: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Create an empty Space-Saving summary.
+    
+    A summary monitors at most capacity items. Each monitored count is an
+    overestimate of the true count by at most its 'errors' entry, and every
+    error is at most total / capacity.
+    
+    Args:
+        capacity: Maximum number of monitored items
+        n: Optional n-gram size, kept for reference
+    
+    Returns:
+        Summary dict with 'counts', 'errors', 'total' and a min-heap of counts
+    """
+    return {
+        'n': n,
+        'capacity': capacity,
+        'total': 0,
+        'counts': {},
+        'errors': {},
+        'heap': []
+    }
+
+
+def _pop_min(summary: Dict[str, Any]) -> Tuple[int, Any]:
+    """Remove and return the monitored item with the smallest count."""
+    counts = summary['counts']
+    heap = summary['heap']
+    while True:
+        count, item = heapq.heappop(heap)
+        # Heap entries go stale when counts grow; refresh and retry
+        if counts[item] == count:
+            return count, item
+        heapq.heappush(heap, (counts[item], item))
+
+
+def space_saving_update(summary: Dict[str, Any], items: Iterable[Any]) -> None:
+    """
+    Add a stream of items to a summary in place.
+    
+    Args:
+        summary: Space-Saving summary
+        items: Items to count (e.g. n-gram tuples)
+    """
+    counts = summary['counts']
+    errors = summary['errors']
+    heap = summary['heap']
+    capacity = summary['capacity']
+    added = 0
+    
+    for item in items:
+        added += 1
+        if item in counts:
+            counts[item] += 1
+        elif len(counts) < capacity:
+            counts[item] = 1
+            errors[item] = 0
+            heapq.heappush(heap, (1, item))
+        else:
+            # Replace the minimum; the new item inherits its count as error
+            min_count, evicted = _pop_min(summary)
+            del counts[evicted]
+            del errors[evicted]
+            counts[item] = min_count + 1
+            errors[item] = min_count
+            heapq.heappush(heap, (min_count + 1, item))
+    
+    summary['total'] += added
+
+
+def build_space_saving_summaries(token_rows: List[List[str]],
+                                 mask_rows: List[List[bool]],
+                                 n_values: List[int] = [1, 2, 3],
+                                 capacity: int = DEFAULT_SKETCH_CAPACITY) -> Dict[int, Dict[str, Any]]:
+    """
+    Stream n-grams of pre-tokenized rows into one Space-Saving summary per n.
+    
+    Unigrams use all tokens; longer n-grams skip stopword-masked tokens.
+    
+    Args:
+        token_rows: Tokens per row
+        mask_rows: Stopword masks per row
+        n_values: List of n values to extract
+        capacity: Counters kept per summary
+    
+    Returns:
+        Dictionary mapping n to its summary
+    """
+    summaries = {n: new_space_saving(capacity, n) for n in n_values}
+    
+    for tokens, mask in zip(token_rows, mask_rows):
+        content_tokens = None
+        for n in n_values:
+            if n > 1:
+                if content_tokens is None:
+                    content_tokens = remove_masked(tokens, mask)
+                row_tokens = content_tokens
+            else:
+                row_tokens = tokens
+            if len(row_tokens) >= n:
+                space_saving_update(summaries[n], ngrams(row_tokens, n))
+    
+    return summaries
+
+
+def _min_count(summary: Dict[str, Any]) -> int:
+    """Upper bound on the count of any unmonitored item."""
+    if len(summary['counts']) < summary['capacity']:
+        return 0
+    return min(summary['counts'].values())
+
+
+def merge_space_saving(summaries: List[Dict[str, Any]], capacity: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Merge summaries built on disjoint parts of a stream (chunks, machines).
+    
+    An item missing from a full summary is credited that summary's minimum
+    count as both count and error, so merged counts stay overestimates with
+    error at most total / capacity. Merging in stream order gives the same
+    result as one summary when no summary ever evicted.
+    
+    Args:
+        summaries: Summaries to merge, in stream order
+        capacity: Counters kept in the result (default: first summary's capacity)
+    
+    Returns:
+        Merged summary
+    """
+    if capacity is None:
+        capacity = summaries[0]['capacity']
+    
+    merged = new_space_saving(capacity, summaries[0]['n'])
+    merged['total'] = sum(summary['total'] for summary in summaries)
+    floors = [_min_count(summary) for summary in summaries]
+    
+    # Union of items, in order of first appearance
+    items = {}
+    for summary in summaries:
+        for item in summary['counts']:
+            items.setdefault(item, None)
+    
+    counts = {}
+    errors = {}
+    for item in items:
+        counts[item] = sum(summary['counts'].get(item, floor) for summary, floor in zip(summaries, floors))
+        errors[item] = sum(summary['errors'].get(item, floor) for summary, floor in zip(summaries, floors))
+    
+    if len(counts) > capacity:
+        kept = set(sorted(counts, key=counts.get, reverse=True)[:capacity])
+        counts = {item: count for item, count in counts.items() if item in kept}
+        errors = {item: errors[item] for item in counts}
+    
+    merged['counts'] = counts
+    merged['errors'] = errors
+    merged['heap'] = [(count, item) for item, count in counts.items()]
+    heapq.heapify(merged['heap'])
+    
+    return merged
+
+
+def space_saving_top(summary: Dict[str, Any], k: int = 50) -> List[Tuple[Any, int]]:
+    """
+    Get the k items with the largest estimated counts, like Counter.most_common(k).
+    
+    Args:
+        summary: Space-Saving summary
+        k: Number of items to return
+    
+    Returns:
+        List of (item, estimated count) tuples
+    """
+    return Counter(summary['counts']).most_common(k)
+
+
+def space_saving_bounds(summary: Dict[str, Any], k: int = 50) -> List[Dict[str, Any]]:
+    """
+    Get the top k items with their error bounds.
+    
+    The true count of each item lies in [count - error, count]. An item is
+    'guaranteed' to belong to the true top k when its lower bound is at least
+    the estimated count of the (k+1)-th item.
+    
+    Args:
+        summary: Space-Saving summary
+        k: Number of items to return
+    
+    Returns:
+        List of dicts with 'ngram', 'count', 'error', 'lower_bound', 'guaranteed'
+    """
+    top = space_saving_top(summary, k + 1)
+    threshold = top[k][1] if len(top) > k else _min_count(summary)
+    
+    bounds = []
+    for item, count in top[:k]:
+        error = summary['errors'][item]
+        bounds.append({
+            'ngram': item,
+            'count': count,
+            'error': error,
+            'lower_bound': count - error,
+            'guaranteed': count - error >= threshold
+        })
+    
+    return bounds
+
+
+def space_saving_to_counter(summary: Dict[str, Any]) -> Counter:
+    """Get estimated counts of the monitored items as a Counter."""
+    return Counter(summary['counts'])
@@ -0,0 +1,267 @@
+"""Near-duplicate question detection over question embeddings."""
+
+from typing import Dict, Any, Tuple, Optional
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+from sklearn.cluster import MiniBatchKMeans
+
+
+DEFAULT_DUPLICATE_THRESHOLD = 0.92
+
+# Search engines: exact blocked search over all pairs, or an inverted-file
+# index (k-means cells; each question is compared with the members of its
+# nearest cells). 'auto' uses the index from DEFAULT_INDEX_THRESHOLD questions on
+DUPLICATE_ENGINES = ['blocked', 'ivf', 'auto']
+DEFAULT_INDEX_THRESHOLD = 200000
+
+# Rows per side of a similarity tile (at most block_size^2 float32 values)
+DEFAULT_BLOCK_SIZE = 4096
+
+# Nearest cells searched per question by the inverted-file index
+DEFAULT_PROBES = 3
+
+
+def _unit_rows(embeddings: np.ndarray, rows) -> np.ndarray:
+    """Read rows (slice or positions) as float32 unit vectors."""
+    block = np.asarray(embeddings[rows], dtype=np.float32)
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    return block / np.maximum(norms, 1e-12)
+
+
+def _tile_pairs(row_ids: np.ndarray, row_vectors: np.ndarray,
+                col_ids: np.ndarray, col_vectors: np.ndarray,
+                threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pairs of distinct questions in one tile at or above the threshold, as (lower id, higher id, similarity)."""
+    tile = row_vectors @ col_vectors.T
+    i, j = np.nonzero(tile >= threshold)
+    a, b = row_ids[i], col_ids[j]
+    keep = a != b
+    return np.minimum(a, b)[keep], np.maximum(a, b)[keep], tile[i, j][keep]
+
+
+def find_pairs_blocked(embeddings: np.ndarray, threshold: float = DEFAULT_DUPLICATE_THRESHOLD,
+                       block_size: int = DEFAULT_BLOCK_SIZE) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find all question pairs with cosine similarity at or above the threshold.
+    
+    Similarities are computed tile by tile, only on and above the diagonal,
+    so memory stays at one tile however many questions there are.
+    
+    Args:
+        embeddings: Question embeddings (array or memory map)
+        threshold: Minimum cosine similarity
+        block_size: Rows per side of a tile
+    
+    Returns:
+        Tuple of (first positions, second positions, similarities), first < second
+    """
+    num_items = len(embeddings)
+    firsts, seconds, similarities = [], [], []
+    for start in range(0, num_items, block_size):
+        row_ids = np.arange(start, min(start + block_size, num_items))
+        row_vectors = _unit_rows(embeddings, slice(start, start + block_size))
+        for col_start in range(start, num_items, block_size):
+            col_ids = np.arange(col_start, min(col_start + block_size, num_items))
+            if col_start == start:
+                col_vectors = row_vectors
+            else:
+                col_vectors = _unit_rows(embeddings, slice(col_start, col_start + block_size))
+            first, second, similarity = _tile_pairs(row_ids, row_vectors, col_ids, col_vectors, threshold)
+            firsts.append(first)
+            seconds.append(second)
+            similarities.append(similarity)
+    
+    if not firsts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    
+    # Diagonal tiles report each pair twice
+    return _unique_pairs(np.concatenate(firsts), np.concatenate(seconds), np.concatenate(similarities), num_items)
+
+
+def find_pairs_indexed(embeddings: np.ndarray, threshold: float = DEFAULT_DUPLICATE_THRESHOLD,
+                       n_cells: Optional[int] = None, n_probes: int = DEFAULT_PROBES,
+                       block_size: int = DEFAULT_BLOCK_SIZE) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find question pairs above the threshold with an inverted-file index (approximate).
+    
+    Unit vectors are partitioned into k-means cells (sqrt(N) by default);
+    each question is compared with the members of its n_probes nearest
+    cells. A pair is found when either question's home cell is among the
+    other's probed cells, so near-duplicates split by a cell boundary are
+    still compared. Work grows with N * n_probes * cell size instead of N^2.
+    
+    Args:
+        embeddings: Question embeddings (array or memory map)
+        threshold: Minimum cosine similarity
+        n_cells: Number of cells (default: sqrt of the number of questions)
+        n_probes: Nearest cells searched per question
+        block_size: Rows per side of a tile
+    
+    Returns:
+        Tuple of (first positions, second positions, similarities), first < second
+    """
+    num_items = len(embeddings)
+    n_cells = max(1, min(n_cells or int(np.sqrt(num_items)), num_items))
+    n_probes = min(n_probes, n_cells)
+    
+    # Cells from a sample of at most 100 questions per cell
+    rng = np.random.default_rng(42)
+    sample = np.sort(rng.choice(num_items, size=min(num_items, 100 * n_cells), replace=False))
+    kmeans = MiniBatchKMeans(n_clusters=n_cells, random_state=42, batch_size=4096, n_init=1)
+    kmeans.fit(_unit_rows(embeddings, sample))
+    centroids = kmeans.cluster_centers_.astype(np.float32)
+    centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    
+    # Nearest cells per question, nearest first
+    probes = np.empty((num_items, n_probes), dtype=np.int64)
+    for start in range(0, num_items, block_size):
+        scores = _unit_rows(embeddings, slice(start, start + block_size)) @ centroids.T
+        top = np.argpartition(-scores, n_probes - 1, axis=1)[:, :n_probes]
+        order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+        probes[start:start + len(scores)] = np.take_along_axis(top, order, axis=1)
+    
+    home_rows = np.argsort(probes[:, 0], kind='stable')
+    home_bounds = np.searchsorted(probes[:, 0], np.arange(n_cells + 1), sorter=home_rows)
+    probe_rows = np.argsort(probes.ravel(), kind='stable')
+    probe_bounds = np.searchsorted(probes.ravel(), np.arange(n_cells + 1), sorter=probe_rows)
+    probe_rows //= n_probes
+    
+    firsts, seconds, similarities = [], [], []
+    for cell in range(n_cells):
+        members = home_rows[home_bounds[cell]:home_bounds[cell + 1]]
+        queries = probe_rows[probe_bounds[cell]:probe_bounds[cell + 1]]
+        for member_start in range(0, len(members), block_size):
+            member_ids = members[member_start:member_start + block_size]
+            member_vectors = _unit_rows(embeddings, member_ids)
+            for query_start in range(0, len(queries), block_size):
+                query_ids = queries[query_start:query_start + block_size]
+                first, second, similarity = _tile_pairs(query_ids, _unit_rows(embeddings, query_ids),
+                                                        member_ids, member_vectors, threshold)
+                firsts.append(first)
+                seconds.append(second)
+                similarities.append(similarity)
+    
+    if not firsts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    
+    return _unique_pairs(np.concatenate(firsts), np.concatenate(seconds), np.concatenate(similarities), num_items)
+
+
+def _unique_pairs(first: np.ndarray, second: np.ndarray, similarity: np.ndarray,
+                  num_items: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Drop repeated pairs, keeping pairs sorted by position."""
+    _, keep = np.unique(first.astype(np.int64) * num_items + second, return_index=True)
+    return first[keep], second[keep], similarity[keep]
+
+
+def resolve_duplicate_engine(num_items: int, engine: str = 'auto') -> str:
+    """
+    Resolve the near-duplicate search engine for a corpus size.
+    
+    Args:
+        num_items: Number of questions
+        engine: 'blocked', 'ivf' or 'auto'
+    
+    Returns:
+        'blocked' or 'ivf'
+    """
+    if engine not in DUPLICATE_ENGINES:
+        raise ValueError(f"Unknown duplicate engine '{engine}', expected one of {DUPLICATE_ENGINES}")
+    if engine == 'auto':
+        return 'ivf' if num_items >= DEFAULT_INDEX_THRESHOLD else 'blocked'
+    return engine
+
+
+def group_near_duplicates(first: np.ndarray, second: np.ndarray, num_items: int) -> np.ndarray:
+    """
+    Group questions linked by near-duplicate pairs (connected components).
+    
+    Args:
+        first: First positions of pairs
+        second: Second positions of pairs
+        num_items: Number of questions
+    
+    Returns:
+        Group id per question; -1 for questions without near-duplicates
+    """
+    graph = sparse.coo_matrix((np.ones(len(first), dtype=np.int8), (first, second)), shape=(num_items, num_items))
+    _, components = connected_components(graph, directed=False)
+    
+    # Renumber groups with at least two questions by first appearance
+    sizes = np.bincount(components)
+    grouped = sizes[components] > 1
+    group_ids = np.full(num_items, -1, dtype=np.int64)
+    group_ids[grouped] = pd.factorize(components[grouped])[0]
+    return group_ids
+
+
+def analyze_near_duplicates(df: pd.DataFrame, embeddings: np.ndarray,
+                            threshold: float = DEFAULT_DUPLICATE_THRESHOLD,
+                            engine: str = 'auto',
+                            output_path: str = "outputs/near_duplicates.csv") -> Dict[str, Any]:
+    """
+    Find groups of near-duplicate questions from their embeddings.
+    
+    Args:
+        df: Questions dataframe
+        embeddings: combined_text embeddings aligned with df
+        threshold: Minimum cosine similarity of a near-duplicate pair
+        engine: 'blocked' (exact), 'ivf' (approximate) or 'auto'
+        output_path: CSV with one row per grouped question
+    
+    Returns:
+        Dictionary with 'groups' (largest first), 'pairs' and counts
+    """
+    engine = resolve_duplicate_engine(len(df), engine)
+    print(f"Finding near-duplicate questions (cosine >= {threshold}, {engine} search)...")
+    if engine == 'ivf':
+        first, second, similarity = find_pairs_indexed(embeddings, threshold)
+    else:
+        first, second, similarity = find_pairs_blocked(embeddings, threshold)
+    
+    group_ids = group_near_duplicates(first, second, len(df))
+    qids = df['QID'].to_numpy()
+    questions = df['QEN'].to_numpy()
+    
+    pairs = pd.DataFrame({
+        'QID_a': qids[first],
+        'QID_b': qids[second],
+        'similarity': similarity,
+        'group_id': group_ids[first]
+    }).sort_values('similarity', ascending=False, kind='stable')
+    
+    groups = []
+    grouped = np.flatnonzero(group_ids >= 0)
+    pair_stats = pairs.groupby('group_id')['similarity'].agg(['min', 'max'])
+    for group_id, rows in pd.Series(grouped).groupby(group_ids[grouped]):
+        groups.append({
+            'group_id': int(group_id),
+            'size': len(rows),
+            'question_ids': qids[rows].tolist(),
+            'questions': questions[rows].tolist(),
+            'min_similarity': float(pair_stats.at[group_id, 'min']),
+            'max_similarity': float(pair_stats.at[group_id, 'max'])
+        })
+    groups.sort(key=lambda g: (-g['size'], -g['max_similarity']))
+    
+    report_df = pd.DataFrame({
+        'group_id': group_ids[grouped],
+        'group_size': np.bincount(group_ids[grouped])[group_ids[grouped]] if len(grouped) else [],
+        'QID': qids[grouped],
+        'QEN': questions[grouped]
+    }).sort_values(['group_size', 'group_id'], ascending=[False, True], kind='stable')
+    report_df.to_csv(output_path, index=False)
+    
+    print(f"Found {len(pairs)} near-duplicate pairs in {len(groups)} groups "
+          f"({len(grouped)} questions); saved to {output_path}")
+    
+    return {
+        'groups': groups,
+        'pairs': pairs,
+        'num_groups': len(groups),
+        'num_questions': len(grouped),
+        'threshold': threshold,
+        'engine': engine
+    }
@@ -0,0 +1,160 @@
+"""Persistent, content-addressed cache of NER results (SQLite)."""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple, Sequence
+
+try:
+    import spacy
+except ImportError:  # Only needed to key entries of a loaded model
+    spacy = None
+
+
+DEFAULT_NER_CACHE_PATH = "outputs/cache/ner_cache.sqlite"
+
+# Evict least recently used entries above this size (approximate: counts
+# key and span bytes, not SQLite page and index overhead)
+DEFAULT_NER_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Recency is only refreshed for entries last used longer ago than this
+# (seconds), so warm reads rarely need the write lock
+_TOUCH_INTERVAL = 3600
+
+# Bound on host parameters per statement (SQLite's default limit is 999)
+_QUERY_CHUNK = 500
+
+
+def get_model_key(nlp) -> str:
+    """
+    Identify a spaCy model for cache keys: spaCy version, model name and version.
+    
+    Args:
+        nlp: spaCy model
+    
+    Returns:
+        Model key string
+    """
+    meta = nlp.meta
+    return f"spacy-{spacy.__version__}/{meta.get('lang', '')}_{meta.get('name', '')}-{meta.get('version', '')}"
+
+
+def text_key(model_key: str, text: str) -> bytes:
+    """Hash a text together with the model key."""
+    return hashlib.blake2b(f"{model_key}\0{text}".encode('utf-8'), digest_size=16).digest()
+
+
+def open_ner_cache(cache_path: str = DEFAULT_NER_CACHE_PATH) -> sqlite3.Connection:
+    """
+    Open (or create) the NER cache database.
+    
+    WAL journaling lets concurrent readers proceed while one run writes.
+    
+    Args:
+        cache_path: Path to SQLite file
+    
+    Returns:
+        Open connection
+    """
+    Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(cache_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS entities ("
+        " key BLOB PRIMARY KEY,"
+        " spans TEXT NOT NULL,"
+        " size INTEGER NOT NULL,"
+        " last_used REAL NOT NULL"
+        ") WITHOUT ROWID"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS entities_last_used ON entities (last_used)")
+    return conn
+
+
+def lookup_entities(conn: sqlite3.Connection, keys: Sequence[bytes]) -> Dict[bytes, List[Tuple[str, str]]]:
+    """
+    Fetch cached spans and mark them as recently used.
+    
+    Only entries whose recency is older than _TOUCH_INTERVAL are updated, so
+    repeated lookups from concurrent runs are plain reads.
+    
+    Args:
+        conn: Cache connection
+        keys: Text keys
+    
+    Returns:
+        Dictionary mapping found keys to (label, entity text) spans
+    """
+    now = time.time()
+    found = {}
+    stale = []
+    for start in range(0, len(keys), _QUERY_CHUNK):
+        chunk = list(keys[start:start + _QUERY_CHUNK])
+        placeholders = ','.join('?' * len(chunk))
+        query = f"SELECT key, spans, last_used FROM entities WHERE key IN ({placeholders})"
+        for key, spans, last_used in conn.execute(query, chunk):
+            found[key] = [tuple(span) for span in json.loads(spans)]
+            if now - last_used > _TOUCH_INTERVAL:
+                stale.append((now, key))
+    
+    if stale:
+        with conn:
+            conn.executemany("UPDATE entities SET last_used = ? WHERE key = ?", stale)
+    
+    return found
+
+
+def store_entities(conn: sqlite3.Connection, items: Sequence[Tuple[bytes, List[Tuple[str, str]]]]) -> None:
+    """
+    Store spans for text keys.
+    
+    Args:
+        conn: Cache connection
+        items: (key, spans) pairs
+    """
+    now = time.time()
+    rows = []
+    for key, spans in items:
+        payload = json.dumps(spans, separators=(',', ':'), ensure_ascii=False)
+        rows.append((key, payload, len(key) + len(payload.encode('utf-8')), now))
+    
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO entities (key, spans, size, last_used) VALUES (?, ?, ?, ?)", rows)
+
+
+def evict_ner_cache(conn: sqlite3.Connection, max_bytes: int = DEFAULT_NER_CACHE_MAX_BYTES) -> int:
+    """
+    Delete least recently used entries until the stored size is at most max_bytes.
+    
+    The budget is approximate: it counts key and span bytes, not SQLite page
+    and index overhead. The file is compacted with VACUUM after an eviction.
+    
+    Args:
+        conn: Cache connection
+        max_bytes: Size budget for stored keys and spans
+    
+    Returns:
+        Number of evicted entries
+    """
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entities").fetchone()[0]
+    if total <= max_bytes:
+        return 0
+    
+    evict = []
+    excess = total - max_bytes
+    for key, size in conn.execute("SELECT key, size FROM entities ORDER BY last_used"):
+        if excess <= 0:
+            break
+        evict.append((key,))
+        excess -= size
+    
+    with conn:
+        conn.executemany("DELETE FROM entities WHERE key = ?", evict)
+    
+    # Deleted pages are only reused, not returned to the file system
+    conn.execute("VACUUM")
+    
+    return len(evict)
@@ -1,62 +1,50 @@
 """N-gram analysis: extract patterns and identify gaps."""
 
 import pandas as pd
-import re
 from collections import Counter
-from typing import Dict, List, Tuple, Any
-from nltk import ngrams, word_tokenize
-from nltk.corpus import stopwords
-import nltk
+from typing import Dict, List, Tuple, Any, Optional
+from nltk import ngrams
+from .tokenization import (
+    tokenize_text, load_stopwords, stopword_mask, remove_masked,
+    build_token_corpus, has_token_column, get_token_rows, ANSWER_COLUMNS
+)
+from .sparse_ngrams import build_ngram_matrices, merge_ngram_matrices, top_ngrams, matrix_to_counter
+from .heavy_hitters import (
+    new_space_saving, space_saving_update, build_space_saving_summaries, merge_space_saving,
+    space_saving_top, space_saving_bounds, space_saving_to_counter, DEFAULT_SKETCH_CAPACITY
+)
+from .utils import chunk_slices, map_in_pool
 
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+# Counting backends: 'counter' (collections.Counter), 'sparse' (document-term matrices)
+# or 'streaming' (approximate top-k with bounded-memory Space-Saving summaries)
+NGRAM_BACKENDS = ['counter', 'sparse', 'streaming']
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
 
-
-def preprocess_text(text: str, remove_stopwords: bool = False) -> List[str]:
+def preprocess_text(text: str, remove_stopwords: bool = False, tokenizer: str = 'nltk') -> List[str]:
     """
     Preprocess text for n-gram extraction.
     
     Args:
         text: Input text
         remove_stopwords: Whether to remove stopwords
-        
+        tokenizer: Tokenizer mode, 'nltk' or 'fast'
+    
     Returns:
         List of tokens
     """
-    if pd.isna(text) or text == "":
-        return []
-    
-    # Convert to lowercase
-    text = str(text).lower()
-    
-    # Remove special characters but keep spaces
-    text = re.sub(r'[^\w\s]', ' ', text)
-    
-    # Tokenize
-    try:
-        tokens = word_tokenize(text)
-    except:
-        # Fallback to simple split
-        tokens = text.split()
+    tokens = tokenize_text(text, tokenizer)
     
     # Remove stopwords if requested
     if remove_stopwords:
-        stop_words = set(stopwords.words('english'))
-        tokens = [t for t in tokens if t not in stop_words and len(t) > 1]
+        stop_words = load_stopwords()
+        tokens = remove_masked(tokens, stopword_mask(tokens, stop_words))
     
     return tokens
 
 
-def extract_ngrams(text: str, n: int, remove_stopwords: bool = False) -> List[Tuple[str, ...]]:
+def extract_ngrams(text: str, n: int, remove_stopwords: bool = False,
+                   tokenizer: str = 'nltk') -> List[Tuple[str, ...]]:
     """
     Extract n-grams from text.
     
@@ -64,11 +52,12 @@ def extract_ngrams(text: str, n: int, remove_stopwords: bool = False) -> List[Tu
         text: Input text
         n: N-gram size (1=unigram, 2=bigram, 3=trigram)
         remove_stopwords: Whether to remove stopwords
-        
+        tokenizer: Tokenizer mode, 'nltk' or 'fast'
+    
     Returns:
         List of n-gram tuples
     """
-    tokens = preprocess_text(text, remove_stopwords)
+    tokens = preprocess_text(text, remove_stopwords, tokenizer)
     
     if len(tokens) < n:
         return []
@@ -76,121 +65,688 @@ def extract_ngrams(text: str, n: int, remove_stopwords: bool = False) -> List[Tu
     return list(ngrams(tokens, n))
 
 
-def extract_all_ngrams(df: pd.DataFrame, text_column: str, n_values: List[int] = [1, 2, 3]) -> Dict[int, Counter]:
+def count_token_ngrams(token_rows: List[List[str]],
+                       mask_rows: List[List[bool]],
+                       n_values: List[int] = [1, 2, 3]) -> Dict[int, Counter]:
     """
-    Extract n-grams from all rows in a column.
+    Count n-grams over pre-tokenized rows.
+    
+    Unigrams use all tokens; longer n-grams skip stopword-masked tokens.
     
     Args:
-        df: Dataframe
-        text_column: Column name to extract from
+        token_rows: Tokens per row
+        mask_rows: Stopword masks per row
         n_values: List of n values to extract
-        
+    
     Returns:
         Dictionary mapping n to Counter of n-grams
     """
     all_ngrams = {n: Counter() for n in n_values}
     
-    for text in df[text_column]:
+    for tokens, mask in zip(token_rows, mask_rows):
+        content_tokens = None
         for n in n_values:
-            ngram_list = extract_ngrams(text, n, remove_stopwords=(n > 1))
-            all_ngrams[n].update(ngram_list)
+            if n > 1:
+                if content_tokens is None:
+                    content_tokens = remove_masked(tokens, mask)
+                row_tokens = content_tokens
+            else:
+                row_tokens = tokens
+            if len(row_tokens) >= n:
+                all_ngrams[n].update(ngrams(row_tokens, n))
     
     return all_ngrams
 
 
-def analyze_question_ngrams(df: pd.DataFrame) -> Dict[str, Any]:
+def build_row_groups(df: pd.DataFrame, include_tags: bool = True) -> List[List[Tuple[str, Any]]]:
     """
-    Analyze n-grams in questions.
+    List the n-gram groups each row belongs to: its primary category and its tags.
     
     Args:
         df: Questions dataframe
+        include_tags: Whether to add a group per tag id from the exploded tag_ids
+    
+    Returns:
+        Per row, a list of ('category', name) and ('tag', tag_id) keys
+    """
+    num_rows = len(df)
+    categories = df['primary_category'].tolist() if 'primary_category' in df.columns else [None] * num_rows
+    tag_lists = df['tag_ids'].tolist() if include_tags and 'tag_ids' in df.columns else [[]] * num_rows
+    
+    row_groups = []
+    for category, tag_ids in zip(categories, tag_lists):
+        groups = [('category', category)] if pd.notna(category) else []
+        if isinstance(tag_ids, list):
+            groups.extend(('tag', tag_id) for tag_id in dict.fromkeys(tag_ids))
+        row_groups.append(groups)
+    
+    return row_groups
+
+
+def count_grouped_ngrams(token_rows: List[List[str]],
+                         mask_rows: List[List[bool]],
+                         row_groups: List[List[Tuple[str, Any]]],
+                         n_values: List[int] = [1, 2, 3],
+                         group_n_values: List[int] = [2, 3],
+                         backend: str = 'counter',
+                         sketch_capacity: int = DEFAULT_SKETCH_CAPACITY) -> Tuple[Dict[int, Any], Dict[Any, Dict[int, Any]]]:
+    """
+    Count n-grams over all rows and per row group in a single pass.
+    
+    Each row's n-grams are extracted once and added to the global counts and
+    to the counts of every group the row belongs to.
+    
+    Args:
+        token_rows: Tokens per row
+        mask_rows: Stopword masks per row
+        row_groups: Group keys per row (see build_row_groups)
+        n_values: List of n values to count globally
+        group_n_values: List of n values to count per group
+        backend: 'counter' (exact Counters) or 'streaming' (Space-Saving summaries)
+        sketch_capacity: Counters per Space-Saving summary for the streaming backend
+    
+    Returns:
+        Tuple of (counts per n, dict mapping group key to counts per n)
+    """
+    if backend == 'streaming':
+        def new_counts(n):
+            return new_space_saving(sketch_capacity, n)
+        update = space_saving_update
+    else:
+        def new_counts(n):
+            return Counter()
+        update = Counter.update
+    
+    counts = {n: new_counts(n) for n in n_values}
+    group_counts = {}
+    
+    for tokens, mask, groups in zip(token_rows, mask_rows, row_groups):
+        for key in groups:
+            if key not in group_counts:
+                group_counts[key] = {n: new_counts(n) for n in group_n_values}
         
+        content_tokens = None
+        for n in n_values:
+            if n > 1:
+                if content_tokens is None:
+                    content_tokens = remove_masked(tokens, mask)
+                row_tokens = content_tokens
+            else:
+                row_tokens = tokens
+            if len(row_tokens) < n:
+                continue
+            
+            row_ngrams = list(ngrams(row_tokens, n))
+            update(counts[n], row_ngrams)
+            if n in group_n_values:
+                for key in groups:
+                    update(group_counts[key][n], row_ngrams)
+    
+    return counts, group_counts
+
+
+def _column_token_rows(df: pd.DataFrame, text_column: str,
+                       token_corpus: Optional[Dict[str, Any]] = None,
+                       tokenizer: str = 'nltk') -> Tuple[List[List[str]], List[List[bool]]]:
+    """Get tokens and stopword masks for a column, tokenizing each row once if no corpus is given."""
+    if has_token_column(token_corpus, text_column, len(df)):
+        return get_token_rows(token_corpus, text_column)
+    
+    stop_words = load_stopwords()
+    token_rows = [tokenize_text(text, tokenizer) for text in df[text_column]]
+    mask_rows = [stopword_mask(tokens, stop_words) for tokens in token_rows]
+    return token_rows, mask_rows
+
+
+def _count_ngram_chunk(task: Dict[str, Any]) -> Dict[int, Any]:
+    """
+    Count n-grams for one chunk of rows (process pool worker).
+    
+    Args:
+        task: Dict with either 'token_rows'/'mask_rows' or raw 'texts' plus
+            'tokenizer', and 'n_values', 'backend', 'n_features', 'sketch_capacity'
+            and optional 'row_groups'
+    
+    Returns:
+        Partial counts: Counter per n, n-gram matrices for the sparse backend
+        or Space-Saving summaries for the streaming backend; with row groups,
+        a tuple of (counts, group counts)
+    """
+    if task.get('texts') is not None:
+        stop_words = load_stopwords()
+        token_rows = [tokenize_text(text, task['tokenizer']) for text in task['texts']]
+        mask_rows = [stopword_mask(tokens, stop_words) for tokens in token_rows]
+    else:
+        token_rows, mask_rows = task['token_rows'], task['mask_rows']
+    
+    if task['backend'] == 'sparse':
+        return build_ngram_matrices(token_rows, mask_rows, task['n_values'], task['n_features'])
+    if task.get('row_groups') is not None:
+        return count_grouped_ngrams(token_rows, mask_rows, task['row_groups'], task['n_values'],
+                                    backend=task['backend'], sketch_capacity=task['sketch_capacity'])
+    if task['backend'] == 'streaming':
+        return build_space_saving_summaries(token_rows, mask_rows, task['n_values'], task['sketch_capacity'])
+    return count_token_ngrams(token_rows, mask_rows, task['n_values'])
+
+
+def merge_ngram_counters(partials: List[Dict[int, Counter]]) -> Dict[int, Counter]:
+    """
+    Merge per-chunk Counters in chunk order.
+    
+    Updating in row order keeps Counter insertion order, and so
+    most_common tie-breaking, identical to a serial count.
+    
+    Args:
+        partials: Counter per n for each chunk, in row order
+    
+    Returns:
+        Dictionary mapping n to merged Counter
+    """
+    merged = {n: Counter() for n in partials[0]}
+    for partial in partials:
+        for n, counter in partial.items():
+            merged[n].update(counter)
+    return merged
+
+
+def _merge_counts(partials: List[Dict[int, Any]], backend: str) -> Dict[int, Any]:
+    """Merge per-chunk Counters or Space-Saving summaries in chunk order."""
+    if backend == 'streaming':
+        return {n: merge_space_saving([partial[n] for partial in partials]) for n in partials[0]}
+    return merge_ngram_counters(partials)
+
+
+def _stream_chunk_waves(tasks: List[Dict[str, Any]], n_workers: int, grouped: bool) -> Any:
+    """
+    Count streaming-backend chunks n_workers at a time, folding each wave into running summaries.
+    
+    Only the chunks of one wave are tokenized at once, so memory is bounded by
+    the wave and the summaries rather than by the corpus.
+    """
+    wave_size = max(n_workers, 1)
+    counts = None
+    group_counts = {}
+    for start in range(0, len(tasks), wave_size):
+        partials = map_in_pool(_count_ngram_chunk, tasks[start:start + wave_size], n_workers)
+        if grouped:
+            for _, partial_groups in partials:
+                for key, part in partial_groups.items():
+                    if key in group_counts:
+                        part = _merge_counts([group_counts[key], part], 'streaming')
+                    group_counts[key] = part
+            partials = [partial for partial, _ in partials]
+        if counts is not None:
+            partials = [counts] + partials
+        counts = _merge_counts(partials, 'streaming')
+    
+    if grouped:
+        return counts, group_counts
+    return counts
+
+
+def count_ngrams_parallel(token_rows: Optional[List[List[str]]] = None,
+                          mask_rows: Optional[List[List[bool]]] = None,
+                          texts: Optional[List[str]] = None,
+                          n_values: List[int] = [1, 2, 3],
+                          backend: str = 'counter',
+                          n_features: Optional[int] = None,
+                          tokenizer: str = 'nltk',
+                          n_workers: int = 1,
+                          chunk_size: int = 5000,
+                          sketch_capacity: int = DEFAULT_SKETCH_CAPACITY,
+                          row_groups: Optional[List[List[Tuple[str, Any]]]] = None) -> Any:
+    """
+    Count n-grams over row chunks in a process pool and merge the partial counts.
+    
+    Pass either pre-tokenized rows or raw texts (tokenized inside the workers).
+    Results are identical to a serial count for any worker count and chunk size.
+    With raw texts, the streaming backend tokenizes n_workers chunks at a time
+    and folds them into running summaries, so the corpus is never held as tokens
+    (results then match a serial count while no summary evicts).
+    
+    Args:
+        token_rows: Tokens per row
+        mask_rows: Stopword masks per row
+        texts: Raw texts, used when token_rows is None
+        n_values: List of n values to extract
+        backend: Counting backend, 'counter', 'sparse' or 'streaming'
+        n_features: Feature hashing buckets for the sparse backend
+        tokenizer: Tokenizer mode for raw texts, 'nltk' or 'fast'
+        n_workers: Number of worker processes
+        chunk_size: Rows per chunk
+        sketch_capacity: Counters per Space-Saving summary for the streaming backend
+        row_groups: Optional group keys per row; counter and streaming backends
+            then also count bigrams and trigrams per group (see count_grouped_ngrams)
+    
+    Returns:
+        Counter per n, or merged n-gram matrices / summaries per n for the
+        sparse / streaming backends; with row groups, a tuple of (counts, group counts)
+    """
+    _check_backend(backend)
+    num_rows = len(token_rows) if token_rows is not None else len(texts)
+    
+    tasks = []
+    for rows in chunk_slices(num_rows, chunk_size) or [slice(0, 0)]:
+        task = {'n_values': n_values, 'backend': backend, 'n_features': n_features,
+                'tokenizer': tokenizer, 'sketch_capacity': sketch_capacity}
+        if token_rows is not None:
+            task.update(token_rows=token_rows[rows], mask_rows=mask_rows[rows])
+        else:
+            task['texts'] = texts[rows]
+        if row_groups is not None and backend != 'sparse':
+            task['row_groups'] = row_groups[rows]
+        tasks.append(task)
+    
+    if backend == 'streaming' and token_rows is None:
+        return _stream_chunk_waves(tasks, n_workers, row_groups is not None)
+    
+    partials = map_in_pool(_count_ngram_chunk, tasks, n_workers)
+    
+    if backend == 'sparse':
+        merged = merge_ngram_matrices(partials)
+        if n_features is not None and token_rows is not None:
+            # Hashed bucket n-grams are recounted from the caller's tokens
+            for matrix in merged.values():
+                matrix['token_rows'], matrix['mask_rows'] = token_rows, mask_rows
+        return merged
+    
+    if row_groups is not None:
+        group_partials = {}
+        for _, partial_groups in partials:
+            for key, counts in partial_groups.items():
+                group_partials.setdefault(key, []).append(counts)
+        group_counts = {key: _merge_counts(parts, backend) for key, parts in group_partials.items()}
+        return _merge_counts([counts for counts, _ in partials], backend), group_counts
+    
+    return _merge_counts(partials, backend)
+
+
+def _check_backend(backend: str) -> None:
+    """Validate n-gram backend name."""
+    if backend not in NGRAM_BACKENDS:
+        raise ValueError(f"Unknown n-gram backend '{backend}', expected one of {NGRAM_BACKENDS}")
+
+
+def extract_all_ngrams(df: pd.DataFrame, text_column: str, n_values: List[int] = [1, 2, 3],
+                       token_corpus: Optional[Dict[str, Any]] = None,
+                       tokenizer: str = 'nltk',
+                       backend: str = 'counter',
+                       n_features: Optional[int] = None,
+                       n_workers: int = 1,
+                       chunk_size: int = 5000,
+                       sketch_capacity: int = DEFAULT_SKETCH_CAPACITY) -> Dict[int, Counter]:
+    """
+    Extract n-grams from all rows in a column.
+    
+    Args:
+        df: Dataframe
+        text_column: Column name to extract from
+        n_values: List of n values to extract
+        token_corpus: Optional shared token corpus aligned with df
+        tokenizer: Tokenizer mode when no token corpus is given, 'nltk' or 'fast'
+        backend: Counting backend, 'counter', 'sparse' or 'streaming'
+        n_features: Feature hashing buckets for the sparse backend (None for exact vocabulary)
+        n_workers: Worker processes; above 1, rows are tokenized and counted in chunks
+            in a process pool (output is identical to the serial path)
+        chunk_size: Rows per chunk for the process pool
+        sketch_capacity: Counters per Space-Saving summary for the streaming backend
+    
+    Returns:
+        Dictionary mapping n to Counter of n-grams (estimated counts of the
+        monitored n-grams for the streaming backend)
+    """
+    _check_backend(backend)
+    
+    if n_workers > 1:
+        if has_token_column(token_corpus, text_column, len(df)):
+            token_rows, mask_rows = get_token_rows(token_corpus, text_column)
+            counts = count_ngrams_parallel(token_rows, mask_rows, n_values=n_values, backend=backend,
+                                           n_features=n_features, n_workers=n_workers, chunk_size=chunk_size,
+                                           sketch_capacity=sketch_capacity)
+        else:
+            counts = count_ngrams_parallel(texts=df[text_column].tolist(), n_values=n_values, backend=backend,
+                                           n_features=n_features, tokenizer=tokenizer,
+                                           n_workers=n_workers, chunk_size=chunk_size,
+                                           sketch_capacity=sketch_capacity)
+        if backend == 'sparse':
+            if n_features is not None and counts[n_values[0]]['token_rows'] is None:
+                # Hashed bucket n-grams are recounted from the tokens; rebuild from the column
+                token_rows, mask_rows = _column_token_rows(df, text_column, token_corpus, tokenizer)
+                for matrix in counts.values():
+                    matrix['token_rows'], matrix['mask_rows'] = token_rows, mask_rows
+            return {n: matrix_to_counter(counts[n]) for n in n_values}
+        if backend == 'streaming':
+            return {n: space_saving_to_counter(counts[n]) for n in n_values}
+        return counts
+    
+    token_rows, mask_rows = _column_token_rows(df, text_column, token_corpus, tokenizer)
+    
+    if backend == 'sparse':
+        matrices = build_ngram_matrices(token_rows, mask_rows, n_values, n_features)
+        return {n: matrix_to_counter(matrices[n]) for n in n_values}
+    
+    if backend == 'streaming':
+        summaries = build_space_saving_summaries(token_rows, mask_rows, n_values, sketch_capacity)
+        return {n: space_saving_to_counter(summaries[n]) for n in n_values}
+    
+    return count_token_ngrams(token_rows, mask_rows, n_values)
+
+
+def _summarize_groups(row_groups: List[List[Tuple[str, Any]]],
+                      backend: str,
+                      group_counts: Optional[Dict[Any, Dict[int, Any]]] = None,
+                      matrices: Optional[Dict[int, Dict[str, Any]]] = None,
+                      top_k: int = 20) -> Dict[Any, Dict[str, Any]]:
+    """
+    Get top bigrams and trigrams per row group.
+    
+    Args:
+        row_groups: Group keys per row
+        backend: Counting backend, 'counter', 'sparse' or 'streaming'
+        group_counts: Per-group counts from count_grouped_ngrams (counter/streaming)
+        matrices: N-gram matrices over all rows (sparse); groups are row subsets
+        top_k: Number of top n-grams to keep per group
+    
+    Returns:
+        Dictionary mapping group key to its row count and top lists
+    """
+    positions = {}
+    for i, groups in enumerate(row_groups):
+        for key in groups:
+            positions.setdefault(key, []).append(i)
+    
+    group_ngrams = {}
+    for key, rows in positions.items():
+        if backend == 'sparse':
+            top_bigrams = top_ngrams(matrices[2], top_k, rows)
+            top_trigrams = top_ngrams(matrices[3], top_k, rows)
+        elif backend == 'streaming':
+            top_bigrams = space_saving_top(group_counts[key][2], top_k)
+            top_trigrams = space_saving_top(group_counts[key][3], top_k)
+        else:
+            top_bigrams = group_counts[key][2].most_common(top_k)
+            top_trigrams = group_counts[key][3].most_common(top_k)
+        
+        group_ngrams[key] = {
+            'count': len(rows),
+            'top_bigrams': top_bigrams,
+            'top_trigrams': top_trigrams
+        }
+        if backend == 'streaming':
+            group_ngrams[key]['top_bounds'] = {
+                'bigrams': space_saving_bounds(group_counts[key][2], top_k),
+                'trigrams': space_saving_bounds(group_counts[key][3], top_k)
+            }
+    
+    return group_ngrams
+
+
+def summarize_ngrams(token_rows: Optional[List[List[str]]],
+                     mask_rows: Optional[List[List[bool]]],
+                     backend: str = 'counter',
+                     n_features: Optional[int] = None,
+                     top_k: int = 50,
+                     n_workers: int = 1,
+                     chunk_size: int = 5000,
+                     sketch_capacity: int = DEFAULT_SKETCH_CAPACITY,
+                     row_groups: Optional[List[List[Tuple[str, Any]]]] = None,
+                     texts: Optional[List[str]] = None,
+                     tokenizer: str = 'nltk') -> Dict[str, Any]:
+    """
+    Count unigrams, bigrams and trigrams and get the top n-grams of each.
+    
+    Args:
+        token_rows: Tokens per row (streaming backend: None to tokenize texts chunk by chunk)
+        mask_rows: Stopword masks per row
+        backend: Counting backend, 'counter', 'sparse' or 'streaming'
+        n_features: Feature hashing buckets for the sparse backend (None for exact vocabulary)
+        top_k: Number of top n-grams to keep
+        n_workers: Worker processes for chunked counting (1 counts in-process)
+        chunk_size: Rows per chunk for the process pool
+        sketch_capacity: Counters per Space-Saving summary for the streaming backend
+        row_groups: Optional group keys per row (see build_row_groups); top 20
+            bigrams and trigrams per group are computed in the same pass
+        texts: Raw texts, used when token_rows is None
+        tokenizer: Tokenizer mode for raw texts, 'nltk' or 'fast'
+    
+    Returns:
+        Dictionary with Counters and top lists per n; the sparse backend also
+        returns its matrices under 'matrices'. The streaming backend returns
+        estimated counts of the monitored n-grams only, with its summaries under
+        'sketches' and per-item error bounds of the top lists under 'top_bounds'.
+        With row groups, per-group top lists are under 'group_ngrams'
+    """
+    _check_backend(backend)
+    
+    matrices = None
+    group_counts = None
+    if backend == 'sparse':
+        if n_workers > 1:
+            matrices = count_ngrams_parallel(token_rows, mask_rows, backend=backend, n_features=n_features,
+                                             n_workers=n_workers, chunk_size=chunk_size)
+        else:
+            matrices = build_ngram_matrices(token_rows, mask_rows, [1, 2, 3], n_features)
+        counters = {n: matrix_to_counter(matrices[n]) for n in [1, 2, 3]}
+        tops = {n: top_ngrams(matrices[n], top_k) for n in [1, 2, 3]}
+    else:
+        if n_workers > 1 or token_rows is None:
+            counts = count_ngrams_parallel(token_rows, mask_rows, texts=texts, backend=backend,
+                                           tokenizer=tokenizer, n_workers=n_workers, chunk_size=chunk_size,
+                                           sketch_capacity=sketch_capacity, row_groups=row_groups)
+        elif row_groups is not None:
+            counts = count_grouped_ngrams(token_rows, mask_rows, row_groups, backend=backend,
+                                          sketch_capacity=sketch_capacity)
+        elif backend == 'streaming':
+            counts = build_space_saving_summaries(token_rows, mask_rows, [1, 2, 3], sketch_capacity)
+        else:
+            counts = count_token_ngrams(token_rows, mask_rows, n_values=[1, 2, 3])
+        if row_groups is not None:
+            counts, group_counts = counts
+        
+        if backend == 'streaming':
+            sketches = counts
+            counters = {n: space_saving_to_counter(sketches[n]) for n in [1, 2, 3]}
+            tops = {n: space_saving_top(sketches[n], top_k) for n in [1, 2, 3]}
+        else:
+            counters = counts
+            tops = {n: counters[n].most_common(top_k) for n in [1, 2, 3]}
+    
+    summary = {
+        'unigrams': counters[1],
+        'bigrams': counters[2],
+        'trigrams': counters[3],
+        'top_unigrams': tops[1],
+        'top_bigrams': tops[2],
+        'top_trigrams': tops[3]
+    }
+    if matrices is not None:
+        summary['matrices'] = matrices
+    if backend == 'streaming':
+        summary['sketches'] = sketches
+        summary['top_bounds'] = {
+            'unigrams': space_saving_bounds(sketches[1], top_k),
+            'bigrams': space_saving_bounds(sketches[2], top_k),
+            'trigrams': space_saving_bounds(sketches[3], top_k)
+        }
+    if row_groups is not None:
+        summary['group_ngrams'] = _summarize_groups(row_groups, backend, group_counts, matrices)
+    
+    return summary
+
+
+def analyze_question_ngrams(df: pd.DataFrame, token_corpus: Optional[Dict[str, Any]] = None,
+                            backend: str = 'counter',
+                            n_features: Optional[int] = None,
+                            n_workers: int = 1,
+                            chunk_size: int = 5000,
+                            sketch_capacity: int = DEFAULT_SKETCH_CAPACITY,
+                            row_groups: Optional[List[List[Tuple[str, Any]]]] = None,
+                            tokenizer: str = 'nltk') -> Dict[str, Any]:
+    """
+    Analyze n-grams in questions.
+    
+    Args:
+        df: Questions dataframe
+        token_corpus: Optional shared token corpus aligned with df
+        backend: Counting backend, 'counter', 'sparse' or 'streaming'
+        n_features: Feature hashing buckets for the sparse backend
+        n_workers: Worker processes for chunked counting
+        chunk_size: Rows per chunk for the process pool
+        sketch_capacity: Counters per Space-Saving summary for the streaming backend
+        row_groups: Optional category/tag keys per row, counted in the same pass
+        tokenizer: Tokenizer mode when no token corpus is given, 'nltk' or 'fast'
+    
     Returns:
         Dictionary with n-gram analysis
     """
     print("Extracting n-grams from questions...")
     
-    # Extract from questions
-    question_ngrams = extract_all_ngrams(df, 'QEN', n_values=[1, 2, 3])
+    if backend == 'streaming' and not has_token_column(token_corpus, 'QEN', len(df)):
+        # Tokenized chunk by chunk while counting
+        return summarize_ngrams(None, None, backend, n_features, n_workers=n_workers, chunk_size=chunk_size,
+                                sketch_capacity=sketch_capacity, row_groups=row_groups,
+                                texts=df['QEN'].tolist(), tokenizer=tokenizer)
     
-    # Get top n-grams
-    top_unigrams = question_ngrams[1].most_common(50)
-    top_bigrams = question_ngrams[2].most_common(50)
-    top_trigrams = question_ngrams[3].most_common(50)
+    # Extract from questions
+    token_rows, mask_rows = _column_token_rows(df, 'QEN', token_corpus, tokenizer)
     
-    return {
-        'unigrams': question_ngrams[1],
-        'bigrams': question_ngrams[2],
-        'trigrams': question_ngrams[3],
-        'top_unigrams': top_unigrams,
-        'top_bigrams': top_bigrams,
-        'top_trigrams': top_trigrams
-    }
+    return summarize_ngrams(token_rows, mask_rows, backend, n_features,
+                            n_workers=n_workers, chunk_size=chunk_size, sketch_capacity=sketch_capacity,
+                            row_groups=row_groups)
 
 
-def analyze_answer_ngrams(df: pd.DataFrame) -> Dict[str, Any]:
+def analyze_answer_ngrams(df: pd.DataFrame, token_corpus: Optional[Dict[str, Any]] = None,
+                          backend: str = 'counter',
+                          n_features: Optional[int] = None,
+                          n_workers: int = 1,
+                          chunk_size: int = 5000,
+                          sketch_capacity: int = DEFAULT_SKETCH_CAPACITY,
+                          tokenizer: str = 'nltk') -> Dict[str, Any]:
     """
     Analyze n-grams in answers.
     
     Args:
         df: Questions dataframe
-        
+        token_corpus: Optional shared token corpus aligned with df
+        backend: Counting backend, 'counter', 'sparse' or 'streaming'
+        n_features: Feature hashing buckets for the sparse backend
+        n_workers: Worker processes for chunked counting
+        chunk_size: Rows per chunk for the process pool
+        sketch_capacity: Counters per Space-Saving summary for the streaming backend
+        tokenizer: Tokenizer mode when no token corpus is given, 'nltk' or 'fast'
+    
     Returns:
         Dictionary with answer n-gram analysis
     """
     print("Extracting n-grams from answers...")
     
-    # Combine all answers
-    all_answers = pd.concat([
-        df['ACEN'].fillna(''),
-        df['AW1EN'].fillna(''),
-        df['AW2EN'].fillna('')
-    ])
-    
-    answer_df = pd.DataFrame({'text': all_answers})
-    answer_ngrams = extract_all_ngrams(answer_df, 'text', n_values=[1, 2, 3])
-    
-    top_unigrams = answer_ngrams[1].most_common(50)
-    top_bigrams = answer_ngrams[2].most_common(50)
-    top_trigrams = answer_ngrams[3].most_common(50)
-    
-    return {
-        'unigrams': answer_ngrams[1],
-        'bigrams': answer_ngrams[2],
-        'trigrams': answer_ngrams[3],
-        'top_unigrams': top_unigrams,
-        'top_bigrams': top_bigrams,
-        'top_trigrams': top_trigrams
-    }
+    if backend == 'streaming' and not all(has_token_column(token_corpus, col, len(df)) for col in ANSWER_COLUMNS):
+        # Tokenized chunk by chunk while counting
+        texts = [text for col in ANSWER_COLUMNS for text in df[col].tolist()]
+        return summarize_ngrams(None, None, backend, n_features, n_workers=n_workers, chunk_size=chunk_size,
+                                sketch_capacity=sketch_capacity, texts=texts, tokenizer=tokenizer)
+    
+    # Combine all answers, one answer column after another
+    token_rows, mask_rows = [], []
+    for col in ANSWER_COLUMNS:
+        col_tokens, col_masks = _column_token_rows(df, col, token_corpus, tokenizer)
+        token_rows.extend(col_tokens)
+        mask_rows.extend(col_masks)
+    
+    return summarize_ngrams(token_rows, mask_rows, backend, n_features,
+                            n_workers=n_workers, chunk_size=chunk_size, sketch_capacity=sketch_capacity)
+
+
+def _grouped_question_ngrams(df: pd.DataFrame,
+                             token_corpus: Optional[Dict[str, Any]],
+                             backend: str,
+                             n_features: Optional[int],
+                             sketch_capacity: int,
+                             include_tags: bool) -> Dict[Any, Dict[str, Any]]:
+    """Count question n-grams with per-group top lists when no grouped summary is given."""
+    token_rows, mask_rows = _column_token_rows(df, 'QEN', token_corpus)
+    summary = summarize_ngrams(token_rows, mask_rows, backend, n_features, sketch_capacity=sketch_capacity,
+                               row_groups=build_row_groups(df, include_tags=include_tags))
+    return summary['group_ngrams']
 
 
-def analyze_ngrams_by_category(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+def analyze_ngrams_by_category(df: pd.DataFrame,
+                               token_corpus: Optional[Dict[str, Any]] = None,
+                               backend: str = 'counter',
+                               n_features: Optional[int] = None,
+                               question_ngrams: Optional[Dict[str, Any]] = None,
+                               sketch_capacity: int = DEFAULT_SKETCH_CAPACITY) -> Dict[str, Dict[str, Any]]:
     """
-    Analyze n-grams grouped by category/tag.
+    Analyze n-grams grouped by primary category.
     
     Args:
         df: Questions dataframe
-        
+        token_corpus: Optional shared token corpus aligned with df
+        backend: Counting backend, 'counter', 'sparse' or 'streaming'
+        n_features: Feature hashing buckets for the sparse backend
+        question_ngrams: Optional question summary computed with row groups, whose
+            per-group top lists are reused instead of recounting
+        sketch_capacity: Counters per category Space-Saving summary for the
+            streaming backend
+    
     Returns:
         Dictionary mapping category to n-gram analysis
     """
     print("Analyzing n-grams by category...")
+    _check_backend(backend)
     
-    category_ngrams = {}
+    if question_ngrams is not None and 'group_ngrams' in question_ngrams:
+        group_ngrams = question_ngrams['group_ngrams']
+    else:
+        group_ngrams = _grouped_question_ngrams(df, token_corpus, backend, n_features, sketch_capacity,
+                                                include_tags=False)
+    
+    return {key: stats for (kind, key), stats in group_ngrams.items() if kind == 'category'}
+
+
+def analyze_ngrams_by_tag(df: pd.DataFrame,
+                          token_corpus: Optional[Dict[str, Any]] = None,
+                          backend: str = 'counter',
+                          n_features: Optional[int] = None,
+                          question_ngrams: Optional[Dict[str, Any]] = None,
+                          sketch_capacity: int = DEFAULT_SKETCH_CAPACITY) -> Dict[int, Dict[str, Any]]:
+    """
+    Analyze n-grams grouped by tag, from the exploded tag_ids of each question.
     
-    # Group by primary category
-    if 'primary_category' in df.columns:
-        for category in df['primary_category'].dropna().unique():
-            cat_df = df[df['primary_category'] == category]
-            if len(cat_df) > 0:
-                q_ngrams = extract_all_ngrams(cat_df, 'QEN', n_values=[1, 2, 3])
-                category_ngrams[category] = {
-                    'count': len(cat_df),
-                    'top_bigrams': q_ngrams[2].most_common(20),
-                    'top_trigrams': q_ngrams[3].most_common(20)
-                }
+    Args:
+        df: Questions dataframe
+        token_corpus: Optional shared token corpus aligned with df
+        backend: Counting backend, 'counter', 'sparse' or 'streaming'
+        n_features: Feature hashing buckets for the sparse backend
+        question_ngrams: Optional question summary computed with row groups, whose
+            per-group top lists are reused instead of recounting
+        sketch_capacity: Counters per tag Space-Saving summary for the streaming backend
     
-    return category_ngrams
+    Returns:
+        Dictionary mapping tag id to tag name and n-gram analysis
+    """
+    print("Analyzing n-grams by tag...")
+    _check_backend(backend)
+    
+    if question_ngrams is not None and 'group_ngrams' in question_ngrams:
+        group_ngrams = question_ngrams['group_ngrams']
+    else:
+        group_ngrams = _grouped_question_ngrams(df, token_corpus, backend, n_features, sketch_capacity,
+                                                include_tags=True)
+    
+    tag_names = {}
+    if 'tag_ids' in df.columns and 'tag_names' in df.columns:
+        for tag_ids, names in zip(df['tag_ids'], df['tag_names']):
+            if isinstance(tag_ids, list) and isinstance(names, list):
+                for tag_id, name in zip(tag_ids, names):
+                    tag_names.setdefault(tag_id, name)
+    
+    tag_ngrams = {}
+    for (kind, key), stats in group_ngrams.items():
+        if kind == 'tag':
+            tag_ngrams[key] = {'tag_name': tag_names.get(key, f"Unknown_{key}"), **stats}
+    
+    return tag_ngrams
 
 
 def identify_common_patterns(ngram_counter: Counter, min_freq: int = 10) -> List[Tuple[Tuple[str, ...], int]]:
@@ -221,35 +777,31 @@ def export_ngram_patterns(question_ngrams: Dict[str, Any],
         output_path: Output file path
         
     Returns:
-        Dataframe with n-gram patterns
+        Dataframe with n-gram patterns (plus a 'max_overcount' column with the
+        frequency error bound for the streaming backend)
     """
     rows = []
     
-    # Question patterns
-    for ngram, count in question_ngrams['top_bigrams']:
-        rows.append({
-            'type': 'question',
-            'ngram_type': 'bigram',
-            'ngram': ' '.join(ngram),
-            'frequency': count
-        })
-    
-    for ngram, count in question_ngrams['top_trigrams']:
-        rows.append({
-            'type': 'question',
-            'ngram_type': 'trigram',
-            'ngram': ' '.join(ngram),
-            'frequency': count
-        })
-    
-    # Answer patterns
-    for ngram, count in answer_ngrams['top_bigrams']:
-        rows.append({
-            'type': 'answer',
-            'ngram_type': 'bigram',
-            'ngram': ' '.join(ngram),
-            'frequency': count
-        })
+    sections = [
+        ('question', 'bigram', question_ngrams, 'bigrams'),
+        ('question', 'trigram', question_ngrams, 'trigrams'),
+        ('answer', 'bigram', answer_ngrams, 'bigrams'),
+    ]
+    
+    for pattern_type, ngram_type, ngram_results, key in sections:
+        errors = None
+        if 'top_bounds' in ngram_results:
+            errors = {bound['ngram']: bound['error'] for bound in ngram_results['top_bounds'][key]}
+        for ngram, count in ngram_results['top_' + key]:
+            row = {
+                'type': pattern_type,
+                'ngram_type': ngram_type,
+                'ngram': ' '.join(ngram),
+                'frequency': count
+            }
+            if errors is not None:
+                row['max_overcount'] = errors[ngram]
+            rows.append(row)
     
     df = pd.DataFrame(rows)
     df.to_csv(output_path, index=False)
@@ -259,19 +811,48 @@ def export_ngram_patterns(question_ngrams: Dict[str, Any],
     return df
 
 
-def analyze_ngrams(df: pd.DataFrame) -> Dict[str, Any]:
+def analyze_ngrams(df: pd.DataFrame, token_corpus: Optional[Dict[str, Any]] = None,
+                   tokenizer: str = 'nltk',
+                   backend: str = 'counter',
+                   n_features: Optional[int] = None,
+                   n_workers: int = 1,
+                   chunk_size: int = 5000,
+                   sketch_capacity: int = DEFAULT_SKETCH_CAPACITY) -> Dict[str, Any]:
     """
     Complete n-gram analysis pipeline.
     
     Args:
         df: Questions dataframe
-        
+        token_corpus: Optional shared token corpus aligned with df
+        tokenizer: Tokenizer mode when no token corpus is given, 'nltk' or 'fast'
+        backend: Counting backend, 'counter' (collections.Counter), 'sparse'
+            (sparse document-term matrices) or 'streaming' (approximate top-k
+            with bounded-memory Space-Saving summaries; without a token corpus,
+            rows are tokenized chunk by chunk instead of all up front)
+        n_features: Feature hashing buckets for the sparse backend (None for exact vocabulary)
+        n_workers: Worker processes for tokenizing and counting in row chunks
+            (results are identical to the serial path)
+        chunk_size: Rows per chunk for the process pool
+        sketch_capacity: Counters per Space-Saving summary for the streaming
+            backend; estimates are off by at most (n-grams seen) / sketch_capacity
+    
     Returns:
         Dictionary with all n-gram analyses
     """
-    question_ngrams = analyze_question_ngrams(df)
-    answer_ngrams = analyze_answer_ngrams(df)
-    category_ngrams = analyze_ngrams_by_category(df)
+    _check_backend(backend)
+    if token_corpus is None and backend != 'streaming':
+        token_corpus = build_token_corpus(df, tokenizer=tokenizer, n_workers=n_workers, chunk_size=chunk_size)
+    
+    # Category and tag n-grams are counted in the same pass as the question n-grams
+    row_groups = build_row_groups(df)
+    question_ngrams = analyze_question_ngrams(df, token_corpus, backend, n_features, n_workers, chunk_size,
+                                              sketch_capacity, row_groups, tokenizer)
+    answer_ngrams = analyze_answer_ngrams(df, token_corpus, backend, n_features, n_workers, chunk_size,
+                                          sketch_capacity, tokenizer)
+    category_ngrams = analyze_ngrams_by_category(df, token_corpus, backend, n_features,
+                                                 question_ngrams, sketch_capacity)
+    tag_ngrams = analyze_ngrams_by_tag(df, token_corpus, backend, n_features,
+                                       question_ngrams, sketch_capacity)
     
     print("Exporting n-gram patterns...")
     patterns_df = export_ngram_patterns(question_ngrams, answer_ngrams, category_ngrams)
@@ -280,6 +861,7 @@ def analyze_ngrams(df: pd.DataFrame) -> Dict[str, Any]:
         'question_ngrams': question_ngrams,
         'answer_ngrams': answer_ngrams,
         'category_ngrams': category_ngrams,
+        'tag_ngrams': tag_ngrams,
         'patterns_df': patterns_df
     }
 
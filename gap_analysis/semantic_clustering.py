@@ -1,113 +1,364 @@
 """Semantic clustering: map existing tags and identify missing clusters."""
 
+import os
+from pathlib import Path
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Tuple
-from collections import Counter
+from typing import Dict, List, Any, Tuple, Optional, Sequence
+from scipy import sparse
 from sentence_transformers import SentenceTransformer
-from sklearn.cluster import KMeans, HDBSCAN
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics import silhouette_score
+from sklearn.cluster import KMeans, MiniBatchKMeans, HDBSCAN
+from sklearn.decomposition import PCA
+from sklearn.neighbors import NearestNeighbors
+from sklearn.feature_extraction.text import CountVectorizer, ENGLISH_STOP_WORDS
+from sklearn.metrics import silhouette_score, adjusted_rand_score, adjusted_mutual_info_score
 import umap
 import matplotlib.pyplot as plt
 import seaborn as sns
+import joblib
+from joblib import Parallel, delayed
+from threadpoolctl import threadpool_limits
+from .tokenization import has_token_column, get_token_rows
+from .utils import map_in_pool, share_array, attach_array
+from .embedding_store import open_embedding_store, embed_with_store, compact_embedding_store, text_key
 
 
-def load_embedding_model(model_name: str = "all-MiniLM-L6-v2"):
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# K-means engines: full KMeans, MiniBatchKMeans, or MiniBatchKMeans for groups
+# of at least DEFAULT_MINIBATCH_THRESHOLD questions ('auto')
+KMEANS_ENGINES = ['kmeans', 'minibatch', 'auto']
+DEFAULT_MINIBATCH_THRESHOLD = 2000
+
+# Criteria for choosing k: elbow of inertia or silhouette on a sample
+K_CRITERIA = ['elbow', 'silhouette']
+DEFAULT_SILHOUETTE_SAMPLE = 2000
+
+# 2-D plot layouts of the clustering space: PCA projection or a second UMAP fit
+LAYOUT_METHODS = ['pca', 'umap']
+
+# Cluster plot renderers; 'auto' bins the points from DEFAULT_HEXBIN_THRESHOLD on
+PLOT_MODES = ['scatter', 'hexbin', 'auto']
+DEFAULT_HEXBIN_THRESHOLD = 20000
+
+DEFAULT_CLUSTER_MODEL_PATH = "outputs/cache/cluster_model.joblib"
+
+# Refit the persisted clustering once questions assigned since the fit exceed
+# this share of the fitted corpus, or their outlier rate exceeds the fit's
+# noise rate by DEFAULT_REFIT_OUTLIER_MARGIN
+DEFAULT_REFIT_NEW_FRACTION = 0.25
+DEFAULT_REFIT_OUTLIER_MARGIN = 0.15
+
+# Questions per reducer transform / neighbor query when placing questions
+_PREDICT_CHUNK = 50000
+
+# Corpus embeddings mapped from shared memory in tag-group worker processes
+_worker_embeddings = {}
+
+
+def load_embedding_model(model_name: str = DEFAULT_EMBEDDING_MODEL):
     """Load sentence transformer model for embeddings."""
     print(f"Loading embedding model: {model_name}...")
     model = SentenceTransformer(model_name)
     return model
 
 
-def generate_embeddings(texts: List[str], model) -> np.ndarray:
+def generate_embeddings(texts: List[str], model,
+                        store: Optional[Dict[str, Any]] = None) -> np.ndarray:
     """
     Generate embeddings for texts.
     
     Args:
         texts: List of text strings
         model: SentenceTransformer model
+        store: Optional embedding store; only texts missing from it are encoded
         
     Returns:
         Array of embeddings
     """
     print(f"Generating embeddings for {len(texts)} texts...")
+    if store is not None:
+        normalize = store['meta']['normalize']
+        return embed_with_store(texts, store, lambda batch: model.encode(
+            batch, show_progress_bar=True, batch_size=32, normalize_embeddings=normalize
+        ))
     embeddings = model.encode(texts, show_progress_bar=True, batch_size=32)
     return embeddings
 
 
-def find_optimal_k(embeddings: np.ndarray, max_k: int = 20) -> int:
+def open_corpus_store(model_name: str = DEFAULT_EMBEDDING_MODEL, dtype: str = 'float32',
+                      use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """Open the persistent embedding store for a model, or None when caching is off."""
+    if not use_cache:
+        return None
+    return open_embedding_store(model_name, normalize=False, dtype=dtype)
+
+
+def resolve_kmeans_engine(num_items: int, engine: str = 'kmeans',
+                          minibatch_threshold: int = DEFAULT_MINIBATCH_THRESHOLD) -> str:
+    """Pick 'kmeans' or 'minibatch' for a group of num_items questions."""
+    if engine not in KMEANS_ENGINES:
+        raise ValueError(f"Unknown k-means engine '{engine}', expected one of {KMEANS_ENGINES}")
+    if engine == 'auto':
+        return 'minibatch' if num_items >= minibatch_threshold else 'kmeans'
+    return engine
+
+
+def fit_kmeans(embeddings: np.ndarray, k: int, engine: str = 'kmeans'):
     """
-    Find optimal number of clusters using elbow method.
+    Fit k-means with the pipeline's settings.
+    
+    Args:
+        embeddings: Embedding vectors
+        k: Number of clusters
+        engine: 'kmeans' or 'minibatch'
+    
+    Returns:
+        Fitted model
+    """
+    if engine == 'minibatch':
+        model = MiniBatchKMeans(n_clusters=k, random_state=42, n_init=3, batch_size=1024)
+    else:
+        model = KMeans(n_clusters=k, random_state=42, n_init=10)
+    return model.fit(embeddings)
+
+
+def _fit_kmeans_limited(embeddings: np.ndarray, k: int, engine: str, blas_threads: Optional[int]):
+    """Fit k-means with BLAS/OpenMP threads capped (parallel sweep worker)."""
+    if blas_threads is None:
+        # threadpool_limits inspects loaded libraries on every call; skip it when not limiting
+        return fit_kmeans(embeddings, k, engine)
+    with threadpool_limits(limits=blas_threads):
+        return fit_kmeans(embeddings, k, engine)
+
+
+def sweep_kmeans(embeddings: np.ndarray, k_values: List[int], engine: str = 'kmeans',
+                 n_jobs: int = 1, blas_threads: Optional[int] = None) -> Dict[int, Any]:
+    """
+    Fit k-means for several k, optionally in parallel.
+    
+    Args:
+        embeddings: Embedding vectors
+        k_values: Candidate numbers of clusters
+        engine: 'kmeans' or 'minibatch'
+        n_jobs: Parallel jobs; above 1, candidates are fitted in worker processes
+        blas_threads: Threads per fit (default: 1 when n_jobs > 1, else unlimited)
+    
+    Returns:
+        Dictionary mapping k to fitted model
+    """
+    if n_jobs > 1 and len(k_values) > 1:
+        if blas_threads is None:
+            blas_threads = 1
+        models = Parallel(n_jobs=min(n_jobs, len(k_values)))(
+            delayed(_fit_kmeans_limited)(embeddings, k, engine, blas_threads) for k in k_values
+        )
+    else:
+        models = [_fit_kmeans_limited(embeddings, k, engine, blas_threads) for k in k_values]
+    return dict(zip(k_values, models))
+
+
+def select_k(embeddings: np.ndarray, max_k: int = 20, criterion: str = 'elbow',
+             engine: str = 'kmeans', n_jobs: int = 1,
+             silhouette_sample: int = DEFAULT_SILHOUETTE_SAMPLE) -> Tuple[int, Dict[int, Any]]:
+    """
+    Choose the number of clusters and keep the fitted candidates.
     
     Args:
         embeddings: Embedding vectors
         max_k: Maximum k to test
-        
+        criterion: 'elbow' (maximum curvature of inertia) or 'silhouette'
+            (highest silhouette score on a sample of at most silhouette_sample points)
+        engine: 'kmeans' or 'minibatch'
+        n_jobs: Parallel jobs for the k sweep
+        silhouette_sample: Sample size for the silhouette criterion
+    
     Returns:
-        Optimal k value
+        Tuple of (optimal k, dictionary mapping each tested k to its fitted model)
     """
-    inertias = []
-    k_range = range(2, min(max_k + 1, len(embeddings) // 10))
+    if criterion not in K_CRITERIA:
+        raise ValueError(f"Unknown k criterion '{criterion}', expected one of {K_CRITERIA}")
     
-    for k in k_range:
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-        kmeans.fit(embeddings)
-        inertias.append(kmeans.inertia_)
+    k_range = list(range(2, min(max_k + 1, len(embeddings) // 10)))
+    models = sweep_kmeans(embeddings, k_range, engine, n_jobs)
+    
+    if criterion == 'silhouette':
+        scores = {}
+        for k, model in models.items():
+            if len(set(model.labels_)) > 1:
+                scores[k] = silhouette_score(embeddings, model.labels_,
+                                             sample_size=min(silhouette_sample, len(embeddings)),
+                                             random_state=42)
+        return (max(scores, key=scores.get) if scores else 2), models
+    
+    inertias = [models[k].inertia_ for k in k_range]
     
     # Simple elbow detection: find point with maximum curvature
     if len(inertias) < 3:
-        return 2
+        return 2, models
     
     # Calculate second derivative
     diffs = np.diff(inertias)
     second_diffs = np.diff(diffs)
     if len(second_diffs) > 0:
         optimal_idx = np.argmax(second_diffs) + 2
-        return list(k_range)[optimal_idx]
+        return k_range[optimal_idx], models
     
-    return 5  # Default
+    return 5, models  # Default
 
 
-def extract_keywords_from_cluster(texts: List[str], top_n: int = 10) -> List[str]:
+def find_optimal_k(embeddings: np.ndarray, max_k: int = 20, criterion: str = 'elbow',
+                   engine: str = 'kmeans', n_jobs: int = 1) -> int:
     """
-    Extract top keywords from a cluster using TF-IDF.
+    Find optimal number of clusters using elbow method.
     
     Args:
-        texts: List of texts in cluster
-        top_n: Number of keywords to extract
+        embeddings: Embedding vectors
+        max_k: Maximum k to test
+        criterion: 'elbow' or 'silhouette' (see select_k)
+        engine: 'kmeans' or 'minibatch'
+        n_jobs: Parallel jobs for the k sweep
         
     Returns:
-        List of top keywords
+        Optimal k value
+    """
+    return select_k(embeddings, max_k, criterion, engine, n_jobs)[0]
+
+
+def analyze_tokens(tokens: List[str]) -> List[str]:
     """
-    if len(texts) == 0:
-        return []
+    TF-IDF analyzer over pre-tokenized text.
     
-    vectorizer = TfidfVectorizer(max_features=top_n, stop_words='english', ngram_range=(1, 2))
-    try:
-        tfidf_matrix = vectorizer.fit_transform(texts)
-        feature_names = vectorizer.get_feature_names_out()
-        
-        # Get top features
-        scores = tfidf_matrix.sum(axis=0).A1
-        top_indices = scores.argsort()[-top_n:][::-1]
-        keywords = [feature_names[i] for i in top_indices]
+    Mirrors TfidfVectorizer(stop_words='english', ngram_range=(1, 2)):
+    drops single characters and sklearn English stopwords, then emits
+    unigrams and bigrams.
+    
+    Args:
+        tokens: Lowercased tokens
         
-        return keywords
-    except:
-        # Fallback: simple word frequency
-        all_words = ' '.join(texts).lower().split()
-        word_freq = Counter(all_words)
-        return [word for word, _ in word_freq.most_common(top_n)]
+    Returns:
+        List of unigram and bigram terms
+    """
+    words = [t for t in tokens if len(t) > 1 and t not in ENGLISH_STOP_WORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
 
 
-def map_existing_tags_to_clusters(df: pd.DataFrame, model) -> Dict[str, Any]:
+def build_term_matrix(df: pd.DataFrame,
+                      token_corpus: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Count unigram and bigram terms of combined_text over the whole corpus.
+    
+    The vocabulary is fitted once; keywords of any clustering are derived
+    from rows of this matrix (see ctfidf_keywords).
+    
+    Args:
+        df: Questions dataframe
+        token_corpus: Optional shared token corpus aligned with df
+    
+    Returns:
+        Dictionary with 'matrix' (documents x terms counts, CSR) and 'terms'
+    """
+    if has_token_column(token_corpus, 'combined_text', len(df)):
+        vectorizer = CountVectorizer(analyzer=analyze_tokens)
+        documents = get_token_rows(token_corpus, 'combined_text')[0]
+    else:
+        vectorizer = CountVectorizer(stop_words='english', ngram_range=(1, 2))
+        documents = df['combined_text'].tolist()
+    
+    try:
+        matrix = vectorizer.fit_transform(documents).tocsr()
+        terms = vectorizer.get_feature_names_out()
+    except ValueError:
+        # Empty vocabulary: no documents or only stopwords
+        matrix = sparse.csr_matrix((len(documents), 0), dtype=np.int64)
+        terms = np.array([], dtype=object)
+    
+    print(f"Term matrix: {matrix.shape[0]} documents x {matrix.shape[1]} terms")
+    return {
+        'matrix': matrix,
+        'terms': terms
+    }
+
+
+def ctfidf_keywords(term_matrix: Dict[str, Any], labels: np.ndarray,
+                    top_n: int = 10) -> Dict[int, List[str]]:
+    """
+    Extract top keywords for every cluster with class-based TF-IDF (c-TF-IDF).
+    
+    Term counts are summed per cluster with one sparse product. A term's
+    weight in a cluster is its share of the cluster's terms times
+    log(1 + A / f), where A is the average number of terms per cluster and
+    f the term's count over all clusters, so weights are comparable across
+    clusters.
+    
+    Args:
+        term_matrix: Corpus term matrix from build_term_matrix
+        labels: Cluster label per document; negative labels (noise,
+            unclustered rows) are ignored
+        top_n: Number of keywords per cluster
+    
+    Returns:
+        Dictionary mapping cluster label to keywords, best first
+    """
+    labels = np.asarray(labels)
+    rows = np.flatnonzero(labels >= 0)
+    classes, class_rows = np.unique(labels[rows], return_inverse=True)
+    if len(classes) == 0:
+        return {}
+    
+    indicator = sparse.csr_matrix((np.ones(len(rows)), (class_rows, rows)),
+                                  shape=(len(classes), len(labels)))
+    counts = (indicator @ term_matrix['matrix']).tocsr()
+    
+    class_terms = np.asarray(counts.sum(axis=1)).ravel()
+    term_totals = np.asarray(counts.sum(axis=0)).ravel()
+    idf = np.log1p(class_terms.mean() / np.maximum(term_totals, 1))
+    scores = (sparse.diags(1 / np.maximum(class_terms, 1)) @ counts @ sparse.diags(idf)).tocsr()
+    scores.sort_indices()
+    
+    terms = term_matrix['terms']
+    keywords = {}
+    for i, label in enumerate(classes):
+        start, end = scores.indptr[i], scores.indptr[i + 1]
+        top = np.argsort(-scores.data[start:end], kind='stable')[:top_n]
+        keywords[label.item()] = [str(terms[j]) for j in scores.indices[start:end][top]]
+    
+    return keywords
+
+
+def map_existing_tags_to_clusters(df: pd.DataFrame, model,
+                                  token_corpus: Optional[Dict[str, Any]] = None,
+                                  store: Optional[Dict[str, Any]] = None,
+                                  embeddings: Optional[np.ndarray] = None,
+                                  term_matrix: Optional[Dict[str, Any]] = None,
+                                  k_criterion: str = 'elbow',
+                                  kmeans_engine: str = 'kmeans',
+                                  k_jobs: int = 1,
+                                  n_workers: int = 1) -> Dict[str, Any]:
     """
     Map existing tags to semantic clusters.
     
+    Each tag group clusters its rows of one corpus embedding matrix, so
+    every question is embedded once in large batches. The k-means fit of
+    the chosen k is reused from the k sweep.
+    
+    Tag groups are independent jobs; with n_workers > 1 they run in a
+    process pool, largest first, reading the embedding matrix from shared
+    memory. Results do not depend on the number of workers. Keywords of
+    all groups' clusters come from one c-TF-IDF pass over the corpus term
+    matrix.
+    
     Args:
         df: Questions dataframe
         model: Embedding model
+        token_corpus: Optional shared token corpus aligned with df
+        store: Optional persistent embedding store
+        embeddings: Optional precomputed combined_text embeddings aligned with df
+        term_matrix: Optional corpus term matrix from build_term_matrix
+        k_criterion: Criterion for choosing k, 'elbow' or 'silhouette'
+        kmeans_engine: 'kmeans', 'minibatch' or 'auto' (minibatch for large groups)
+        k_jobs: Parallel jobs for each group's k sweep (in-process runs only)
+        n_workers: Worker processes for tag groups
         
     Returns:
         Dictionary with tag-based cluster analysis
@@ -121,83 +372,607 @@ def map_existing_tags_to_clusters(df: pd.DataFrame, model) -> Dict[str, Any]:
         # Get unique tag combinations
         df['tag_ids_str'] = df['tag_ids'].apply(lambda x: ','.join(map(str, sorted(x))) if x else 'no_tags')
         
-        for tag_combo, group_df in df.groupby('tag_ids_str'):
+        if embeddings is None:
+            embeddings = generate_embeddings(df['combined_text'].tolist(), model, store)
+        
+        tag_groups = df.groupby('tag_ids_str')
+        tasks = []
+        for tag_combo, group_df in tag_groups:
             if len(group_df) < 2:  # Skip groups with too few questions
                 continue
             
-            texts = group_df['combined_text'].tolist()
-            embeddings = generate_embeddings(texts, model)
-            
-            # Find optimal k for this tag group
-            optimal_k = find_optimal_k(embeddings, max_k=min(10, len(group_df) // 5))
-            optimal_k = max(2, min(optimal_k, len(group_df) // 2))
-            
-            # Cluster
-            kmeans = KMeans(n_clusters=optimal_k, random_state=42, n_init=10)
-            cluster_labels = kmeans.fit_predict(embeddings)
-            
-            # Extract keywords for each cluster
-            cluster_keywords = {}
-            for cluster_id in range(optimal_k):
-                cluster_texts = [texts[i] for i in range(len(texts)) if cluster_labels[i] == cluster_id]
-                keywords = extract_keywords_from_cluster(cluster_texts, top_n=10)
-                cluster_keywords[cluster_id] = {
-                    'keywords': keywords,
-                    'size': len(cluster_texts),
-                    'sample_questions': group_df.iloc[[i for i in range(len(texts)) if cluster_labels[i] == cluster_id][:3]]['QEN'].tolist()
-                }
-            
-            tag_clusters[tag_combo] = {
-                'total_questions': len(group_df),
-                'num_clusters': optimal_k,
-                'clusters': cluster_keywords,
-                'tag_names': group_df.iloc[0]['tag_names'] if 'tag_names' in group_df.columns else []
-            }
+            positions = tag_groups.indices[tag_combo]
+            tasks.append({
+                'tag_combo': tag_combo,
+                'positions': positions,
+                'questions': group_df['QEN'].tolist(),
+                'tag_names': group_df.iloc[0]['tag_names'] if 'tag_names' in group_df.columns else [],
+                'k_criterion': k_criterion,
+                'kmeans_engine': kmeans_engine,
+                'k_jobs': k_jobs if n_workers <= 1 else 1
+            })
+        
+        if n_workers > 1 and len(tasks) > 1:
+            shm, spec = share_array(embeddings)
+            try:
+                results = map_in_pool(_cluster_tag_group_shared, tasks, n_workers,
+                                      costs=[len(task['positions']) for task in tasks],
+                                      initializer=_attach_worker_embeddings, initargs=(spec,))
+            finally:
+                shm.close()
+                shm.unlink()
+        else:
+            results = [cluster_tag_group(embeddings, task) for task in tasks]
+        
+        # Number clusters across groups and describe them all in one pass
+        if term_matrix is None:
+            term_matrix = build_term_matrix(df, token_corpus)
+        corpus_labels = np.full(len(df), -1, dtype=np.int64)
+        offsets = []
+        next_label = 0
+        for task, (result, labels) in zip(tasks, results):
+            offsets.append(next_label)
+            corpus_labels[task['positions']] = labels + next_label
+            next_label += result['num_clusters']
+        keywords = ctfidf_keywords(term_matrix, corpus_labels, top_n=10)
+        
+        for task, offset, (result, _) in zip(tasks, offsets, results):
+            for cluster_id, cluster in result['clusters'].items():
+                cluster['keywords'] = keywords.get(offset + cluster_id, [])
+            tag_clusters[task['tag_combo']] = result
     
     return tag_clusters
 
 
-def identify_missing_clusters(df: pd.DataFrame, model, min_cluster_size: int = 10) -> Dict[str, Any]:
+def cluster_tag_group(embeddings: np.ndarray, task: Dict[str, Any]) -> Tuple[Dict[str, Any], np.ndarray]:
+    """
+    Cluster one tag group and describe its clusters.
+    
+    Cluster keywords are left empty; the caller fills them from one
+    c-TF-IDF pass over all groups' labels.
+    
+    Args:
+        embeddings: Corpus embedding matrix
+        task: Group job with 'positions' (rows of embeddings), 'questions',
+            'tag_names' and k-means settings
+    
+    Returns:
+        Tuple of (dictionary with the group's cluster analysis, cluster
+        label per group row)
+    """
+    num_questions = len(task['positions'])
+    group_embeddings = embeddings[task['positions']]
+    
+    # Find optimal k for this tag group
+    engine = resolve_kmeans_engine(num_questions, task['kmeans_engine'])
+    optimal_k, k_models = select_k(group_embeddings, max_k=min(10, num_questions // 5),
+                                   criterion=task['k_criterion'], engine=engine, n_jobs=task['k_jobs'])
+    optimal_k = max(2, min(optimal_k, num_questions // 2))
+    
+    # Cluster, reusing the sweep's fit when it tested this k
+    kmeans = k_models.get(optimal_k)
+    if kmeans is None:
+        kmeans = fit_kmeans(group_embeddings, optimal_k, engine)
+    cluster_labels = kmeans.labels_
+    
+    cluster_keywords = {}
+    for cluster_id in range(optimal_k):
+        members = np.flatnonzero(cluster_labels == cluster_id)
+        cluster_keywords[cluster_id] = {
+            'keywords': [],
+            'size': len(members),
+            'sample_questions': [task['questions'][i] for i in members[:3]]
+        }
+    
+    return {
+        'total_questions': num_questions,
+        'num_clusters': optimal_k,
+        'clusters': cluster_keywords,
+        'tag_names': task['tag_names']
+    }, cluster_labels
+
+
+def _attach_worker_embeddings(spec) -> None:
+    """Map the shared corpus embeddings and cap BLAS threads (tag-group worker initializer)."""
+    _worker_embeddings['shm'], _worker_embeddings['array'] = attach_array(spec)
+    # One BLAS/OpenMP thread per worker process avoids oversubscription
+    _worker_embeddings['limits'] = threadpool_limits(limits=1)
+
+
+def _cluster_tag_group_shared(task: Dict[str, Any]) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Cluster one tag group against the shared embeddings (process pool worker)."""
+    return cluster_tag_group(_worker_embeddings['array'], task)
+
+
+def fit_layout(reduced_embeddings: np.ndarray, layout: str = 'pca') -> Tuple[Any, np.ndarray]:
+    """
+    Project the clustering space to 2-D for plotting.
+    
+    Args:
+        reduced_embeddings: Clustering-space vectors
+        layout: 'pca' (linear projection, fast) or 'umap' (second manifold fit)
+    
+    Returns:
+        Tuple of (fitted layout model, 2-D coordinates)
+    """
+    if layout not in LAYOUT_METHODS:
+        raise ValueError(f"Unknown layout '{layout}', expected one of {LAYOUT_METHODS}")
+    
+    if layout == 'pca':
+        layout_model = PCA(n_components=2, random_state=42)
+    else:
+        layout_model = umap.UMAP(n_components=2, random_state=42, n_neighbors=15, min_dist=0.1)
+    return layout_model, layout_model.fit_transform(reduced_embeddings)
+
+
+def fit_projection(embeddings: np.ndarray, n_components: int = 50,
+                   layout: str = 'pca') -> Dict[str, Any]:
+    """
+    Fit the clustering-space reducer and the plot layout derived from it.
+    
+    UMAP is fitted once; the 2-D layout projects its output instead of
+    fitting the embeddings again, so with layout='pca' the plot costs one
+    PCA on the reduced vectors.
+    
+    Args:
+        embeddings: Question embeddings
+        n_components: Dimensions of the clustering space
+        layout: 2-D layout method, 'pca' or 'umap'
+    
+    Returns:
+        Dictionary with 'reducer', 'reduced_embeddings', 'layout_model'
+        and 'embeddings_2d'
+    """
+    print("Reducing dimensionality with UMAP...")
+    reducer = umap.UMAP(n_components=n_components, random_state=42, n_neighbors=15, min_dist=0.1)
+    reduced_embeddings = reducer.fit_transform(embeddings)
+    
+    print(f"Projecting clustering space to 2-D ({layout})...")
+    layout_model, embeddings_2d = fit_layout(reduced_embeddings, layout)
+    
+    return {
+        'reducer': reducer,
+        'reduced_embeddings': reduced_embeddings,
+        'layout_model': layout_model,
+        'embeddings_2d': embeddings_2d
+    }
+
+
+def question_strata(df: pd.DataFrame) -> Optional[np.ndarray]:
+    """
+    Label questions by primary category and tag combination for stratified sampling.
+    
+    Args:
+        df: Questions dataframe
+    
+    Returns:
+        Stratum label per question, or None without category and tag columns
+    """
+    parts = []
+    if 'primary_category' in df.columns:
+        parts.append(df['primary_category'].fillna('none').astype(str))
+    if 'tag_ids' in df.columns:
+        parts.append(df['tag_ids'].apply(lambda x: ','.join(map(str, sorted(x))) if x else 'no_tags'))
+    if not parts:
+        return None
+    strata = parts[0]
+    for part in parts[1:]:
+        strata = strata + '|' + part
+    return strata.to_numpy()
+
+
+def stratified_sample(strata: Optional[Sequence], num_items: int, sample_size: int,
+                      random_state: int = 42) -> np.ndarray:
+    """
+    Draw a sample with every stratum represented in proportion to its size.
+    
+    Strata get the floor of their proportional share; the remaining rows go
+    first to strata that would otherwise be missing, then to the largest
+    fractional shares.
+    
+    Args:
+        strata: Stratum label per item (None samples uniformly)
+        num_items: Number of items
+        sample_size: Number of items to draw
+        random_state: Random seed
+    
+    Returns:
+        Sorted positions of sampled items
+    """
+    if sample_size >= num_items:
+        return np.arange(num_items)
+    
+    if strata is not None:
+        codes = pd.factorize(pd.Series(strata), use_na_sentinel=False)[0]
+    else:
+        codes = np.zeros(num_items, dtype=np.int64)
+    counts = np.bincount(codes)
+    shares = counts * (sample_size / num_items)
+    quotas = np.floor(shares).astype(np.int64)
+    
+    extra = sample_size - quotas.sum()
+    priority = np.lexsort((-(shares - quotas), quotas > 0))
+    quotas[priority[:extra]] += 1
+    
+    # Shuffle, group by stratum (keeping shuffled order) and take each quota
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(num_items)
+    order = order[np.argsort(codes[order], kind='stable')]
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    ranks = np.arange(num_items) - starts
+    return np.sort(order[ranks < quotas[codes[order]]])
+
+
+def fit_cluster_model(embeddings: np.ndarray, keys: List[bytes],
+                      min_cluster_size: int = 10, min_samples: int = 5,
+                      layout: str = 'pca',
+                      model_name: str = DEFAULT_EMBEDDING_MODEL,
+                      sample_size: Optional[int] = None,
+                      strata: Optional[Sequence] = None) -> Dict[str, Any]:
+    """
+    Fit UMAP and HDBSCAN on the corpus, keeping what is needed to place new questions.
+    
+    HDBSCAN cannot predict, so the model keeps each fitted point's core
+    distance (distance to its min_samples-th neighbor), each cluster's
+    largest member core distance and a neighbor index over the clustering
+    space (see predict_clusters).
+    
+    With sample_size, UMAP and HDBSCAN are fitted on a stratified sample
+    only (min_cluster_size then applies to the sample) and the other
+    questions are placed with predict_clusters, so the density fit stays
+    bounded for large corpora.
+    
+    Args:
+        embeddings: Question embeddings
+        keys: Text key per embedding row (see embedding_store.text_key)
+        min_cluster_size: Minimum cluster size for HDBSCAN
+        min_samples: HDBSCAN core point neighborhood size
+        layout: 2-D plot layout of the clustering space, 'pca' or 'umap'
+        model_name: Embedding model name the embeddings come from
+        sample_size: Optional number of questions to fit on
+        strata: Optional stratum label per row for sampling (see question_strata)
+    
+    Returns:
+        Clustering model dict; 'index' maps text keys to rows of 'labels',
+        'reduced_embeddings' and 'embeddings_2d' (fitted and assigned questions)
+    """
+    fit_rows = np.arange(len(keys))
+    if sample_size is not None and sample_size < len(keys):
+        fit_rows = stratified_sample(strata, len(keys), sample_size)
+        print(f"Fitting clustering on a stratified sample of {len(fit_rows)} of {len(keys)} questions...")
+    
+    projection = fit_projection(embeddings[fit_rows], n_components=50, layout=layout)
+    reduced_embeddings = projection['reduced_embeddings']
+    
+    print("Clustering with HDBSCAN...")
+    clusterer = HDBSCAN(min_cluster_size=min_cluster_size, min_samples=min_samples)
+    cluster_labels = clusterer.fit_predict(reduced_embeddings)
+    
+    # Core distances count the point itself, as HDBSCAN does
+    neighbors = NearestNeighbors(n_neighbors=min(min_samples, len(reduced_embeddings)))
+    neighbors.fit(reduced_embeddings)
+    core_distances = neighbors.kneighbors(reduced_embeddings)[0][:, -1]
+    
+    # Sparsest member of each cluster bounds the reachability of new members
+    cluster_reach = np.zeros(cluster_labels.max() + 1)
+    clustered = cluster_labels >= 0
+    np.maximum.at(cluster_reach, cluster_labels[clustered], core_distances[clustered])
+    
+    cluster_model = {
+        'settings': {
+            'model_name': model_name,
+            'min_cluster_size': min_cluster_size,
+            'min_samples': min_samples,
+            'layout': layout,
+            'sample_size': sample_size
+        },
+        'reducer': projection['reducer'],
+        'layout_model': projection['layout_model'],
+        'neighbors': neighbors,
+        'fitted_labels': cluster_labels,
+        'core_distances': core_distances,
+        'cluster_reach': cluster_reach,
+        'noise_rate': float(np.mean(cluster_labels == -1)),
+        'index': {},
+        'labels': cluster_labels[:0],
+        'reduced_embeddings': reduced_embeddings[:0],
+        'embeddings_2d': projection['embeddings_2d'][:0],
+        'num_fitted': len(keys),
+        'num_assigned': 0,
+        'num_assigned_outliers': 0
+    }
+    _record_questions(cluster_model, [keys[i] for i in fit_rows], {
+        'cluster_labels': cluster_labels,
+        'reduced_embeddings': reduced_embeddings,
+        'embeddings_2d': projection['embeddings_2d']
+    })
+    
+    # Extend a sampled fit to the other questions; they set the noise
+    # baseline with the sample
+    if len(fit_rows) < len(keys):
+        rest = np.setdiff1d(np.arange(len(keys)), fit_rows)
+        print(f"Assigning the other {len(rest)} questions to {len(cluster_reach)} clusters...")
+        _record_questions(cluster_model, [keys[i] for i in rest], predict_clusters(cluster_model, embeddings[rest]))
+        cluster_model['noise_rate'] = float(np.mean(cluster_model['labels'] == -1))
+    
+    # Only questions assigned after the fit count toward drift
+    cluster_model['num_assigned'] = 0
+    cluster_model['num_assigned_outliers'] = 0
+    
+    return cluster_model
+
+
+def predict_clusters(cluster_model: Dict[str, Any], embeddings: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Approximately predict clusters of questions without refitting.
+    
+    Questions are projected with the fitted reducer. Like HDBSCAN, distances
+    to fitted questions are taken as mutual reachability (the largest of the
+    distance and both core distances); a question joins the cluster of its
+    most reachable clustered neighbor if that is no farther than the
+    cluster's sparsest member, otherwise it is an outlier (-1).
+    
+    Args:
+        cluster_model: Clustering model from fit_cluster_model
+        embeddings: Question embeddings
+    
+    Returns:
+        Dictionary with 'cluster_labels', 'reduced_embeddings' and 'embeddings_2d'
+    """
+    labels = [cluster_model['fitted_labels'][:0]]
+    reduced = [cluster_model['reduced_embeddings'][:0]]
+    layout = [cluster_model['embeddings_2d'][:0]]
+    
+    for start in range(0, len(embeddings), _PREDICT_CHUNK):
+        reduced_embeddings = cluster_model['reducer'].transform(embeddings[start:start + _PREDICT_CHUNK])
+        distances, nearest = cluster_model['neighbors'].kneighbors(reduced_embeddings)
+        
+        # Core distance of a new question counts the question itself
+        k = distances.shape[1]
+        own_core = distances[:, k - 2] if k > 1 else np.zeros(len(distances))
+        reach = np.maximum(distances, np.maximum(own_core[:, None], cluster_model['core_distances'][nearest]))
+        neighbor_labels = cluster_model['fitted_labels'][nearest]
+        reach[neighbor_labels == -1] = np.inf
+        
+        best = reach.argmin(axis=1)
+        best_reach = reach[np.arange(len(best)), best]
+        best_labels = neighbor_labels[np.arange(len(best)), best]
+        within = np.isfinite(best_reach)
+        within[within] = best_reach[within] <= cluster_model['cluster_reach'][best_labels[within]]
+        
+        labels.append(np.where(within, best_labels, -1))
+        reduced.append(reduced_embeddings)
+        layout.append(cluster_model['layout_model'].transform(reduced_embeddings))
+    
+    return {
+        'cluster_labels': np.concatenate(labels),
+        'reduced_embeddings': np.concatenate(reduced),
+        'embeddings_2d': np.concatenate(layout)
+    }
+
+
+def _record_questions(cluster_model: Dict[str, Any], keys: List[bytes], placed: Dict[str, np.ndarray]) -> int:
+    """Add questions not yet in the model with their placement; returns how many were added."""
+    index = cluster_model['index']
+    next_row = len(cluster_model['labels'])
+    rows = []
+    for i, key in enumerate(keys):
+        if key not in index:
+            index[key] = next_row + len(rows)
+            rows.append(i)
+    
+    if rows:
+        for field in ('reduced_embeddings', 'embeddings_2d'):
+            cluster_model[field] = np.concatenate([cluster_model[field], placed[field][rows]])
+        cluster_model['labels'] = np.concatenate([cluster_model['labels'], placed['cluster_labels'][rows]])
+        cluster_model['num_assigned'] += len(rows)
+        cluster_model['num_assigned_outliers'] += int(np.sum(placed['cluster_labels'][rows] == -1))
+    
+    return len(rows)
+
+
+def assign_questions(cluster_model: Dict[str, Any], new_df: pd.DataFrame, model=None,
+                     embeddings: Optional[np.ndarray] = None,
+                     store: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Place new questions into the persisted clusters without refitting.
+    
+    Questions are placed with predict_clusters; those fitting no cluster are
+    candidate new themes. Questions not yet in the model are recorded in it
+    and count toward drift (see needs_refit).
+    
+    Args:
+        cluster_model: Clustering model from fit_cluster_model
+        new_df: Questions dataframe with 'QID' and 'combined_text'
+        model: Embedding model (when embeddings are not given)
+        embeddings: Optional precomputed combined_text embeddings aligned with new_df
+        store: Optional persistent embedding store
+    
+    Returns:
+        Dictionary with 'cluster_labels', 'reduced_embeddings',
+        'embeddings_2d' and 'candidate_new_themes' (QIDs of outliers)
+    """
+    texts = new_df['combined_text'].tolist()
+    if embeddings is None:
+        embeddings = generate_embeddings(texts, model, store)
+    
+    assignment = predict_clusters(cluster_model, embeddings)
+    _record_questions(cluster_model, [text_key(text) for text in texts], assignment)
+    
+    outliers = assignment['cluster_labels'] == -1
+    print(f"Assigned {len(texts) - int(outliers.sum())} of {len(texts)} questions to existing clusters, "
+          f"{int(outliers.sum())} candidate new themes")
+    
+    assignment['candidate_new_themes'] = new_df['QID'][outliers].tolist()
+    return assignment
+
+
+def needs_refit(cluster_model: Dict[str, Any],
+                new_fraction: float = DEFAULT_REFIT_NEW_FRACTION,
+                outlier_margin: float = DEFAULT_REFIT_OUTLIER_MARGIN) -> Optional[str]:
+    """
+    Check whether questions assigned since the fit have drifted from it.
+    
+    Args:
+        cluster_model: Clustering model from fit_cluster_model
+        new_fraction: Maximum assigned questions as a share of fitted ones
+        outlier_margin: Maximum excess of the assigned outlier rate over the
+            noise rate of the fit
+    
+    Returns:
+        Reason to refit, or None
+    """
+    assigned = cluster_model['num_assigned']
+    if assigned > new_fraction * cluster_model['num_fitted']:
+        return f"{assigned} questions assigned since the fit of {cluster_model['num_fitted']}"
+    
+    if assigned >= cluster_model['settings']['min_cluster_size']:
+        outlier_rate = cluster_model['num_assigned_outliers'] / assigned
+        if outlier_rate > cluster_model['noise_rate'] + outlier_margin:
+            return (f"{outlier_rate:.0%} of assigned questions are outliers "
+                    f"({cluster_model['noise_rate']:.0%} noise in the fit)")
+    
+    return None
+
+
+def save_cluster_model(cluster_model: Dict[str, Any], path: str = DEFAULT_CLUSTER_MODEL_PATH) -> None:
+    """Persist a clustering model (written to a temporary file, then renamed)."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    joblib.dump(cluster_model, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_cluster_model(path: str = DEFAULT_CLUSTER_MODEL_PATH) -> Optional[Dict[str, Any]]:
+    """Load a persisted clustering model, or None if there is none."""
+    if not Path(path).exists():
+        return None
+    return joblib.load(path)
+
+
+def compare_cluster_labels(reference_labels: np.ndarray, labels: np.ndarray) -> Dict[str, Any]:
+    """
+    Compare a clustering of questions with a reference clustering of the same questions.
+    
+    Used to check a sampled fit against a full fit. Agreement scores are
+    computed over questions clustered in both; noise is compared separately.
+    
+    Args:
+        reference_labels: Reference cluster label per question (-1 = noise)
+        labels: Cluster label per question (-1 = noise)
+    
+    Returns:
+        Dictionary with cluster counts, noise rates, 'noise_agreement',
+        'both_clustered' and 'ari'/'ami' over questions clustered in both
+    """
+    reference_labels = np.asarray(reference_labels)
+    labels = np.asarray(labels)
+    both = (reference_labels >= 0) & (labels >= 0)
+    
+    return {
+        'reference_clusters': len(set(reference_labels[reference_labels >= 0])),
+        'clusters': len(set(labels[labels >= 0])),
+        'reference_noise_rate': float(np.mean(reference_labels == -1)),
+        'noise_rate': float(np.mean(labels == -1)),
+        'noise_agreement': float(np.mean((reference_labels == -1) == (labels == -1))),
+        'both_clustered': float(np.mean(both)),
+        'ari': float(adjusted_rand_score(reference_labels[both], labels[both])) if both.any() else float('nan'),
+        'ami': float(adjusted_mutual_info_score(reference_labels[both], labels[both])) if both.any() else float('nan')
+    }
+
+
+def identify_missing_clusters(df: pd.DataFrame, model, min_cluster_size: int = 10,
+                              token_corpus: Optional[Dict[str, Any]] = None,
+                              embeddings: Optional[np.ndarray] = None,
+                              store: Optional[Dict[str, Any]] = None,
+                              term_matrix: Optional[Dict[str, Any]] = None,
+                              layout: str = 'pca',
+                              cluster_model_path: Optional[str] = None,
+                              refit: bool = False,
+                              model_name: str = DEFAULT_EMBEDDING_MODEL,
+                              sample_size: Optional[int] = None) -> Dict[str, Any]:
     """
     Identify missing semantic clusters using HDBSCAN.
     
+    With cluster_model_path the fitted UMAP/HDBSCAN model is persisted.
+    Later runs assign only questions the model has not seen to its
+    clusters (see assign_questions), keeping cluster ids stable; a full
+    refit runs when refit is set, the settings change or the assigned
+    questions drift (see needs_refit).
+    
+    With sample_size, the density fit uses a sample stratified by primary
+    category and tags and is extended to the other questions (see
+    fit_cluster_model).
+    
     Args:
         df: Questions dataframe
         model: Embedding model
         min_cluster_size: Minimum cluster size for HDBSCAN
-        
+        token_corpus: Optional shared token corpus aligned with df
+        embeddings: Optional precomputed combined_text embeddings aligned with df
+        store: Optional persistent embedding store
+        term_matrix: Optional corpus term matrix from build_term_matrix
+        layout: 2-D plot layout of the clustering space, 'pca' or 'umap'
+        cluster_model_path: Optional path of the persisted clustering model
+        refit: Whether to refit even if a persisted model is usable
+        model_name: Embedding model name (a persisted model must match it)
+        sample_size: Optional number of questions to fit UMAP/HDBSCAN on
+    
     Returns:
         Dictionary with missing cluster analysis
     """
     print("Identifying missing semantic clusters...")
     
-    # Generate embeddings for all questions
     texts = df['combined_text'].tolist()
-    embeddings = generate_embeddings(texts, model)
+    keys = [text_key(text) for text in texts]
+    settings = {'model_name': model_name, 'min_cluster_size': min_cluster_size, 'min_samples': 5,
+                'layout': layout, 'sample_size': sample_size}
     
-    # Reduce dimensionality for HDBSCAN
-    print("Reducing dimensionality with UMAP...")
-    reducer = umap.UMAP(n_components=50, random_state=42, n_neighbors=15, min_dist=0.1)
-    reduced_embeddings = reducer.fit_transform(embeddings)
+    # Reuse the persisted model unless it no longer fits the corpus
+    cluster_model = None
+    if cluster_model_path is not None and not refit:
+        cluster_model = load_cluster_model(cluster_model_path)
+    if cluster_model is not None:
+        reason = 'settings changed' if cluster_model['settings'] != settings else needs_refit(cluster_model)
+        if reason is not None:
+            print(f"Refitting clustering model: {reason}")
+            cluster_model = None
     
-    # Cluster with HDBSCAN
-    print("Clustering with HDBSCAN...")
-    clusterer = HDBSCAN(min_cluster_size=min_cluster_size, min_samples=5)
-    cluster_labels = clusterer.fit_predict(reduced_embeddings)
+    candidate_new_themes = []
+    if cluster_model is None:
+        if embeddings is None:
+            embeddings = generate_embeddings(texts, model, store)
+        cluster_model = fit_cluster_model(embeddings, keys, strata=question_strata(df), **settings)
+    else:
+        new_rows = np.array([i for i, key in enumerate(keys) if key not in cluster_model['index']], dtype=np.int64)
+        print(f"Assigning {len(new_rows)} new questions to the persisted clustering model...")
+        assignment = assign_questions(cluster_model, df.iloc[new_rows], model,
+                                      embeddings=embeddings[new_rows] if embeddings is not None else None,
+                                      store=store)
+        candidate_new_themes = assignment['candidate_new_themes']
+    
+    if cluster_model_path is not None:
+        save_cluster_model(cluster_model, cluster_model_path)
+    
+    rows = np.fromiter((cluster_model['index'][key] for key in keys), dtype=np.int64, count=len(keys))
+    cluster_labels = cluster_model['labels'][rows]
+    reduced_embeddings = cluster_model['reduced_embeddings'][rows]
     
     # Analyze clusters
     unique_clusters = set(cluster_labels)
     if -1 in unique_clusters:
         unique_clusters.remove(-1)  # Remove noise label
     
+    # Extract keywords of all clusters from the corpus term matrix
+    if term_matrix is None:
+        term_matrix = build_term_matrix(df, token_corpus)
+    cluster_keywords = ctfidf_keywords(term_matrix, cluster_labels, top_n=10)
+    
     discovered_clusters = {}
     for cluster_id in unique_clusters:
-        cluster_indices = [i for i, label in enumerate(cluster_labels) if label == cluster_id]
-        cluster_texts = [texts[i] for i in cluster_indices]
+        cluster_indices = np.flatnonzero(cluster_labels == cluster_id)
         cluster_questions = df.iloc[cluster_indices]
-        
-        # Extract keywords
-        keywords = extract_keywords_from_cluster(cluster_texts, top_n=10)
+        keywords = cluster_keywords.get(cluster_id, [])
         
         # Check if this cluster matches existing tags
         if 'tag_ids' in cluster_questions.columns:
@@ -227,30 +1002,47 @@ def identify_missing_clusters(df: pd.DataFrame, model, min_cluster_size: int = 1
         'orphan_clusters': orphan_clusters,
         'cluster_labels': cluster_labels,
         'reduced_embeddings': reduced_embeddings,
+        'embeddings_2d': cluster_model['embeddings_2d'][rows],
+        'layout': layout,
         'num_clusters': len(unique_clusters),
-        'noise_points': list(cluster_labels).count(-1)
+        'noise_points': list(cluster_labels).count(-1),
+        'candidate_new_themes': candidate_new_themes
     }
 
 
 def visualize_clusters(cluster_analysis: Dict[str, Any],
                        tag_clusters: Dict[str, Any],
-                       output_path: str = "outputs/clusters_visualization.png"):
+                       output_path: str = "outputs/clusters_visualization.png",
+                       plot_mode: str = 'auto',
+                       layout: str = 'pca'):
     """
-    Visualize clusters using UMAP.
+    Visualize clusters in the 2-D layout of the UMAP clustering space.
+    
+    The hexbin mode draws point density in bins with cluster ids at their
+    medians, so its cost does not grow with the number of points drawn.
     
     Args:
         cluster_analysis: Missing cluster analysis results
         tag_clusters: Tag-based cluster analysis
         output_path: Output file path
+        plot_mode: 'scatter', 'hexbin' or 'auto' (hexbin for large corpora)
+        layout: Layout to fit when the analysis has none, 'pca' or 'umap'
     """
     print("Creating cluster visualization...")
     
-    reduced_embeddings = cluster_analysis['reduced_embeddings']
+    if plot_mode not in PLOT_MODES:
+        raise ValueError(f"Unknown plot mode '{plot_mode}', expected one of {PLOT_MODES}")
+    
     cluster_labels = cluster_analysis['cluster_labels']
     
-    # Further reduce to 2D for visualization
-    reducer_2d = umap.UMAP(n_components=2, random_state=42, n_neighbors=15, min_dist=0.1)
-    embeddings_2d = reducer_2d.fit_transform(reduced_embeddings)
+    # Reuse the layout fitted with the clustering space when available
+    embeddings_2d = cluster_analysis.get('embeddings_2d')
+    layout = cluster_analysis.get('layout', layout)
+    if embeddings_2d is None:
+        embeddings_2d = fit_layout(cluster_analysis['reduced_embeddings'], layout)[1]
+    
+    if plot_mode == 'auto':
+        plot_mode = 'hexbin' if len(cluster_labels) >= DEFAULT_HEXBIN_THRESHOLD else 'scatter'
     
     plt.figure(figsize=(14, 10))
     
@@ -258,21 +1050,33 @@ def visualize_clusters(cluster_analysis: Dict[str, Any],
     unique_labels = set(cluster_labels)
     colors = plt.cm.tab20(np.linspace(0, 1, len(unique_labels)))
     
-    for i, label in enumerate(unique_labels):
-        if label == -1:
-            # Noise points
-            mask = cluster_labels == label
-            plt.scatter(embeddings_2d[mask, 0], embeddings_2d[mask, 1],
-                       c='gray', alpha=0.1, s=10, label='Noise' if i == 0 else '')
-        else:
-            mask = cluster_labels == label
-            plt.scatter(embeddings_2d[mask, 0], embeddings_2d[mask, 1],
-                       c=[colors[i]], alpha=0.6, s=20, label=f'Cluster {label}')
-    
-    plt.title('Semantic Clusters Visualization (UMAP)', fontsize=16)
-    plt.xlabel('UMAP Dimension 1', fontsize=12)
-    plt.ylabel('UMAP Dimension 2', fontsize=12)
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    if plot_mode == 'hexbin':
+        # Density of all points, cluster ids at their medians
+        plt.hexbin(embeddings_2d[:, 0], embeddings_2d[:, 1], gridsize=120, bins='log', cmap='Greys', mincnt=1)
+        plt.colorbar(label='Questions per bin (log scale)')
+        for i, label in enumerate(unique_labels):
+            if label != -1:
+                center = np.median(embeddings_2d[cluster_labels == label], axis=0)
+                plt.annotate(str(label), center, fontsize=8, ha='center', va='center',
+                             color=colors[i], fontweight='bold')
+    else:
+        for i, label in enumerate(unique_labels):
+            if label == -1:
+                # Noise points
+                mask = cluster_labels == label
+                plt.scatter(embeddings_2d[mask, 0], embeddings_2d[mask, 1],
+                           c='gray', alpha=0.1, s=10, label='Noise' if i == 0 else '')
+            else:
+                mask = cluster_labels == label
+                plt.scatter(embeddings_2d[mask, 0], embeddings_2d[mask, 1],
+                           c=[colors[i]], alpha=0.6, s=20, label=f'Cluster {label}')
+    
+    layout_name = 'UMAP' if layout == 'umap' else 'UMAP + PCA'
+    plt.title(f'Semantic Clusters Visualization ({layout_name})', fontsize=16)
+    plt.xlabel(f'{layout_name} Dimension 1', fontsize=12)
+    plt.ylabel(f'{layout_name} Dimension 2', fontsize=12)
+    if plot_mode == 'scatter':
+        plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
     plt.tight_layout()
     plt.savefig(output_path, dpi=300, bbox_inches='tight')
     plt.close()
@@ -280,30 +1084,83 @@ def visualize_clusters(cluster_analysis: Dict[str, Any],
     print(f"Cluster visualization saved to {output_path}")
 
 
-def analyze_semantic_clustering(df: pd.DataFrame) -> Dict[str, Any]:
+def analyze_semantic_clustering(df: pd.DataFrame,
+                                token_corpus: Optional[Dict[str, Any]] = None,
+                                model=None,
+                                embeddings: Optional[np.ndarray] = None,
+                                model_name: str = DEFAULT_EMBEDDING_MODEL,
+                                use_cache: bool = True,
+                                embedding_dtype: str = 'float32',
+                                k_criterion: str = 'elbow',
+                                kmeans_engine: str = 'kmeans',
+                                k_jobs: int = 1,
+                                cluster_workers: int = 1,
+                                layout: str = 'pca',
+                                plot_mode: str = 'auto',
+                                refit_clusters: bool = False,
+                                cluster_sample_size: Optional[int] = None) -> Dict[str, Any]:
     """
     Complete semantic clustering analysis pipeline.
     
     Args:
         df: Questions dataframe
-        
+        token_corpus: Optional shared token corpus aligned with df
+        model: Optional already loaded embedding model
+        embeddings: Optional precomputed combined_text embeddings aligned with df
+        model_name: Embedding model name (loads the model and scopes the store)
+        use_cache: Whether to reuse embeddings and the clustering model stored on disk
+        embedding_dtype: Storage precision of the embedding store, 'float32' or 'float16'
+        k_criterion: Criterion for choosing k per tag group, 'elbow' or 'silhouette'
+        kmeans_engine: 'kmeans', 'minibatch' or 'auto' (minibatch for large groups)
+        k_jobs: Parallel jobs for each tag group's k sweep
+        cluster_workers: Worker processes for per-tag-group clustering
+        layout: 2-D plot layout of the clustering space, 'pca' or 'umap'
+        plot_mode: Cluster plot renderer, 'scatter', 'hexbin' or 'auto'
+        refit_clusters: Whether to refit the persisted UMAP/HDBSCAN model
+            instead of assigning new questions to it
+        cluster_sample_size: Optional number of questions to fit UMAP/HDBSCAN
+            on (stratified sample, extended to the rest)
+    
     Returns:
         Dictionary with all clustering analysis results
     """
-    model = load_embedding_model()
+    if model is None:
+        model = load_embedding_model(model_name)
+    store = open_corpus_store(model_name, embedding_dtype, use_cache)
+    
+    # Embed the corpus once; both parts use rows of this matrix
+    if embeddings is None:
+        embeddings = generate_embeddings(df['combined_text'].tolist(), model, store)
+    
+    # One vocabulary for the keywords of both parts
+    term_matrix = build_term_matrix(df, token_corpus)
     
     # Part A: Map existing tags to clusters
-    tag_clusters = map_existing_tags_to_clusters(df, model)
+    tag_clusters = map_existing_tags_to_clusters(df, model, token_corpus, embeddings=embeddings,
+                                                 term_matrix=term_matrix, k_criterion=k_criterion, kmeans_engine=kmeans_engine,
+                                                 k_jobs=k_jobs, n_workers=cluster_workers)
     
     # Part B: Identify missing clusters
-    missing_clusters = identify_missing_clusters(df, model)
+    missing_clusters = identify_missing_clusters(df, model, token_corpus=token_corpus, embeddings=embeddings,
+                                                 term_matrix=term_matrix, layout=layout,
+                                                 cluster_model_path=DEFAULT_CLUSTER_MODEL_PATH if use_cache else None,
+                                                 refit=refit_clusters, model_name=model_name,
+                                                 sample_size=cluster_sample_size)
+    
+    # Drop stored texts no longer in the corpus once they outnumber it
+    if store is not None:
+        corpus_keys = set(text_key(text) for text in df['combined_text'].tolist())
+        if store['meta']['rows'] > 2 * len(corpus_keys):
+            dropped = compact_embedding_store(store, corpus_keys)
+            print(f"Compacted embedding store, dropped {dropped} stale embeddings")
     
     # Visualize
-    visualize_clusters(missing_clusters, tag_clusters)
+    visualize_clusters(missing_clusters, tag_clusters, plot_mode=plot_mode)
     
     return {
         'tag_clusters': tag_clusters,
         'missing_clusters': missing_clusters,
-        'model': model
+        'model': model,
+        'embeddings': embeddings
     }
 
@@ -1,9 +1,22 @@
 """Sociological taxonomy analysis: keyword-based field coverage."""
 
+import numpy as np
 import pandas as pd
 import re
-from typing import Dict, List, Any
-from collections import defaultdict
+from typing import Dict, List, Any, Tuple
+
+try:
+    import pyarrow as pa
+except ImportError:  # Optional: vectorized regex kernels for ASCII texts
+    pa = None
+
+
+# Field assignment: keyword matches, embedding similarity or the union of both
+TAXONOMY_MODES = ['keyword', 'embedding', 'hybrid']
+
+# Defaults for embedding mode: minimum cosine similarity and fields per question
+DEFAULT_FIELD_THRESHOLD = 0.3
+DEFAULT_FIELD_TOP_K = 2
 
 
 def create_keyword_dictionaries() -> Dict[str, List[str]]:
@@ -62,6 +75,23 @@ def create_keyword_dictionaries() -> Dict[str, List[str]]:
     }
 
 
+def create_field_descriptions() -> Dict[str, str]:
+    """
+    Create short descriptions of social fields, embedded with their keywords.
+    
+    Returns:
+        Dictionary mapping field name to description
+    """
+    return {
+        'Domestic Sphere': 'Cooking, cleaning, pets, gardening and running a home',
+        'Digital Life': 'Apps, social media, internet culture, gadgets and streaming',
+        'Nostalgia': 'Childhood memories, retro toys, snacks, cartoons and past decades',
+        'Somatic/Body': 'Sleep, health, fitness, nutrition, anatomy and medicine',
+        'Visual Memory': 'Recognizing logos, colors, symbols, shapes and designs',
+        'Common Sense': 'Everyday practical knowledge, life skills and basic how-to questions'
+    }
+
+
 def search_keywords_in_text(text: str, keywords: List[str]) -> List[str]:
     """
     Search for keywords in text (case-insensitive, partial match).
@@ -88,46 +118,252 @@ def search_keywords_in_text(text: str, keywords: List[str]) -> List[str]:
     return matched
 
 
-def analyze_field_coverage(df: pd.DataFrame, keyword_dict: Dict[str, List[str]]) -> Dict[str, Any]:
+def compile_keyword_matcher(keyword_dict: Dict[str, List[str]]) -> Dict[str, Any]:
+    """
+    Compile the keywords of all fields into one regex.
+    
+    The regex tries every keyword at every position inside a lookahead, so a
+    single scan finds all word-bounded keyword occurrences, overlapping ones
+    included. At one position it reports the longest matching keyword; the
+    shorter keywords it shadows there are fixed by the keyword text alone
+    and precomputed.
+    
+    Args:
+        keyword_dict: Dictionary of field names to keywords
+    
+    Returns:
+        Dictionary with 'pattern' (compiled regex), 'keywords' (lowercased
+        keywords in pattern order), 'shadowed' (keyword -> shorter keywords
+        matching wherever it matches) and 'fields' ((keyword, lowercased
+        keyword) pairs per field)
+    """
+    lowered = sorted(set(keyword.lower() for keywords in keyword_dict.values() for keyword in keywords),
+                     key=lambda keyword: (-len(keyword), keyword))
+    pattern = re.compile(
+        r'(?=\b(' + '|'.join(re.escape(keyword) for keyword in lowered) + r')\b)', re.IGNORECASE
+    )
+    
+    # A keyword shadows the others that match at the start of its own text
+    prefixes = [(other, re.compile(r'\b' + re.escape(other) + r'\b', re.IGNORECASE)) for other in lowered]
+    shadowed = {
+        keyword: [other for other, prefix in prefixes if other != keyword and prefix.match(keyword)]
+        for keyword in lowered
+    }
+    
+    return {
+        'pattern': pattern,
+        'keywords': lowered,
+        'shadowed': shadowed,
+        'fields': {
+            field_name: [(keyword, keyword.lower()) for keyword in keywords]
+            for field_name, keywords in keyword_dict.items()
+        }
+    }
+
+
+def match_keywords(matcher: Dict[str, Any], text: str) -> Dict[str, List[str]]:
+    """
+    Find the keywords of every field in a text with one regex scan.
+    
+    Gives the same matches as search_keywords_in_text for each field.
+    
+    Args:
+        matcher: Matcher from compile_keyword_matcher
+        text: Text to search
+    
+    Returns:
+        Dictionary mapping field names to matched keywords (fields without
+        matches are omitted)
+    """
+    if pd.isna(text) or text == "":
+        return {}
+    
+    shadowed = matcher['shadowed']
+    found = set()
+    for keyword in matcher['pattern'].findall(str(text).lower()):
+        if keyword not in shadowed:
+            # Case-insensitive match of a differently spelled text (e.g. 'ſ' for 's')
+            keyword = next(k for k in matcher['keywords'] if re.fullmatch(re.escape(k), keyword, re.IGNORECASE))
+        if keyword not in found:
+            found.add(keyword)
+            found.update(shadowed[keyword])
+    
+    if not found:
+        return {}
+    
+    matches = {}
+    for field_name, keywords in matcher['fields'].items():
+        field_keywords = [keyword for keyword, lowered in keywords if lowered in found]
+        if field_keywords:
+            matches[field_name] = field_keywords
+    
+    return matches
+
+
+def field_pattern(keywords: List[str]) -> str:
+    """Regex matching any of the keywords as whole words, case-insensitively."""
+    return r'(?i)\b(?:' + '|'.join(re.escape(keyword.lower()) for keyword in keywords) + r')\b'
+
+
+def build_field_matrix(df: pd.DataFrame, keyword_dict: Dict[str, List[str]]) -> pd.DataFrame:
+    """
+    Flag the social fields of every question as a multi-hot boolean matrix.
+    
+    Each field is one vectorized regex search over the lowercased
+    combined_text column. ASCII rows use pyarrow's regex kernel when available;
+    other rows use Python's re, whose Unicode word boundaries differ (e.g. in
+    'cooké'), so results equal search_keywords_in_text either way.
+    
+    Args:
+        df: Questions dataframe
+        keyword_dict: Dictionary of field names to keywords
+    
+    Returns:
+        Boolean dataframe with df's index and one column per field, ready to
+        join with tag_ids, primary_category or cluster labels
+    """
+    if 'combined_text' in df.columns:
+        texts = df['combined_text'].fillna('').astype(str).str.lower()
+    else:
+        texts = pd.Series('', index=df.index, dtype=str)
+    
+    ascii_rows = np.fromiter(map(str.isascii, texts), dtype=bool, count=len(texts))
+    ascii_texts = texts[ascii_rows]
+    if pa is not None:
+        ascii_texts = ascii_texts.astype('string[pyarrow]')
+    other_texts = texts[~ascii_rows].astype(object)
+    
+    columns = {}
+    for field_name, keywords in keyword_dict.items():
+        pattern = field_pattern(keywords)
+        matched = np.zeros(len(df), dtype=bool)
+        matched[ascii_rows] = ascii_texts.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+        matched[~ascii_rows] = other_texts.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+        columns[field_name] = matched
+    
+    return pd.DataFrame(columns, index=df.index)
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (zero rows stay zero)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def embed_fields(keyword_dict: Dict[str, List[str]], model,
+                 descriptions: Dict[str, str] = None) -> np.ndarray:
+    """
+    Embed each field as the centroid of its seed keywords and description.
+    
+    All seeds are encoded in one batch; this is the only model pass of
+    embedding mode.
+    
+    Args:
+        keyword_dict: Dictionary of field names to keywords
+        model: SentenceTransformer model (the one that embedded the questions)
+        descriptions: Optional dictionary of field names to descriptions
+    
+    Returns:
+        Array of unit-length field centroids, one row per field in keyword_dict order
+    """
+    descriptions = descriptions or {}
+    seeds = []
+    owners = []
+    for field_id, (field_name, keywords) in enumerate(keyword_dict.items()):
+        field_seeds = list(dict.fromkeys(keywords))
+        if descriptions.get(field_name):
+            field_seeds.append(descriptions[field_name])
+        seeds.extend(field_seeds)
+        owners.extend([field_id] * len(field_seeds))
+    
+    seed_embeddings = normalize_rows(model.encode(seeds, show_progress_bar=False, batch_size=64))
+    owners = np.asarray(owners)
+    centroids = np.vstack([
+        seed_embeddings[owners == field_id].mean(axis=0) for field_id in range(len(keyword_dict))
+    ])
+    
+    return normalize_rows(centroids)
+
+
+def classify_fields_by_embedding(embeddings: np.ndarray, field_embeddings: np.ndarray,
+                                 field_names: List[str], index: pd.Index = None,
+                                 threshold: float = DEFAULT_FIELD_THRESHOLD,
+                                 top_k: int = DEFAULT_FIELD_TOP_K) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Score all questions against all fields with one matrix multiply.
+    
+    A question belongs to a field when their cosine similarity is at least
+    threshold and the field is among the question's top_k fields.
+    
+    Args:
+        embeddings: Question embeddings, one row per question
+        field_embeddings: Unit-length field centroids from embed_fields
+        field_names: Field names in field_embeddings row order
+        index: Optional index for the result (e.g. df.index)
+        threshold: Minimum cosine similarity
+        top_k: Maximum fields per question
+    
+    Returns:
+        Tuple of (multi-hot boolean matrix like build_field_matrix, similarity scores)
+    """
+    scores = normalize_rows(embeddings) @ field_embeddings.T
+    
+    members = scores >= threshold
+    if top_k < len(field_names):
+        # Drop fields ranked below top_k for each question
+        ranked_out = np.argsort(-scores, axis=1, kind='stable')[:, top_k:]
+        np.put_along_axis(members, ranked_out, False, axis=1)
+    
+    return (pd.DataFrame(members, index=index, columns=field_names),
+            pd.DataFrame(scores, index=index, columns=field_names))
+
+
+def analyze_field_coverage(df: pd.DataFrame, keyword_dict: Dict[str, List[str]],
+                           field_matrix: pd.DataFrame = None) -> Dict[str, Any]:
     """
     Analyze coverage of each social field.
     
     Args:
         df: Questions dataframe
         keyword_dict: Dictionary of field names to keywords
-        
+        field_matrix: Optional multi-hot matrix from build_field_matrix
+    
     Returns:
-        Dictionary with coverage analysis
+        Dictionary with coverage analysis for fields with at least one match,
+        in order of their first matching question
     """
     print("Analyzing sociological taxonomy coverage...")
     
-    field_matches = defaultdict(lambda: {'questions': [], 'count': 0})
     total_questions = len(df)
+    if field_matrix is None:
+        field_matrix = build_field_matrix(df, keyword_dict)
+    
+    counts = field_matrix.sum()
+    first_rows = {field_name: field_matrix[field_name].to_numpy().argmax()
+                  for field_name in keyword_dict if counts[field_name] > 0}
+    matcher = compile_keyword_matcher(keyword_dict)
     
-    # Search in questions
-    for idx, row in df.iterrows():
-        question_text = str(row.get('QEN', '')).lower()
-        combined_text = str(row.get('combined_text', '')).lower()
-        
-        for field_name, keywords in keyword_dict.items():
-            matches = search_keywords_in_text(combined_text, keywords)
-            if matches:
-                field_matches[field_name]['questions'].append({
-                    'QID': row.get('QID'),
-                    'QEN': row.get('QEN'),
-                    'matched_keywords': matches
-                })
-                field_matches[field_name]['count'] += 1
-    
-    # Calculate percentages
     coverage_results = {}
-    for field_name, data in field_matches.items():
-        count = data['count']
+    for field_name in sorted(first_rows, key=first_rows.get):
+        count = int(counts[field_name])
         percentage = (count / total_questions) * 100 if total_questions > 0 else 0
+        
+        # Sample questions with their matched keywords
+        sample_rows = df[field_matrix[field_name].to_numpy()].head(10)
+        sample_questions = []
+        for _, row in sample_rows.iterrows():
+            combined_text = str(row.get('combined_text', '')).lower()
+            sample_questions.append({
+                'QID': row.get('QID'),
+                'QEN': row.get('QEN'),
+                'matched_keywords': match_keywords(matcher, combined_text).get(field_name, [])
+            })
+        
         coverage_results[field_name] = {
             'count': count,
             'percentage': percentage,
-            'sample_questions': data['questions'][:10]  # Sample questions
+            'sample_questions': sample_questions
         }
     
     return coverage_results
@@ -191,19 +427,45 @@ def generate_taxonomy_report(coverage_results: Dict[str, Any],
     return df
 
 
-def analyze_sociological_taxonomy(df: pd.DataFrame) -> Dict[str, Any]:
+def analyze_sociological_taxonomy(df: pd.DataFrame, mode: str = 'keyword',
+                                  embeddings: np.ndarray = None, model=None,
+                                  threshold: float = DEFAULT_FIELD_THRESHOLD,
+                                  top_k: int = DEFAULT_FIELD_TOP_K) -> Dict[str, Any]:
     """
     Complete sociological taxonomy analysis pipeline.
     
     Args:
         df: Questions dataframe
-        
+        mode: 'keyword', 'embedding' (similarity to field centroids) or
+            'hybrid' (either one)
+        embeddings: Question embeddings aligned with df rows (embedding and hybrid modes)
+        model: Model that produced the embeddings (embedding and hybrid modes)
+        threshold: Minimum cosine similarity in embedding mode
+        top_k: Maximum fields per question in embedding mode
+    
     Returns:
         Dictionary with all taxonomy analysis results
     """
+    if mode not in TAXONOMY_MODES:
+        raise ValueError(f"Unknown taxonomy mode '{mode}', expected one of {TAXONOMY_MODES}")
+    
     keyword_dict = create_keyword_dictionaries()
+    field_scores = None
+    
+    if mode != 'embedding':
+        field_matrix = build_field_matrix(df, keyword_dict)
+    
+    if mode != 'keyword':
+        if embeddings is None or model is None:
+            raise ValueError(f"Taxonomy mode '{mode}' requires question embeddings and their model")
+        print("Scoring questions against field embeddings...")
+        field_embeddings = embed_fields(keyword_dict, model, create_field_descriptions())
+        embedding_matrix, field_scores = classify_fields_by_embedding(
+            embeddings, field_embeddings, list(keyword_dict), df.index, threshold, top_k
+        )
+        field_matrix = embedding_matrix if mode == 'embedding' else field_matrix | embedding_matrix
     
-    coverage_results = analyze_field_coverage(df, keyword_dict)
+    coverage_results = analyze_field_coverage(df, keyword_dict, field_matrix)
     
     underrepresented = identify_underrepresented_fields(coverage_results)
     
@@ -212,6 +474,8 @@ def analyze_sociological_taxonomy(df: pd.DataFrame) -> Dict[str, Any]:
     
     return {
         'keyword_dict': keyword_dict,
+        'field_matrix': field_matrix,
+        'field_scores': field_scores,
         'coverage_results': coverage_results,
         'underrepresented_fields': underrepresented,
         'report_df': report_df
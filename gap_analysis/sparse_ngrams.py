@@ -0,0 +1,302 @@
+"""Sparse document-term matrix backend for n-gram counting."""
+
+import zlib
+from array import array
+import numpy as np
+from collections import Counter
+from scipy import sparse
+from typing import Dict, List, Tuple, Any, Optional, Sequence
+from .tokenization import remove_masked
+
+
+def hash_ngram(ngram: Tuple[str, ...], n_features: int) -> int:
+    """
+    Map an n-gram to a feature bucket with a process-independent hash.
+    
+    Args:
+        ngram: N-gram tuple
+        n_features: Number of hash buckets
+    
+    Returns:
+        Bucket id
+    """
+    return zlib.crc32(' '.join(ngram).encode('utf-8')) % n_features
+
+
+def build_ngram_matrices(token_rows: List[List[str]],
+                         mask_rows: List[List[bool]],
+                         n_values: List[int] = [1, 2, 3],
+                         n_features: Optional[int] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Build a sparse document-term matrix per n in a single pass over the rows.
+    
+    Unigrams use all tokens; longer n-grams skip stopword-masked tokens.
+    Within each matrix row, column ids are stored in order of first appearance
+    (not sorted), so first-occurrence order of n-grams can be recovered for
+    Counter-compatible tie-breaking.
+    
+    Args:
+        token_rows: Tokens per row
+        mask_rows: Stopword masks per row
+        n_values: List of n values to extract
+        n_features: If set, use feature hashing into this many buckets
+            instead of an exact vocabulary; colliding n-grams share a bucket,
+            so top_ngrams and matrix_to_counter recount them from the tokens
+    
+    Returns:
+        Dictionary mapping n to a dict with 'matrix' (CSR, rows x features),
+        'vocab' (n-gram tuple per column id, None when hashed) and 'n_features'
+    """
+    # Compact typed buffers; converted to numpy without copying per element
+    vocabs = {n: {} for n in n_values}
+    indptr = {n: array('q', [0]) for n in n_values}
+    indices = {n: array('i') for n in n_values}
+    data = {n: array('i') for n in n_values}
+    
+    for tokens, mask in zip(token_rows, mask_rows):
+        content_tokens = None
+        for n in n_values:
+            if n > 1:
+                if content_tokens is None:
+                    content_tokens = remove_masked(tokens, mask)
+                row_tokens = content_tokens
+            else:
+                row_tokens = tokens
+            
+            row_counts = {}
+            if len(row_tokens) >= n:
+                vocab = vocabs[n]
+                for ngram in zip(*(row_tokens[i:] for i in range(n))):
+                    if n_features is None:
+                        col = vocab.setdefault(ngram, len(vocab))
+                    else:
+                        col = hash_ngram(ngram, n_features)
+                    row_counts[col] = row_counts.get(col, 0) + 1
+            
+            indices[n].extend(row_counts.keys())
+            data[n].extend(row_counts.values())
+            indptr[n].append(len(indices[n]))
+    
+    matrices = {}
+    for n in n_values:
+        num_features = n_features if n_features is not None else len(vocabs[n])
+        matrix = sparse.csr_matrix(
+            (np.frombuffer(data[n], dtype=np.int32),
+             np.frombuffer(indices[n], dtype=np.int32),
+             np.frombuffer(indptr[n], dtype=np.int64)),
+            shape=(len(indptr[n]) - 1, num_features)
+        )
+        matrices[n] = {
+            'n': n,
+            'matrix': matrix,
+            'vocab': list(vocabs[n]) if n_features is None else None,
+            'n_features': num_features,
+            # Hashed matrices recount bucket n-grams by rescanning the tokens
+            'token_rows': token_rows if n_features is not None else None,
+            'mask_rows': mask_rows if n_features is not None else None,
+        }
+    
+    return matrices
+
+
+def merge_ngram_matrices(partials: List[Dict[int, Dict[str, Any]]]) -> Dict[int, Dict[str, Any]]:
+    """
+    Stack n-gram matrices built on consecutive row chunks into one matrix per n.
+    
+    Chunk vocabularies are merged in chunk order, so column ids (and
+    first-appearance order within rows) match a serial build exactly.
+    
+    Args:
+        partials: Outputs of build_ngram_matrices, in row order
+    
+    Returns:
+        Dictionary mapping n to the merged n-gram matrix
+    """
+    merged = {}
+    for n in partials[0]:
+        parts = [partial[n] for partial in partials]
+        hashed = parts[0]['vocab'] is None
+        
+        vocab = {}
+        indices = []
+        for part in parts:
+            part_indices = part['matrix'].indices
+            if not hashed:
+                remap = np.array([vocab.setdefault(ngram, len(vocab)) for ngram in part['vocab']],
+                                 dtype=np.int32)
+                part_indices = remap[part_indices] if len(remap) else part_indices
+            indices.append(part_indices)
+        
+        # Shift each chunk's row pointers by the entries before it
+        offsets = np.cumsum([0] + [part['matrix'].nnz for part in parts[:-1]])
+        indptr = np.concatenate([[0]] + [part['matrix'].indptr[1:] + offset
+                                         for part, offset in zip(parts, offsets)])
+        
+        num_features = parts[0]['n_features'] if hashed else len(vocab)
+        matrix = sparse.csr_matrix(
+            (np.concatenate([part['matrix'].data for part in parts]),
+             np.concatenate(indices).astype(np.int32),
+             indptr.astype(np.int64)),
+            shape=(len(indptr) - 1, num_features)
+        )
+        
+        token_rows = mask_rows = None
+        if hashed and all(part['token_rows'] is not None for part in parts):
+            token_rows = [tokens for part in parts for tokens in part['token_rows']]
+            mask_rows = [mask for part in parts for mask in part['mask_rows']]
+        
+        merged[n] = {
+            'n': n,
+            'matrix': matrix,
+            'vocab': list(vocab) if not hashed else None,
+            'n_features': num_features,
+            'token_rows': token_rows,
+            'mask_rows': mask_rows,
+        }
+    
+    return merged
+
+
+def count_hashed_ngrams(ngram_matrix: Dict[str, Any], columns: Optional[Sequence[int]] = None,
+                        positions: Optional[Sequence[int]] = None) -> Counter:
+    """
+    Count the n-grams behind hash buckets exactly by rescanning the tokens.
+    
+    Colliding n-grams are counted separately, in order of first occurrence,
+    so the Counter matches counting the selected rows row by row.
+    
+    Args:
+        ngram_matrix: Hashed n-gram matrix from build_ngram_matrices
+        columns: Bucket ids to count (None for all)
+        positions: Optional row positions to restrict to
+    
+    Returns:
+        Counter of the n-grams hashed into the buckets
+    """
+    n = ngram_matrix['n']
+    n_features = ngram_matrix['n_features']
+    wanted = set(int(c) for c in columns) if columns is not None else None
+    token_rows = ngram_matrix['token_rows']
+    mask_rows = ngram_matrix['mask_rows']
+    if positions is not None:
+        token_rows = [token_rows[p] for p in positions]
+        mask_rows = [mask_rows[p] for p in positions]
+    
+    counts = Counter()
+    for tokens, mask in zip(token_rows, mask_rows):
+        row_tokens = tokens if n == 1 else remove_masked(tokens, mask)
+        for ngram in zip(*(row_tokens[i:] for i in range(n))):
+            if wanted is None or hash_ngram(ngram, n_features) in wanted:
+                counts[ngram] += 1
+    
+    return counts
+
+
+def _top_hashed_ngrams(ngram_matrix: Dict[str, Any], ranked: np.ndarray, sums: np.ndarray, k: int,
+                       positions: Optional[Sequence[int]] = None) -> List[Tuple[Tuple[str, ...], int]]:
+    """
+    Get the exact k most frequent n-grams of a hashed matrix.
+    
+    A bucket sum bounds the count of every n-gram in the bucket, so the
+    buckets are recounted down to the k-th exact count, widening the
+    candidates whenever a collision pushes it below the next bucket.
+    
+    Args:
+        ngram_matrix: Hashed n-gram matrix from build_ngram_matrices
+        ranked: Bucket ids ranked by _ranked_columns
+        sums: Bucket sums in ranked order
+        k: Number of n-grams to return
+        positions: Optional row positions to restrict to
+    
+    Returns:
+        List of (ngram, count) tuples
+    """
+    if not k or not len(ranked):
+        return []
+    
+    threshold = sums[min(k, len(ranked)) - 1]
+    while True:
+        # All buckets that could hold an n-gram counted at least threshold
+        size = int(np.searchsorted(-sums, -threshold, side='right'))
+        top = count_hashed_ngrams(ngram_matrix, ranked[:size], positions).most_common(k)
+        if size == len(ranked) or (len(top) == k and top[-1][1] > sums[size]):
+            return top
+        threshold = top[-1][1] if len(top) == k else sums[size]
+
+
+def _ranked_columns(ngram_matrix: Dict[str, Any],
+                    positions: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rank columns by frequency, ties broken by first occurrence in the selected rows.
+    
+    This reproduces Counter.most_common ordering for the same rows.
+    
+    Args:
+        ngram_matrix: N-gram matrix from build_ngram_matrices
+        positions: Optional row positions to restrict to
+    
+    Returns:
+        Tuple of (ranked column ids, their counts)
+    """
+    matrix = ngram_matrix['matrix']
+    if positions is not None:
+        matrix = matrix[np.asarray(positions)]
+    
+    # Sparse column sums give the counts
+    sums = np.asarray(matrix.sum(axis=0)).ravel()
+    
+    # Rows keep first-appearance order, so the first index of each column
+    # in the concatenated row entries is its first occurrence
+    columns, first_seen = np.unique(matrix.indices, return_index=True)
+    order = np.lexsort((first_seen, -sums[columns]))
+    ranked = columns[order]
+    return ranked, sums[ranked]
+
+
+def top_ngrams(ngram_matrix: Dict[str, Any], k: int = 50,
+               positions: Optional[Sequence[int]] = None) -> List[Tuple[Tuple[str, ...], int]]:
+    """
+    Get the k most frequent n-grams, ordered like Counter.most_common(k).
+    
+    Args:
+        ngram_matrix: N-gram matrix from build_ngram_matrices
+        k: Number of n-grams to return
+        positions: Optional row positions (e.g. one category) to restrict to
+    
+    Returns:
+        List of (ngram, count) tuples
+    """
+    ranked, counts = _ranked_columns(ngram_matrix, positions)
+    if ngram_matrix['vocab'] is None:
+        return _top_hashed_ngrams(ngram_matrix, ranked, counts, k, positions)
+    vocab = ngram_matrix['vocab']
+    return [(vocab[c], count) for c, count in zip(ranked[:k], counts[:k].tolist())]
+
+
+def matrix_to_counter(ngram_matrix: Dict[str, Any],
+                      positions: Optional[Sequence[int]] = None) -> Counter:
+    """
+    Convert an n-gram matrix to a Counter with the same insertion order as
+    counting row by row.
+    
+    Args:
+        ngram_matrix: N-gram matrix from build_ngram_matrices
+        positions: Optional row positions to restrict to
+    
+    Returns:
+        Counter of n-grams
+    """
+    if ngram_matrix['vocab'] is None:
+        # Bucket sums merge colliding n-grams
+        return count_hashed_ngrams(ngram_matrix, positions=positions)
+    
+    matrix = ngram_matrix['matrix']
+    if positions is not None:
+        matrix = matrix[np.asarray(positions)]
+    
+    sums = np.asarray(matrix.sum(axis=0)).ravel()
+    columns, first_seen = np.unique(matrix.indices, return_index=True)
+    columns = columns[np.argsort(first_seen)]
+    
+    vocab = ngram_matrix['vocab']
+    return Counter(dict(zip([vocab[c] for c in columns], sums[columns].tolist())))
@@ -0,0 +1,199 @@
+"""Shared tokenization: tokenize the corpus once for all text analyzers."""
+
+import pandas as pd
+import re
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+from nltk import word_tokenize
+from nltk.corpus import stopwords
+import nltk
+from .utils import chunk_slices, map_in_pool
+
+
+# Download required NLTK data
+try:
+    nltk.data.find('tokenizers/punkt')
+except LookupError:
+    nltk.download('punkt', quiet=True)
+
+try:
+    nltk.data.find('corpora/stopwords')
+except LookupError:
+    nltk.download('stopwords', quiet=True)
+
+
+# Columns tokenized by build_token_corpus
+TOKEN_COLUMNS = ['QEN', 'ACEN', 'AW1EN', 'AW2EN', 'combined_text']
+
+ANSWER_COLUMNS = ['ACEN', 'AW1EN', 'AW2EN']
+
+# Tokenizer modes: 'nltk' (punkt + Treebank word_tokenize) or 'fast' (compiled regex)
+TOKENIZERS = ['nltk', 'fast']
+
+_WORD_PATTERN = re.compile(r'\w+')
+
+# Whole-word contractions that NLTK's Treebank tokenizer splits; on text
+# reduced to word characters these are its only splits beyond whitespace
+_CONTRACTION_SPLITS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na'),
+}
+
+
+@lru_cache(maxsize=1)
+def load_stopwords() -> frozenset:
+    """Load English stopword set from NLTK (cached after the first call)."""
+    return frozenset(stopwords.words('english'))
+
+
+def fast_tokenize(text: str) -> List[str]:
+    """
+    Tokenize lowercased text with a compiled regex, matching word_tokenize output.
+    
+    Args:
+        text: Lowercased text
+    
+    Returns:
+        List of tokens
+    """
+    tokens = []
+    for word in _WORD_PATTERN.findall(text):
+        split = _CONTRACTION_SPLITS.get(word)
+        if split:
+            tokens.extend(split)
+        else:
+            tokens.append(word)
+    return tokens
+
+
+def tokenize_text(text: str, tokenizer: str = 'nltk') -> List[str]:
+    """
+    Lowercase, strip punctuation and tokenize text.
+    
+    Args:
+        text: Input text
+        tokenizer: Tokenizer mode, 'nltk' or 'fast'
+    
+    Returns:
+        List of tokens (stopwords included)
+    """
+    if pd.isna(text) or text == "":
+        return []
+    
+    if tokenizer == 'fast':
+        return fast_tokenize(str(text).lower())
+    
+    # Convert to lowercase
+    text = str(text).lower()
+    
+    # Remove special characters but keep spaces
+    text = re.sub(r'[^\w\s]', ' ', text)
+    
+    # Tokenize
+    try:
+        tokens = word_tokenize(text)
+    except:
+        # Fallback to simple split
+        tokens = text.split()
+    
+    return tokens
+
+
+def stopword_mask(tokens: List[str], stop_words: frozenset) -> List[bool]:
+    """
+    Flag tokens that stopword removal would drop (stopwords and single characters).
+    
+    Args:
+        tokens: List of tokens
+        stop_words: Stopword set
+    
+    Returns:
+        List of booleans, True where the token is removed
+    """
+    return [t in stop_words or len(t) <= 1 for t in tokens]
+
+
+def _tokenize_chunk(task: Tuple[List[Any], str]) -> Tuple[List[List[str]], List[List[bool]]]:
+    """Tokenize one chunk of texts and build their stopword masks (process pool worker)."""
+    texts, tokenizer = task
+    stop_words = load_stopwords()
+    token_rows = [tokenize_text(text, tokenizer) for text in texts]
+    return token_rows, [stopword_mask(tokens, stop_words) for tokens in token_rows]
+
+
+def build_token_corpus(df: pd.DataFrame, columns: Sequence[str] = TOKEN_COLUMNS,
+                       tokenizer: str = 'nltk',
+                       n_workers: int = 1,
+                       chunk_size: int = 5000) -> Dict[str, Any]:
+    """
+    Tokenize text columns once so that all analyzers can share the result.
+    
+    Args:
+        df: Questions dataframe
+        columns: Text columns to tokenize
+        tokenizer: Tokenizer mode, 'nltk' or 'fast'
+        n_workers: Worker processes; above 1, row chunks are tokenized in a process pool
+        chunk_size: Rows per chunk for the process pool
+    
+    Returns:
+        Dictionary with 'num_rows' and 'columns', mapping each column to
+        per-row 'tokens' and 'stop_mask' lists aligned with df row positions
+    """
+    if tokenizer not in TOKENIZERS:
+        raise ValueError(f"Unknown tokenizer '{tokenizer}', expected one of {TOKENIZERS}")
+    
+    print(f"Tokenizing corpus ({tokenizer} tokenizer)...")
+    
+    token_columns = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        texts = df[col].tolist()
+        tasks = [(texts[rows], tokenizer) for rows in chunk_slices(len(texts), chunk_size)]
+        chunks = map_in_pool(_tokenize_chunk, tasks, n_workers)
+        token_columns[col] = {
+            'tokens': [tokens for token_rows, _ in chunks for tokens in token_rows],
+            'stop_mask': [mask for _, mask_rows in chunks for mask in mask_rows]
+        }
+    
+    return {
+        'num_rows': len(df),
+        'tokenizer': tokenizer,
+        'columns': token_columns
+    }
+
+
+def has_token_column(token_corpus: Optional[Dict[str, Any]], column: str, num_rows: int) -> bool:
+    """Check that a token corpus has a column aligned with a dataframe of num_rows rows."""
+    return (token_corpus is not None
+            and token_corpus['num_rows'] == num_rows
+            and column in token_corpus['columns'])
+
+
+def get_token_rows(token_corpus: Dict[str, Any],
+                   column: str,
+                   positions: Optional[Sequence[int]] = None) -> Tuple[List[List[str]], List[List[bool]]]:
+    """
+    Get per-row tokens and stopword masks for a column.
+    
+    Args:
+        token_corpus: Token corpus from build_token_corpus
+        column: Text column name
+        positions: Optional row positions to select
+    
+    Returns:
+        Tuple of (token rows, stopword mask rows)
+    """
+    data = token_corpus['columns'][column]
+    if positions is None:
+        return data['tokens'], data['stop_mask']
+    return [data['tokens'][i] for i in positions], [data['stop_mask'][i] for i in positions]
+
+
+def remove_masked(tokens: List[str], mask: List[bool]) -> List[str]:
+    """Drop tokens flagged in a stopword mask."""
+    return [t for t, stop in zip(tokens, mask) if not stop]
@@ -1,7 +1,10 @@
 """Shared utilities for gap analysis."""
 
 import re
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Dict, Any, Callable, Sequence, Optional, Tuple
+import numpy as np
 import pandas as pd
 
 
@@ -36,3 +39,79 @@ def validate_character_limit(text: str, limit: int = 100) -> bool:
     """Check if text is within character limit."""
     return get_character_count(text) <= limit
 
+
+def chunk_slices(num_items: int, chunk_size: int) -> List[slice]:
+    """Split range(num_items) into consecutive slices of at most chunk_size items."""
+    chunk_size = max(1, chunk_size)
+    return [slice(start, min(start + chunk_size, num_items)) for start in range(0, num_items, chunk_size)]
+
+
+def map_in_pool(func: Callable, tasks: Sequence[Any], n_workers: int = 1,
+                costs: Optional[Sequence[float]] = None,
+                initializer: Optional[Callable] = None,
+                initargs: Tuple = ()) -> List[Any]:
+    """
+    Apply func to each task, in a process pool when n_workers > 1.
+    
+    Results are returned in task order regardless of worker count.
+    
+    Args:
+        func: Module-level (picklable) function
+        tasks: Task arguments, one per call
+        n_workers: Number of worker processes (1 runs in-process)
+        costs: Optional cost estimate per task; the pool starts the most
+            expensive tasks first so long tasks do not finish last
+        initializer: Optional function run once in each worker process
+        initargs: Arguments for initializer
+    
+    Returns:
+        List of results in task order
+    """
+    if n_workers <= 1 or len(tasks) <= 1:
+        return [func(task) for task in tasks]
+    
+    order = list(range(len(tasks)))
+    if costs is not None:
+        order.sort(key=lambda i: -costs[i])
+    
+    with ProcessPoolExecutor(max_workers=min(n_workers, len(tasks)),
+                             initializer=initializer, initargs=initargs) as executor:
+        results = list(executor.map(func, [tasks[i] for i in order]))
+    
+    ordered = [None] * len(tasks)
+    for i, result in zip(order, results):
+        ordered[i] = result
+    return ordered
+
+
+def share_array(array: np.ndarray) -> Tuple[SharedMemory, Tuple[str, Tuple[int, ...], str]]:
+    """
+    Copy an array into shared memory so worker processes can map it instead of unpickling copies.
+    
+    The caller owns the block and must close() and unlink() it when done.
+    
+    Args:
+        array: Array to share
+    
+    Returns:
+        Tuple of (shared memory block, spec for attach_array)
+    """
+    array = np.ascontiguousarray(array)
+    shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def attach_array(spec: Tuple[str, Tuple[int, ...], str]) -> Tuple[SharedMemory, np.ndarray]:
+    """
+    Map an array shared with share_array (keep the block referenced while using the array).
+    
+    Args:
+        spec: Spec from share_array
+    
+    Returns:
+        Tuple of (shared memory block, array view)
+    """
+    name, shape, dtype = spec
+    shm = SharedMemory(name=name, track=False)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
@@ -9,11 +9,20 @@ import pandas as pd
 
 # Import gap analysis modules
 from gap_analysis.data_loader import load_and_prepare_data
+from gap_analysis.tokenization import build_token_corpus, TOKENIZERS, TOKEN_COLUMNS
 from gap_analysis.quality_checker import analyze_quality
-from gap_analysis.ngram_analysis import analyze_ngrams
-from gap_analysis.entity_recognition import analyze_entities
-from gap_analysis.sociological_taxonomy import analyze_sociological_taxonomy
-from gap_analysis.semantic_clustering import analyze_semantic_clustering
+from gap_analysis.ngram_analysis import analyze_ngrams, NGRAM_BACKENDS
+from gap_analysis.heavy_hitters import DEFAULT_SKETCH_CAPACITY
+from gap_analysis.entity_recognition import analyze_entities, ENTITY_ENGINES
+from gap_analysis.sociological_taxonomy import (
+    analyze_sociological_taxonomy, TAXONOMY_MODES, DEFAULT_FIELD_THRESHOLD, DEFAULT_FIELD_TOP_K
+)
+from gap_analysis.semantic_clustering import (
+    analyze_semantic_clustering, load_embedding_model, generate_embeddings, open_corpus_store,
+    KMEANS_ENGINES, K_CRITERIA, LAYOUT_METHODS, PLOT_MODES
+)
+from gap_analysis.embedding_store import EMBEDDING_DTYPES
+from gap_analysis.near_duplicates import analyze_near_duplicates, DUPLICATE_ENGINES, DEFAULT_DUPLICATE_THRESHOLD
 from gap_analysis.gap_reporter import synthesize_analyses
 
 
@@ -56,12 +65,45 @@ def create_output_directories():
     print("Output directories created.")
 
 
-def run_gap_analysis(excel_path: str = "ninouk2.xlsx"):
+def run_gap_analysis(excel_path: str = "ninouk2.xlsx", use_cache: bool = True, tokenizer: str = "nltk",
+                     ngram_backend: str = "counter", ngram_workers: int = 1, ngram_chunk_size: int = 5000,
+                     sketch_capacity: int = DEFAULT_SKETCH_CAPACITY, ner_batch_size: int = 256,
+                     ner_processes: int = 1, entity_engine: str = "auto", reference_lists: list = None,
+                     taxonomy_mode: str = "keyword", taxonomy_threshold: float = DEFAULT_FIELD_THRESHOLD,
+                     taxonomy_top_k: int = DEFAULT_FIELD_TOP_K, embedding_dtype: str = "float32",
+                     k_criterion: str = "elbow", kmeans_engine: str = "kmeans", k_jobs: int = 1,
+                     cluster_workers: int = 1, cluster_layout: str = "pca", cluster_plot: str = "auto",
+                     refit_clusters: bool = False, cluster_sample_size: int = None,
+                     duplicate_threshold: float = DEFAULT_DUPLICATE_THRESHOLD, duplicate_engine: str = "auto"):
     """
     Run complete gap analysis pipeline.
     
     Args:
         excel_path: Path to Excel file
+        use_cache: Whether to use the prepared data, NER result, embedding and clustering model caches
+        tokenizer: Tokenizer mode for text analyses, 'nltk' or 'fast'
+        ngram_backend: N-gram counting backend, 'counter', 'sparse' or 'streaming'
+        ngram_workers: Worker processes for tokenization and n-gram counting
+        ngram_chunk_size: Rows per worker chunk
+        sketch_capacity: Counters per Space-Saving summary for the streaming n-gram backend
+        ner_batch_size: Texts per spaCy nlp.pipe batch
+        ner_processes: Worker processes for spaCy nlp.pipe
+        entity_engine: Entity engine, 'auto', 'spacy' or 'gazetteer'
+        reference_lists: Additional reference list files for gazetteer matching
+        taxonomy_mode: Field assignment, 'keyword', 'embedding' or 'hybrid'
+        taxonomy_threshold: Minimum question-field cosine similarity in embedding mode
+        taxonomy_top_k: Maximum fields per question in embedding mode
+        embedding_dtype: Storage precision of the embedding store, 'float32' or 'float16'
+        k_criterion: Criterion for choosing k per tag group, 'elbow' or 'silhouette'
+        kmeans_engine: K-means engine per tag group, 'kmeans', 'minibatch' or 'auto'
+        k_jobs: Parallel jobs for each tag group's k sweep
+        cluster_workers: Worker processes for per-tag-group clustering
+        cluster_layout: 2-D layout of the cluster plot, 'pca' or 'umap'
+        cluster_plot: Cluster plot renderer, 'scatter', 'hexbin' or 'auto'
+        refit_clusters: Whether to refit the persisted UMAP/HDBSCAN model instead of assigning new questions
+        cluster_sample_size: Fit UMAP/HDBSCAN on a stratified sample of this many questions (default: all)
+        duplicate_threshold: Minimum cosine similarity of near-duplicate questions
+        duplicate_engine: Near-duplicate search, 'blocked' (exact), 'ivf' (approximate) or 'auto'
     """
     logger = setup_logging()
     
@@ -83,11 +125,20 @@ def run_gap_analysis(excel_path: str = "ninouk2.xlsx"):
         logger.info("PHASE 1: DATA PREPARATION")
         logger.info("=" * 70)
         phase_start = datetime.now()
-        df = load_and_prepare_data(excel_path)
+        df = load_and_prepare_data(excel_path, use_cache=use_cache)
         phase_duration = (datetime.now() - phase_start).total_seconds()
         logger.info(f"✓ Loaded and prepared {len(df)} questions (took {phase_duration:.1f}s)")
         logger.debug(f"DataFrame shape: {df.shape}, columns: {list(df.columns)}")
         
+        # Shared tokenization for n-gram and clustering phases; the streaming
+        # n-gram backend tokenizes chunk by chunk, so only clustering text is kept
+        phase_start = datetime.now()
+        token_columns = ['combined_text'] if ngram_backend == "streaming" else TOKEN_COLUMNS
+        token_corpus = build_token_corpus(df, columns=token_columns, tokenizer=tokenizer,
+                                          n_workers=ngram_workers, chunk_size=ngram_chunk_size)
+        phase_duration = (datetime.now() - phase_start).total_seconds()
+        logger.info(f"✓ Tokenized {len(token_corpus['columns'])} text columns (took {phase_duration:.1f}s)")
+        
         # Phase 2: Quality Analysis
         logger.info("\n" + "=" * 70)
         logger.info("PHASE 2: QUALITY ANALYSIS")
@@ -103,7 +154,9 @@ def run_gap_analysis(excel_path: str = "ninouk2.xlsx"):
         logger.info("PHASE 3: N-GRAM ANALYSIS")
         logger.info("=" * 70)
         phase_start = datetime.now()
-        ngram_results = analyze_ngrams(df)
+        ngram_results = analyze_ngrams(df, token_corpus, backend=ngram_backend,
+                                       n_workers=ngram_workers, chunk_size=ngram_chunk_size,
+                                       sketch_capacity=sketch_capacity)
         phase_duration = (datetime.now() - phase_start).total_seconds()
         logger.info(f"✓ N-gram analysis complete (took {phase_duration:.1f}s)")
         logger.debug(f"Extracted n-grams: {len(ngram_results.get('question_ngrams', {}).get('top_bigrams', []))} bigrams")
@@ -112,9 +165,15 @@ def run_gap_analysis(excel_path: str = "ninouk2.xlsx"):
         logger.info("\n" + "=" * 70)
         logger.info("PHASE 4: ENTITY RECOGNITION")
         logger.info("=" * 70)
-        logger.info("This phase processes all questions with spaCy NER (may take 5-10 minutes)...")
+        if entity_engine == "gazetteer":
+            logger.info("This phase matches reference lists against all questions and answers...")
+        else:
+            logger.info(f"This phase streams all questions and answers through spaCy NER "
+                        f"(batch size {ner_batch_size}, {ner_processes} process(es))...")
         phase_start = datetime.now()
-        entity_results = analyze_entities(df)
+        entity_results = analyze_entities(df, batch_size=ner_batch_size, n_process=ner_processes,
+                                          use_cache=use_cache, engine=entity_engine,
+                                          extra_reference_paths=reference_lists)
         phase_duration = (datetime.now() - phase_start).total_seconds()
         logger.info(f"✓ Entity recognition complete (took {phase_duration:.1f}s)")
         logger.debug(f"Entity coverage: {entity_results.get('coverage_analysis', {})}")
@@ -124,7 +183,16 @@ def run_gap_analysis(excel_path: str = "ninouk2.xlsx"):
         logger.info("PHASE 5: SOCIOLOGICAL TAXONOMY")
         logger.info("=" * 70)
         phase_start = datetime.now()
-        taxonomy_results = analyze_sociological_taxonomy(df)
+        embedding_model = None
+        question_embeddings = None
+        if taxonomy_mode != "keyword":
+            # Embedded once here and reused by semantic clustering
+            embedding_model = load_embedding_model()
+            question_embeddings = generate_embeddings(df['combined_text'].tolist(), embedding_model,
+                                                      open_corpus_store(dtype=embedding_dtype, use_cache=use_cache))
+        taxonomy_results = analyze_sociological_taxonomy(df, mode=taxonomy_mode, embeddings=question_embeddings,
+                                                         model=embedding_model, threshold=taxonomy_threshold,
+                                                         top_k=taxonomy_top_k)
         phase_duration = (datetime.now() - phase_start).total_seconds()
         logger.info(f"✓ Sociological taxonomy analysis complete (took {phase_duration:.1f}s)")
         logger.debug(f"Underrepresented fields: {taxonomy_results.get('underrepresented_fields', [])}")
@@ -136,11 +204,25 @@ def run_gap_analysis(excel_path: str = "ninouk2.xlsx"):
         logger.info("Note: This phase may take 20-40 minutes due to embedding generation for 12,909 questions...")
         logger.info("Progress will be shown as embeddings are generated...")
         phase_start = datetime.now()
-        semantic_results = analyze_semantic_clustering(df)
+        semantic_results = analyze_semantic_clustering(df, token_corpus, model=embedding_model,
+                                                       embeddings=question_embeddings, use_cache=use_cache,
+                                                       embedding_dtype=embedding_dtype, k_criterion=k_criterion,
+                                                       kmeans_engine=kmeans_engine, k_jobs=k_jobs,
+                                                       cluster_workers=cluster_workers, layout=cluster_layout,
+                                                       plot_mode=cluster_plot, refit_clusters=refit_clusters,
+                                                       cluster_sample_size=cluster_sample_size)
         phase_duration = (datetime.now() - phase_start).total_seconds()
         logger.info(f"✓ Semantic clustering complete (took {phase_duration:.1f}s)")
         logger.debug(f"Discovered clusters: {semantic_results.get('missing_clusters', {}).get('num_clusters', 0)}")
         
+        # Near-duplicate questions from the clustering embeddings
+        phase_start = datetime.now()
+        duplicate_results = analyze_near_duplicates(df, semantic_results['embeddings'],
+                                                    threshold=duplicate_threshold, engine=duplicate_engine)
+        phase_duration = (datetime.now() - phase_start).total_seconds()
+        logger.info(f"✓ Found {duplicate_results['num_groups']} near-duplicate groups covering "
+                    f"{duplicate_results['num_questions']} questions (took {phase_duration:.1f}s)")
+        
         # Phase 7: Gap Synthesis
         logger.info("\n" + "=" * 70)
         logger.info("PHASE 7: GAP SYNTHESIS & REPORTING")
@@ -173,6 +255,7 @@ def run_gap_analysis(excel_path: str = "ninouk2.xlsx"):
         logger.info("  - taxonomy_coverage.csv (field coverage)")
         logger.info("  - quality_report.csv (quality metrics)")
         logger.info("  - ngram_patterns.csv (n-gram patterns)")
+        logger.info("  - near_duplicates.csv (near-duplicate question groups)")
         logger.info("  - clusters_visualization.png (cluster map)")
         logger.info("  - entity_coverage_chart.png (entity visualization)")
         logger.info("  - taxonomy_coverage_chart.png (taxonomy visualization)")
@@ -208,6 +291,187 @@ if __name__ == "__main__":
         help="Path to Excel file (default: ninouk2.xlsx)"
     )
     
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the prepared data, NER result, embedding and clustering model caches"
+    )
+    
+    parser.add_argument(
+        "--tokenizer",
+        choices=TOKENIZERS,
+        default="nltk",
+        help="Tokenizer for n-gram/taxonomy/clustering text analysis (default: nltk; fast gives identical tokens)"
+    )
+    
+    parser.add_argument(
+        "--ngram-backend",
+        choices=NGRAM_BACKENDS,
+        default="counter",
+        help="N-gram counting backend (default: counter; sparse uses document-term matrices, "
+             "streaming keeps approximate top-k in bounded memory, tokenizing chunk by chunk)"
+    )
+    
+    parser.add_argument(
+        "--ngram-workers",
+        type=int,
+        default=1,
+        help="Worker processes for tokenization and n-gram counting (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--ngram-chunk-size",
+        type=int,
+        default=5000,
+        help="Rows per worker chunk (default: 5000)"
+    )
+    
+    parser.add_argument(
+        "--sketch-capacity",
+        type=int,
+        default=DEFAULT_SKETCH_CAPACITY,
+        help=f"Counters per summary for the streaming n-gram backend (default: {DEFAULT_SKETCH_CAPACITY})"
+    )
+    
+    parser.add_argument(
+        "--ner-batch-size",
+        type=int,
+        default=256,
+        help="Texts per spaCy nlp.pipe batch for entity recognition (default: 256)"
+    )
+    
+    parser.add_argument(
+        "--ner-processes",
+        type=int,
+        default=1,
+        help="Worker processes for spaCy entity recognition (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--entity-engine",
+        choices=ENTITY_ENGINES,
+        default="auto",
+        help="Entity engine (default: auto = spaCy NER, or reference-list gazetteer if the model is missing)"
+    )
+    
+    parser.add_argument(
+        "--reference-list",
+        action="append",
+        default=[],
+        help="Extra reference list file (.json array or .txt, one name per line) for the gazetteer; repeatable"
+    )
+    
+    parser.add_argument(
+        "--taxonomy-mode",
+        choices=TAXONOMY_MODES,
+        default="keyword",
+        help="Field assignment for the sociological taxonomy (default: keyword; embedding scores questions "
+             "against field centroids, hybrid uses either)"
+    )
+    
+    parser.add_argument(
+        "--taxonomy-threshold",
+        type=float,
+        default=DEFAULT_FIELD_THRESHOLD,
+        help=f"Minimum cosine similarity for embedding taxonomy mode (default: {DEFAULT_FIELD_THRESHOLD})"
+    )
+    
+    parser.add_argument(
+        "--taxonomy-top-k",
+        type=int,
+        default=DEFAULT_FIELD_TOP_K,
+        help=f"Maximum fields per question in embedding taxonomy mode (default: {DEFAULT_FIELD_TOP_K})"
+    )
+    
+    parser.add_argument(
+        "--embedding-dtype",
+        choices=EMBEDDING_DTYPES,
+        default="float32",
+        help="Storage precision of the persistent embedding store (default: float32; float16 halves its size)"
+    )
+    
+    parser.add_argument(
+        "--k-criterion",
+        choices=K_CRITERIA,
+        default="elbow",
+        help="How to choose k for each tag group (default: elbow; silhouette scores a sample)"
+    )
+    
+    parser.add_argument(
+        "--kmeans-engine",
+        choices=KMEANS_ENGINES,
+        default="kmeans",
+        help="K-means for tag groups (default: kmeans; auto uses MiniBatchKMeans for large groups)"
+    )
+    
+    parser.add_argument(
+        "--k-jobs",
+        type=int,
+        default=1,
+        help="Parallel jobs for the k sweep of each tag group (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--cluster-workers",
+        type=int,
+        default=1,
+        help="Worker processes for per-tag-group clustering, sharing embeddings via shared memory (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--cluster-layout",
+        choices=LAYOUT_METHODS,
+        default="pca",
+        help="2-D layout of the cluster plot: PCA of the UMAP clustering space or a second UMAP fit (default: pca)"
+    )
+    
+    parser.add_argument(
+        "--cluster-plot",
+        choices=PLOT_MODES,
+        default="auto",
+        help="Cluster plot renderer (default: auto; hexbin density for large corpora)"
+    )
+    
+    parser.add_argument(
+        "--refit-clusters",
+        action="store_true",
+        help="Refit UMAP/HDBSCAN instead of assigning new questions to the persisted clustering model"
+    )
+    
+    parser.add_argument(
+        "--cluster-sample-size",
+        type=int,
+        default=None,
+        help="Fit UMAP/HDBSCAN on a sample of this many questions, stratified by category and tags, "
+             "and assign the rest to its clusters (default: fit on all questions)"
+    )
+    
+    parser.add_argument(
+        "--duplicate-threshold",
+        type=float,
+        default=DEFAULT_DUPLICATE_THRESHOLD,
+        help=f"Minimum cosine similarity of near-duplicate questions (default: {DEFAULT_DUPLICATE_THRESHOLD})"
+    )
+    
+    parser.add_argument(
+        "--duplicate-engine",
+        choices=DUPLICATE_ENGINES,
+        default="auto",
+        help="Near-duplicate search: exact blocked products or an approximate inverted-file index "
+             "(default: auto; index for very large banks)"
+    )
+    
     args = parser.parse_args()
-    run_gap_analysis(args.excel)
+    run_gap_analysis(args.excel, use_cache=not args.no_cache, tokenizer=args.tokenizer,
+                     ngram_backend=args.ngram_backend, ngram_workers=args.ngram_workers,
+                     ngram_chunk_size=args.ngram_chunk_size, sketch_capacity=args.sketch_capacity,
+                     ner_batch_size=args.ner_batch_size, ner_processes=args.ner_processes,
+                     entity_engine=args.entity_engine, reference_lists=args.reference_list,
+                     taxonomy_mode=args.taxonomy_mode, taxonomy_threshold=args.taxonomy_threshold,
+                     taxonomy_top_k=args.taxonomy_top_k, embedding_dtype=args.embedding_dtype,
+                     k_criterion=args.k_criterion, kmeans_engine=args.kmeans_engine, k_jobs=args.k_jobs,
+                     cluster_workers=args.cluster_workers, cluster_layout=args.cluster_layout,
+                     cluster_plot=args.cluster_plot, refit_clusters=args.refit_clusters,
+                     cluster_sample_size=args.cluster_sample_size, duplicate_threshold=args.duplicate_threshold,
+                     duplicate_engine=args.duplicate_engine)
 